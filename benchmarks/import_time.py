@@ -0,0 +1,62 @@
+"""
+Import time benchmark for smc-python.
+
+Each statement is run in a fresh interpreter several times and the best
+time is reported. The run fails if importing the default session exceeds
+the budget or if ``requests`` is imported before login::
+
+    python benchmarks/import_time.py --budget 0.5
+"""
+import sys
+import argparse
+import subprocess
+
+
+STATEMENTS = (
+    'import smc',
+    'from smc import session',
+    'from smc.elements.network import Host',
+)
+
+TIMER = '''
+import sys, time
+start = time.time()
+{}
+elapsed = time.time() - start
+print('%f %d' % (elapsed, 'requests' in sys.modules))
+'''
+
+
+def measure(statement, repeat):
+    best, requests_loaded = None, False
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', TIMER.format(statement)])
+        elapsed, loaded = output.decode('utf-8').split()
+        best = float(elapsed) if best is None else min(best, float(elapsed))
+        requests_loaded = requests_loaded or loaded == '1'
+    return best, requests_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget', type=float, default=0.5,
+        help='Maximum seconds allowed for: from smc import session')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for statement in STATEMENTS:
+        elapsed, requests_loaded = measure(statement, args.repeat)
+        print('%-45s %8.1f ms%s' % (statement, elapsed * 1000,
+            ' (requests imported)' if requests_loaded else ''))
+        if requests_loaded:
+            failed = True
+        if statement == 'from smc import session' and elapsed > args.budget:
+            print('Import time budget of %.3fs exceeded' % args.budget)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
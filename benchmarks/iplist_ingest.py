@@ -0,0 +1,59 @@
+"""
+Throughput and memory benchmark for streaming IPList ingest.
+
+Runs ``IPList.ingest`` on a generated feed of addresses, networks and
+ranges. The upload request is replaced with one that reads the streamed
+multipart body so no SMC connection is required. Reports entries per
+second, payload size and peak traced memory (measured in a second
+run, as tracing slows the ingest)::
+
+    python benchmarks/iplist_ingest.py --count 1000000
+"""
+import time
+import argparse
+import tracemalloc
+from smc.elements.network import IPList
+
+
+def feed(count):
+    for i in range(count):
+        octets = (i >> 16 & 255, i >> 8 & 255, i & 255)
+        if i % 10 == 0:
+            yield '172.{}.{}.0/24 ; network\n'.format(*octets[:2])
+        elif i % 10 == 1:
+            yield '192.{}.{}.{}-192.{}.{}.255\n'.format(*(octets + octets[:2]))
+        else:
+            yield '10.{}.{}.{}\n'.format(*octets)
+
+
+def upload(self, *exception, **kwargs):
+    body = kwargs['files']
+    while body.read(64 * 1024):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--format', choices=('zip', 'txt'), default='zip')
+    args = parser.parse_args()
+
+    IPList.make_request = upload
+    iplist = IPList(name='benchmark', href='https://smc/elements/ip_list/1',
+                    type='ip_list')
+    start = time.time()
+    result = iplist.ingest(feed(args.count), as_type=args.format)
+    elapsed = time.time() - start
+
+    tracemalloc.start()
+    iplist.ingest(feed(args.count), as_type=args.format)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print('Entries: %s, invalid: %s' % (result['total'], result['invalid']))
+    print('Elapsed: %.1fs (%.0f entries/s)' % (elapsed, result['total'] / elapsed))
+    print('Payload: %.1f MB' % (result['payload_size'] / 1024.0 / 1024.0))
+    print('Peak traced memory: %.1f MB' % (peak / 1024.0 / 1024.0))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Memory benchmark for element instances returned from a listing.
+
+Measures the per element memory overhead of the elements returned from
+``Host.objects.all()`` (meta only) and after each element cache is
+hydrated, with and without ``ElementCache.compact``. The listing and
+element json are generated locally so no SMC connection is required::
+
+    python benchmarks/memory_elements.py --count 200000
+"""
+import gc
+import argparse
+import tracemalloc
+from smc.elements.network import Host
+from smc.base.model import ElementCache
+
+
+URL = 'https://smc.example.com:8082/6.4/elements/host/{}'
+
+RELS = ('self', 'export', 'search_category_tags_from_element',
+        'history', 'duplicate', 'open', 'save', 'force_unlock')
+
+
+def listing(count):
+    return [{'name': 'host-{}'.format(i), 'href': URL.format(i), 'type': 'host'}
+            for i in range(count)]
+
+
+def element_json(index):
+    href = URL.format(index)
+    links = [{'rel': 'self', 'href': href, 'type': 'host'}]
+    links.extend({'rel': rel, 'href': '{}/{}'.format(href, rel)}
+                 for rel in RELS[1:])
+    return {'name': 'host-{}'.format(index), 'address': '10.0.0.1',
+            'comment': None, 'key': index, 'read_only': False,
+            'system': False, 'link': links}
+
+
+def measure(count, hydrate):
+    collection = Host.objects.all()
+    collection.__dict__['_list'] = listing(count)  # Bypass the SMC query
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    elements = list(collection)
+    if hydrate:
+        for index, element in enumerate(elements):
+            element.data = ElementCache(element_json(index), etag='"etag"')
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del elements
+    return used / float(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=50000)
+    args = parser.parse_args()
+
+    print('Meta only: %.0f bytes per element' % measure(args.count, False))
+    for compact in (False, True):
+        ElementCache.compact = compact
+        print('Hydrated (compact=%s): %.0f bytes per element' % (
+            compact, measure(args.count, True)))
+
+
+if __name__ == '__main__':
+    main()
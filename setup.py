@@ -28,8 +28,14 @@ setup(name='smc-python',
       license=about['__license__'],
       packages=find_packages(exclude=["*.tests", "*.tests.*", "tests.*", "tests"]),
       install_requires=[
-        'requests>=2.12.0'
+        'requests>=2.12.0',
+        'futures; python_version < "3"',
+        'ipaddress; python_version < "3"'
       ],
+      extras_require={
+        'snapshot': ['msgpack'],
+        'reconcile': ['PyYAML']
+      },
       include_package_data=True,
       classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -1,24 +1,56 @@
+"""
+smc-python
+
+Submodules and the default session are loaded when first accessed to keep
+``import smc`` inexpensive. On Python versions that do not support module
+level __getattr__ (PEP 562), they are loaded on import.
+"""
+import sys
 import atexit
 import logging
-import smc.api.session
-import smc.base.util
+import importlib
 
 
 from .__version__ import __description__, __url__, __version__
 from .__version__ import __author__, __author_email__, __license__
 
 
-manager = smc.api.session.SessionManager.create()
-atexit.register(manager.close_all)
+#: Subpackages and modules loaded on first attribute access
+_submodules = frozenset([
+    'actions', 'administration', 'api', 'base', 'compat', 'core',
+    'elements', 'policy', 'routing', 'vpn'])
 
 
-session = manager.get_default_session()
+def _init_session():
+    """
+    Create the default session manager and session. Importing the session
+    module is deferred until either the manager or session is needed.
+    """
+    if 'manager' in globals():
+        return
+    import smc.api.session
+    manager = smc.api.session.SessionManager.create()
+    atexit.register(manager.close_all)
+    globals().update(
+        manager=manager,
+        session=manager.get_default_session())
+
+
+def __getattr__(name):
+    if name in ('manager', 'session'):
+        _init_session()
+        return globals()[name]
+    if name in _submodules:
+        return importlib.import_module('{}.{}'.format(__name__, name))
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
 
 
 def get_session_by_user(user):
     """
     Get a session specifically by the user name
     """
+    _init_session()
     return manager.get_session(user)
 
 
@@ -89,11 +121,14 @@ def set_file_logger(path, log_level=logging.DEBUG, format_string=None, logger_na
         
 
 def _import_registry():
-    # Load the modules to register needed classes
-    # This should be extracted and made dynamic
+    # Load all modules to register element classes. This is not required
+    # as classes are loaded when needed using smc.base.manifest.
+    import smc.base.util
     for pkg in ('smc.policy', 'smc.elements', 'smc.routing',
                 'smc.vpn', 'smc.administration', 'smc.core'):
         smc.base.util.import_submodules(pkg)
 
-_import_registry()
-    
\ No newline at end of file
+
+if sys.version_info < (3, 7): # No module level __getattr__
+    _init_session()
+    _import_registry()
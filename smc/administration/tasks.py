@@ -17,13 +17,13 @@ An example of using a task poller when uploading an engine policy
 
 """
 import re
-import time
-import threading
+from concurrent import futures
 from smc.base.model import ElementCache, Element, SubElement
 from smc.api.exceptions import TaskRunFailed, ActionCommandFailed,\
     ResourceNotFound
 from smc.base.collection import Search
 from smc.base.util import millis_to_utc
+from smc.base.scheduler import PollJob, default_scheduler
 
 
 clean_html = re.compile(r'<.*?>')
@@ -201,46 +201,58 @@ class Task(SubElement):
             filename=filename, task=task)
 
 
-class TaskOperationPoller(object):
+class TaskOperationPoller(PollJob):
     """
     Task Operation Poller provides a way to poll the SMC
     for the status of the task operation. This is returned
     by functions that return a task. Typically these will be
     operations like refreshing policy, uploading policy, etc.
+    
+    When waiting for the task to finish, the task is polled by the
+    shared :mod:`smc.base.scheduler` instead of a thread per task. The
+    task is polled every `timeout` seconds, so `timeout * max_tries`
+    bounds the wait. When `max_interval` is larger than `timeout`, the
+    delay between polls backs off up to `max_interval` seconds and the
+    wait is longer. The pollers `future` resolves to the Task.
+    
+    :param dict task: task json returned from the SMC
+    :param int timeout: seconds between the first status checks
+    :param int max_tries: maximum number of status checks
+    :param bool wait_for_finish: poll the task until it is finished
+    :param int max_interval: maximum seconds between status checks,
+        default is `timeout` (no back off)
+    :param Scheduler scheduler: scheduler used to poll the task
     """
     def __init__(self, task, timeout=5, max_tries=36,
-                 wait_for_finish=False):
+                 wait_for_finish=False, max_interval=None, scheduler=None):
+        super(TaskOperationPoller, self).__init__(
+            interval=timeout, max_interval=max_interval or timeout,
+            max_polls=max_tries)
         self._task = Task(task)
-        self._thread = None
-        self._done = None
         self._exception = None
         self.callbacks = [] # Call after operation completes
-        if wait_for_finish:
-            self._max_tries = max_tries
-            self._timeout = timeout
-            self._done = threading.Event()
-            self._thread = threading.Thread(
-                target=self._start)
-            self._thread.daemon = True
-            self._thread.start()
-
-    def _start(self):
-        while not self.finished():
-            try:
-                time.sleep(self._timeout)
-                self._task = self._task.update_status()
-                self._max_tries -= 1
-            except Exception as e:
-                self._exception = e
-                break
-
-        self._done.set()
+        if wait_for_finish and self._task.in_progress:
+            if scheduler is None:
+                scheduler = default_scheduler
+            scheduler.add(self)
+        else:
+            self._finish()
+
+    def poll(self):
+        self._task = self._task.update_status()
+        return not self._task.in_progress
+
+    def complete(self, error=None):
+        self._exception = error
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(self._task)
         for call in self.callbacks:
             call(self.task)
 
     def finished(self):
-        return self._done.is_set() or not self._task.in_progress or \
-            self._max_tries == 0
+        return self.future.done()
 
     def add_done_callback(self, callback):
         """
@@ -251,7 +263,7 @@ class TaskOperationPoller(object):
         :param callback: a callable that takes a single argument which
             will be the completed Task.
         """
-        if self._done is None or self._done.is_set():
+        if self.future.done():
             raise ValueError('Task has already finished')
         if callable(callback):
             self.callbacks.append(callback)
@@ -269,9 +281,7 @@ class TaskOperationPoller(object):
         """
         Blocking wait for task status.
         """
-        if self._thread is None:
-            return
-        self._thread.join(timeout=timeout)
+        futures.wait([self.future], timeout=timeout)
 
     def last_message(self, timeout=5):
         """
@@ -280,8 +290,7 @@ class TaskOperationPoller(object):
 
         :rtype: str
         """
-        if self._thread is not None:
-            self._thread.join(timeout=timeout)
+        self.wait(timeout)
         return self._task.last_message
 
     def done(self):
@@ -290,7 +299,7 @@ class TaskOperationPoller(object):
 
         :rtype: bool
         """
-        return self._thread is None or not self._thread.isAlive()
+        return self.future.done()
 
     @property
     def task(self):
@@ -305,8 +314,7 @@ class TaskOperationPoller(object):
         """
         Stop the running task
         """
-        if self._thread is not None and self._thread.isAlive():
-            self._done.set()
+        self.cancel()
 
 
 class DownloadTask(TaskOperationPoller):
@@ -12,6 +12,9 @@ from smc.api.exceptions import SMCOperationFailure, SMCConnectionError, \
 def _get_session(session_manager=None):
     if not session_manager:
         session_manager = getattr(SMCRequest, '_session_manager')
+        if session_manager is None: # Default manager is created on first use
+            import smc
+            session_manager = smc.manager
     try:
         return session_manager.get_default_session() if not \
             session_manager._session_hook else \
@@ -91,6 +94,7 @@ class SMCRequest(object):
             result = e.smcresult
             try:
                 err = self.exception(result.msg)  # Exception set
+                err.code = result.code
             except AttributeError:
                 pass
         except (SessionManagerNotFound, SMCConnectionError,
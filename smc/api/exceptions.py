@@ -1,7 +1,6 @@
 '''
 Exceptions Module
 '''
-import smc.api.web
 from smc.base.util import unicode_to_bytes
 
 
@@ -63,7 +62,8 @@ class SMCOperationFailure(SMCException):
         # Response is type <class 'requests.models.Response'>
         self.response = response
         self.code = None
-        self.smcresult = smc.api.web.SMCResult()
+        from smc.api.web import SMCResult
+        self.smcresult = SMCResult()
         if response is not None:
             self._unpack_response()
 
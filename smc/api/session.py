@@ -4,7 +4,7 @@ Session module for tracking existing connection state to SMC
 import copy
 import json
 import logging
-import requests
+import threading
 import collections
 
 #import smc.api.web
@@ -228,12 +228,67 @@ class Session(object):
         
         self._manager = manager # Session Manager that tracks this session
         
-        # Transactions are supported in version 0.6.2 and beyond. When
-        # run with atomic, this session parameter indicates whether the
-        # operation in process is within an atomic block or not
-        self.in_atomic_block = False
-        # Transactions that are within the given atomic block
-        self.transactions = []
+        # Transactions are supported in version 0.6.2 and beyond. The
+        # transaction for the atomic block in process is kept per thread
+        self._local = threading.local()
+    
+    @property
+    def _transaction(self):
+        return getattr(self._local, 'transaction', None)
+    
+    @_transaction.setter
+    def _transaction(self, transaction):
+        self._local.transaction = transaction
+    
+    @property
+    def transaction(self):
+        """
+        The transaction of the atomic block currently in process in this
+        thread or None
+        
+        :rtype: smc.base.transaction.Transaction
+        """
+        return self._transaction
+    
+    @property
+    def in_atomic_block(self):
+        """
+        Whether operations are currently within an atomic block
+        
+        :rtype: bool
+        """
+        return self._transaction is not None
+    
+    @property
+    def transactions(self):
+        """
+        Operations recorded within the atomic block in process
+        
+        :rtype: list
+        """
+        return self._transaction.operations if self._transaction else []
+    
+    def atomic(self, max_workers=None):
+        """
+        Return a context manager that records element creates and updates
+        and executes them with bounded parallelism when the block exits.
+        If any operation fails, elements created by the block are deleted
+        and the exception is raised. The atomic block applies to the
+        thread that entered it; other threads using the session are not
+        recorded::
+        
+            with session.atomic() as transaction:
+                host = Host.create(name='myhost', address='1.1.1.1')
+                Group.create(name='mygroup', members=[host])
+            print(transaction.timing)
+        
+        .. seealso:: :mod:`smc.base.transaction`
+        
+        :param int max_workers: maximum concurrent requests per phase
+        :rtype: smc.base.transaction.Transaction
+        """
+        from smc.base.transaction import Transaction
+        return self._transaction or Transaction(self, max_workers)
     
     @property
     def manager(self):
@@ -558,6 +613,7 @@ class Session(object):
         :return: python requests session
         :rtype: requests.Session
         """
+        import requests
         _session = requests.session()  # empty session
         
         response = _session.post(**request)
@@ -578,6 +634,7 @@ class Session(object):
         if not self.session:
             self.manager._deregister(self)
             return
+        import requests
         try:
             r = self.session.put(self.entry_points.get('logout'))
             if r.status_code == 204:
@@ -743,6 +800,7 @@ class Credential(object):
 
 
 def load_entry_points(self):
+    import requests
     try:
         r = self.session.get('{url}/{api_version}/api'.format(
                 url=self.url, api_version=self.api_version))
@@ -769,6 +827,7 @@ def available_api_versions(base_url, timeout=10, verify=True):
     :return version numbers
     :rtype: list
     """
+    import requests
     try:
         r = requests.get('%s/api' % base_url, timeout=timeout,
                          verify=verify)  # no session required
@@ -5,11 +5,12 @@ SSL certificates are not verified to the CA authority, need to implement for
 urllib3:
 https://urllib3.readthedocs.io/en/latest/user-guide.html#ssl
 """
+import io
 import json
+import uuid
 import os.path
 import collections
 import logging
-import requests
 from smc.api.exceptions import SMCOperationFailure, SMCConnectionError
 
 
@@ -41,6 +42,7 @@ def send_request(user_session, method, request):
     :rtype: SMCResult
     """
     if user_session.session:
+        import requests # Loaded by login, deferred to keep import time low
         session = user_session.session # requests session
         try:
             method = method.upper() if method else ''
@@ -113,8 +115,10 @@ def send_request(user_session, method, request):
 
                 counters.update(delete=1)
 
-                # Conflict (409) if ETag is not current
-                if response.status_code in (409,):
+                # Conflict (409) if ETag is not current. Retry with the
+                # current ETag unless disabled on the request
+                if response.status_code in (409,) and \
+                    getattr(request, 'retry_on_conflict', True):
                     req = session.get(request.href)
                     etag = req.headers.get('ETag')
                     response = session.delete(
@@ -200,10 +204,17 @@ def file_upload(user_session, method, request):
     http_command = getattr(user_session.session, method.lower())
     
     try:
-        response = http_command(
-            request.href,
-            params=request.params,
-            files=request.files)
+        if isinstance(request.files, MultipartFile):
+            response = http_command(
+                request.href,
+                params=request.params,
+                data=request.files,
+                headers={'Content-Type': request.files.content_type})
+        else:
+            response = http_command(
+                request.href,
+                params=request.params,
+                files=request.files)
     except AttributeError:
         raise TypeError('File specified in request was not readable: %s' % request.files)
     else:
@@ -213,6 +224,55 @@ def file_upload(user_session, method, request):
         
         raise SMCOperationFailure(response)                
 
+
+
+class MultipartFile(object):
+    """
+    A multipart/form-data body for a single file that is read from the
+    file as it is sent, instead of being built in memory. Provide as the
+    `files` of a request to stream large uploads::
+    
+        with open('iplist.zip', 'rb') as fp:
+            SMCRequest(href=href, files=MultipartFile(
+                'ip_addresses', 'iplist.zip', fp)).create()
+    
+    :param str name: form field name
+    :param str filename: file name sent in the form
+    :param fileobj: file like object opened in binary mode and positioned
+        at the start of the content
+    :param str content_type: content type of the file
+    """
+    def __init__(self, name, filename, fileobj,
+                 content_type='application/octet-stream'):
+        self.boundary = uuid.uuid4().hex
+        header = ('--{}\r\nContent-Disposition: form-data; name="{}"; '
+                  'filename="{}"\r\nContent-Type: {}\r\n\r\n'.format(
+                      self.boundary, name, filename, content_type)).encode('utf-8')
+        footer = '\r\n--{}--\r\n'.format(self.boundary).encode('utf-8')
+        start = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell() - start
+        fileobj.seek(start)
+        self._parts = [io.BytesIO(header), fileobj, io.BytesIO(footer)]
+        #: Length of the body, used for the Content-Length header
+        self.len = len(header) + size + len(footer)
+    
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary={}'.format(self.boundary)
+    
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
+
     
 class SMCResult(object):
     """
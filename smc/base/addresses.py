@@ -0,0 +1,254 @@
+"""
+Parse and normalize IP addresses, networks and ranges used as IPList
+entries.
+
+Entries are normalized so equivalent values compare equal, i.e.
+'10.0.0.1/32' and '10.0.0.1' are both normalized to '10.0.0.1' and
+'10.0.0.5/24' is normalized to '10.0.0.0/24'. Ranges are provided as
+'<first>-<last>'.
+"""
+import csv
+import sys
+import socket
+import struct
+import zipfile
+import ipaddress
+import collections
+from smc.compat import unicode
+
+
+def parse(entry):
+    """
+    Parse an address, network or range into networks. A range is
+    converted into the smallest list of networks covering the range.
+
+    :param str entry: IP address, network or range
+    :raises ValueError: entry is not a valid IP address, network or range
+    :rtype: list(ipaddress.IPv4Network, ipaddress.IPv6Network)
+    """
+    entry = unicode(entry).strip()
+    if '/' not in entry and ':' not in entry and '-' not in entry:
+        try: # Fast path for IPv4 addresses
+            address = struct.unpack('!I', socket.inet_pton(socket.AF_INET, entry))
+            return [ipaddress.IPv4Network((address[0], 32))]
+        except (socket.error, ValueError, AttributeError):
+            pass
+    if '-' in entry:
+        first, last = (ipaddress.ip_address(value.strip())
+                       for value in entry.split('-', 1))
+        return list(ipaddress.summarize_address_range(first, last))
+    return [ipaddress.ip_network(entry, strict=False)]
+
+
+def normalize(entry):
+    """
+    Return the normalized string for an address, network or range.
+    Host networks are returned as the address without the prefix.
+
+    :param str entry: IP address, network or range
+    :raises ValueError: invalid entry
+    :rtype: str
+    """
+    entry = unicode(entry).strip()
+    if '/' not in entry and ':' not in entry and '-' not in entry:
+        try: # Fast path for IPv4 addresses
+            return socket.inet_ntop(
+                socket.AF_INET, socket.inet_pton(socket.AF_INET, entry))
+        except (socket.error, ValueError, AttributeError):
+            pass
+    if '-' in entry:
+        first, last = (ipaddress.ip_address(value.strip())
+                       for value in entry.split('-', 1))
+        if first.version != last.version or first > last:
+            raise ValueError('Invalid range: %s' % entry)
+        if first == last:
+            return str(first)
+        return '{}-{}'.format(first, last)
+    network = ipaddress.ip_network(entry, strict=False)
+    if network.num_addresses == 1:
+        return str(network.network_address)
+    return str(network)
+
+
+def normalize_all(entries, errors=None, unique=True):
+    """
+    Generator of normalized entries. Blank lines and lines starting
+    with '#' are ignored.
+
+    :param iterable entries: IP addresses, networks or ranges
+    :param list errors: if provided, invalid entries are appended to this
+        list (or :class:`ErrorSample`) and skipped, otherwise ValueError
+        is raised
+    :param bool unique: remove duplicate entries. This keeps a set of
+        the entries seen
+    :raises ValueError: invalid entry and errors is not provided
+    :rtype: str
+    """
+    seen = set()
+    for entry in entries:
+        entry = unicode(entry).strip()
+        if not entry or entry.startswith('#'):
+            continue
+        try:
+            value = normalize(entry)
+        except ValueError:
+            if errors is None:
+                raise
+            errors.append(entry)
+            continue
+        if not unique:
+            yield value
+        elif value not in seen:
+            seen.add(value)
+            yield value
+
+
+class ErrorSample(object):
+    """
+    Counts invalid entries and keeps the first entries as a sample
+    without growing with the number of invalid entries.
+
+    :param int size: number of invalid entries to keep
+    """
+    def __init__(self, size=100):
+        self.size = size
+        self.count = 0
+        self.entries = []
+
+    def append(self, entry):
+        self.count += 1
+        if len(self.entries) < self.size:
+            self.entries.append(entry)
+
+    def __len__(self):
+        return self.count
+
+
+def iter_entries(source, column=None, delimiter=','):
+    """
+    Generator of entries read from a feed. The source can be any
+    iterable of lines, such as a file opened in text or binary mode.
+    Lines are stripped of comments starting with '#' or ';' and only the
+    first word is used, so feeds in the format ``1.2.3.0/24 ; SBL123``
+    are supported. If a CSV column is provided, the entry is read from
+    that column of each row instead.
+
+    :param iterable source: lines of the feed
+    :param column: CSV column index, or column name if the first row
+        is a header
+    :type column: int, str
+    :param str delimiter: CSV delimiter
+    :rtype: str
+    """
+    lines = (line.decode('utf-8', 'replace') if isinstance(line, bytes)
+             else line for line in source)
+    if column is None:
+        for line in lines:
+            for marker in ('#', ';'):
+                line = line.split(marker, 1)[0]
+            words = line.split()
+            if words:
+                yield words[0]
+        return
+
+    rows = csv.reader(lines, delimiter=str(delimiter))
+    if not isinstance(column, int):
+        header = next(rows, [])
+        if column not in header:
+            raise ValueError('Column %r not found in CSV header: %s' %
+                (column, header))
+        column = header.index(column)
+    for row in rows:
+        if len(row) > column and row[column].strip():
+            yield row[column].strip()
+
+
+def _interval(entry):
+    """
+    Return the (version, first, last) integer intervals of an entry
+    """
+    if '/' not in entry and ':' not in entry and '-' not in entry:
+        try: # Fast path for IPv4 addresses
+            address = struct.unpack('!I', socket.inet_pton(socket.AF_INET, entry))[0]
+            return [(4, address, address)]
+        except (socket.error, ValueError, AttributeError):
+            pass
+    return [(network.version, int(network.network_address),
+             int(network.broadcast_address)) for network in parse(entry)]
+
+
+def collapse(entries):
+    """
+    Collapse entries into the smallest list of networks. Ranges and
+    adjacent or overlapping networks are merged.
+
+    :param iterable entries: IP addresses, networks or ranges
+    :rtype: list(str)
+    """
+    intervals = sorted(interval for entry in entries
+                       for interval in _interval(unicode(entry).strip()))
+    merged = []
+    for version, first, last in intervals:
+        if merged and merged[-1][0] == version and first <= merged[-1][2] + 1:
+            if last > merged[-1][2]:
+                merged[-1][2] = last
+        else:
+            merged.append([version, first, last])
+
+    result = []
+    for version, first, last in merged:
+        address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+        for network in ipaddress.summarize_address_range(
+            address(first), address(last)):
+            result.append(str(network.network_address) if
+                network.num_addresses == 1 else str(network))
+    return result
+
+
+def diff(current, desired):
+    """
+    Compare two collections of normalized entries.
+
+    :param iterable current: current entries
+    :param iterable desired: desired entries
+    :return: entries to add and entries to remove, in their original order
+    :rtype: tuple(list, list)
+    """
+    current = list(current)
+    desired = list(desired)
+    current_set, desired_set = set(current), set(desired)
+    return ([entry for entry in desired if entry not in current_set],
+            [entry for entry in current if entry not in desired_set])
+
+
+def write_zip(entries, fileobj, arcname='iplist.txt'):
+    """
+    Write entries to a zip archive containing a text file with one
+    entry per line.
+
+    :param iterable entries: entries to write
+    :param fileobj: file like object opened for writing in binary mode
+    :param str arcname: name of the text file within the archive
+    :return: number of entries written
+    :rtype: int
+    """
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if sys.version_info >= (3, 6): # Stream entries into the archive
+            with archive.open(arcname, 'w', force_zip64=True) as text:
+                lines = []
+                for entry in entries:
+                    lines.append(entry)
+                    count += 1
+                    if len(lines) == 4096:
+                        text.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                        lines = []
+                if lines:
+                    text.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        else:
+            lines = []
+            for entry in entries:
+                lines.append('{}\n'.format(entry))
+                count += 1
+            archive.writestr(arcname, ''.join(lines))
+    return count
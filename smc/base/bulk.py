@@ -0,0 +1,285 @@
+"""
+Bulk operations on elements.
+
+Bulk operations run many independent requests concurrently and report the
+outcome of each item instead of stopping on the first failure. Creating
+elements in bulk is available on any :class:`smc.base.model.Element` class
+that provides a ``create`` classmethod::
+
+    >>> from smc.elements.network import Host
+    >>> result = Host.bulk_create([
+    ...     {'name': 'host-1', 'address': '1.1.1.1'},
+    ...     {'name': 'host-2', 'address': '1.1.1.2'}], max_workers=8)
+    >>> result
+    BulkResult(succeeded=2, failed=0)
+    >>> result.elements
+    [Host(name=host-1), Host(name=host-2)]
+    >>> for kwargs, error in result.errors:
+    ...     print(kwargs['name'], error)
+
+Elements can be deleted in bulk with :func:`bulk_delete`. Elements that
+reference other elements being deleted are deleted first and elements in
+use by elements that are not being deleted are reported as blocked::
+
+    >>> from smc.base.bulk import bulk_delete
+    >>> result = bulk_delete(elements, index=index)
+    >>> result
+    BulkDeleteResult(succeeded=120, failed=0, blocked=3)
+    >>> for element, referenced_by in result.blocked:
+    ...     print(element, [ref['name'] for ref in referenced_by])
+
+The number of requests in flight is adjusted while the operation runs; it
+ramps up while requests succeed and backs off when requests fail.
+"""
+import collections
+from smc.base.workers import adaptive_map, AdaptiveLimiter, DEFAULT_WORKERS
+from smc.api.common import SMCRequest
+from smc.api.exceptions import CreateElementFailed, DeleteElementFailed
+
+
+class BulkResult(object):
+    """
+    Result of a bulk operation. Results are kept in the same order
+    as the provided input.
+
+    :ivar list results: list of :class:`smc.base.workers.WorkResult`
+    """
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def elements(self):
+        """
+        Elements for all items that succeeded
+
+        :rtype: list(Element)
+        """
+        return [result.result for result in self.results if result.ok]
+
+    @property
+    def errors(self):
+        """
+        Input item and exception for all items that failed
+
+        :rtype: list(tuple)
+        """
+        return [(result.item, result.error) for result in self.results
+                if not result.ok]
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __bool__(self):
+        return not self.errors
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        failed = len(self.errors)
+        return '%s(succeeded=%s, failed=%s)' % (
+            self.__class__.__name__, len(self) - failed, failed)
+
+
+def bulk_create(cls, elements, max_workers=None):
+    """
+    Create many elements of the given class concurrently. Each item is
+    a dict of keyword arguments for the classes ``create`` method. Created
+    elements are added to the meta cache, if enabled, so later references
+    by name do not require a search.
+
+    :param Element cls: element class with a create classmethod
+    :param list(dict) elements: keyword arguments for each element
+    :param int max_workers: maximum number of concurrent requests
+    :raises CreateElementFailed: the class does not have a create method
+    :rtype: BulkResult
+    """
+    if not hasattr(cls, 'create'):
+        raise CreateElementFailed('%s does not have a create method and '
+            'cannot be created in bulk.' % cls.__name__)
+
+    from smc.base.model import ElementBase, meta_cache
+
+    def create(kwargs):
+        element = cls.create(**kwargs)
+        if isinstance(element, ElementBase):
+            meta_cache.add(element)
+        return element
+
+    limiter = AdaptiveLimiter(initial=2, maximum=max_workers or DEFAULT_WORKERS)
+    return BulkResult(adaptive_map(create, elements, max_workers, limiter))
+
+
+class BulkDeleteResult(BulkResult):
+    """
+    Result of a bulk delete. In addition to the results of the delete
+    requests, elements that were not deleted because they are referenced
+    by elements that are not deleted are provided in `blocked`.
+
+    :ivar list blocked: tuples of (element, referenced_by) where
+        referenced_by is a list of dict with the 'href', 'type' and 'name'
+        of the referencing elements
+    """
+    def __init__(self, results, blocked=None):
+        super(BulkDeleteResult, self).__init__(results)
+        self.blocked = blocked or []
+
+    def __bool__(self):
+        return not self.errors and not self.blocked
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        failed = len(self.errors)
+        return '%s(succeeded=%s, failed=%s, blocked=%s)' % (
+            self.__class__.__name__, len(self) - failed, failed,
+            len(self.blocked))
+
+
+def delete_layers(elements, index):
+    """
+    Plan the order to delete elements. An element must be deleted before
+    the elements it references, so each layer only contains elements that
+    are not referenced by elements in the same or later layers. Elements
+    referenced by elements that are not being deleted are blocked, as are
+    the elements they reference in turn.
+
+    :param list elements: elements to delete
+    :param ReferenceIndex index: reference index
+    :return: list of layers and dict of blocked href: referencing hrefs.
+        Elements with circular references are placed in a final layer
+    :rtype: tuple(list(list(Element)), dict)
+    """
+    pending = collections.OrderedDict(
+        (element.href, element) for element in elements)
+    referenced_by = {href: set(ref['href'] for ref in index.referenced_by(href))
+                     for href in pending}
+    # Elements being deleted that each element references
+    references = {href: set() for href in pending}
+    for href, sources in referenced_by.items():
+        for source in sources:
+            if source in references:
+                references[source].add(href)
+
+    # Block elements used by elements that are kept, then the elements
+    # they reference in turn
+    kept = set()
+    stack = list(pending)
+    while stack:
+        href = stack.pop()
+        if href in pending and any(source not in pending
+                                   for source in referenced_by[href]):
+            del pending[href]
+            kept.add(href)
+            stack.extend(target for target in references[href]
+                         if target in pending)
+    blocked = collections.OrderedDict(
+        (element.href, set(source for source in referenced_by[element.href]
+                           if source not in pending))
+        for element in elements if element.href in kept)
+
+    # Kahn's algorithm, an element is ready when no pending element
+    # references it
+    position = dict((href, number) for number, href in enumerate(pending))
+    remaining = dict((href, len(referenced_by[href])) for href in pending)
+    ready = [href for href in pending if not remaining[href]]
+    layers = []
+    while remaining:
+        if not ready: # Circular references
+            ready = list(remaining)
+        layer = sorted(ready, key=position.get)
+        next_ready = []
+        for href in layer:
+            del remaining[href]
+        for href in layer:
+            for target in references[href]:
+                if target in remaining:
+                    remaining[target] -= 1
+                    if not remaining[target]:
+                        next_ready.append(target)
+        layers.append([pending[href] for href in layer])
+        ready = next_ready
+    return layers, blocked
+
+
+def bulk_delete(elements, index=None, max_workers=None):
+    """
+    Delete many elements in dependency order. Elements in each layer
+    of the plan (see :func:`delete_layers`) are deleted concurrently. Each
+    delete is conditional on the elements ETag so an element modified
+    since it was read is not deleted. The ETag held in each elements cache
+    is used; the ETags of elements that are not loaded are fetched
+    concurrently before deleting. If an element fails to delete, the
+    elements it references are not attempted and are reported as blocked.
+
+    If an index is not provided, one is built from the elements that are
+    already loaded, so only references between the elements being deleted
+    are known. Provide a :class:`smc.mirror.references.ReferenceIndex`
+    that includes the elements that may use them to find blocked elements
+    before sending requests. Deleted elements are removed from the index.
+
+    :param list elements: elements to delete
+    :param ReferenceIndex index: reference index
+    :param int max_workers: maximum number of concurrent requests
+    :rtype: BulkDeleteResult
+    """
+    from smc.base.model import LoadElement, meta_cache
+    from smc.base.snapshot import snapshot_cache
+    from smc.mirror.references import ReferenceIndex
+
+    elements = list(elements)
+    if index is None:
+        index = ReferenceIndex()
+        index.update([element for element in elements
+                      if 'data' in vars(element)])
+
+    def delete(element):
+        etag = etags.get(element.href)
+        if isinstance(etag, Exception):
+            raise etag
+        SMCRequest(
+            href=element.href,
+            headers={'if-match': etag} if etag else {},
+            exception=DeleteElementFailed,
+            retry_on_conflict=False).delete()
+        meta_cache.discard(element)
+        snapshot_cache.discard(element.href)
+        return element
+
+    layers, blocked = delete_layers(elements, index)
+    by_href = {element.href: element for element in elements}
+    limiter = AdaptiveLimiter(initial=2, maximum=max_workers or DEFAULT_WORKERS)
+
+    # Deletes are conditional, fetch the ETags of elements not loaded
+    etags, unloaded = {}, []
+    for element in [element for layer in layers for element in layer]:
+        etag = getattr(vars(element).get('data'), '_etag', None)
+        if etag is not None:
+            etags[element.href] = etag
+        else:
+            unloaded.append(element)
+    for result in adaptive_map(
+        lambda element: LoadElement(element.href, only_etag=True),
+        unloaded, max_workers, limiter):
+        etags[result.item.href] = result.result if result.ok else result.error
+
+    results, failed = [], set()
+    for layer in layers:
+        runnable = []
+        for element in layer:
+            remaining = set(ref['href'] for ref in index.referenced_by(element)
+                            if ref['href'] in failed or ref['href'] in blocked)
+            if remaining:
+                blocked[element.href] = remaining
+            else:
+                runnable.append(element)
+        for result in adaptive_map(delete, runnable, max_workers, limiter):
+            results.append(result)
+            if result.ok:
+                index.remove(result.item.href)
+            else:
+                failed.add(result.item.href)
+
+    return BulkDeleteResult(results, [
+        (by_href[href], [index.describe(source) for source in sorted(sources)])
+        for href, sources in blocked.items()])
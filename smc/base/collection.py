@@ -80,7 +80,7 @@ class SubElementCollection(object):
         resources = []
         for r in engine.data.get(reference, []):
             for _, data in r.items():    
-                cache = smc.base.model.ElementCache(data)
+                cache = smc.base.model.ElementCache(data, compact=False)
                 res = self.cls(
                     name=cache.get('name'),
                     href=cache.get_link('self'),
@@ -50,20 +50,28 @@ Element class relationship (abbreviated)::
 Classes that do not require state on retrieved json or provide basic
 container functionality may inherit from object.
 """
+import json
+import time
+import importlib
 import collections
 import smc.base.collection
-from smc.compat import string_types
+from smc.compat import string_types, intern
 from smc.base.structs import NestedDict
+from smc.base.manifest import MANIFEST
 from smc.base.decorators import cached_property, classproperty, exception,\
     create_hook, with_metaclass
-from smc.api.common import SMCRequest, fetch_meta_by_name, fetch_entry_point
+from smc.api.common import SMCRequest, fetch_meta_by_name, fetch_entry_point,\
+    _get_session
+from smc.api.web import CacheEncoder
 from smc.api.exceptions import ElementNotFound, \
     CreateElementFailed, ModificationFailed, ResourceNotFound,\
     DeleteElementFailed, FetchElementFailed, UpdateElementFailed,\
-    UnsupportedEntryPoint
+    UnsupportedEntryPoint, SessionManagerNotFound
 from .util import bytes_to_unicode, unicode_to_bytes, merge_dicts
 from smc.base.mixins import RequestAction, UnicodeMixin
 from smc.base.util import element_resolver
+from smc.base.workers import parallel_map
+from smc.base.snapshot import snapshot_cache
 
 
 @exception
@@ -80,19 +88,41 @@ def prepared_request(*exception, **kwargs):  # @UnusedVariable
 def LoadElement(href, only_etag=False):
     """
     Return an instance of a element as a ElementCache dict
-    used as a cache.
+    used as a cache. If the element is in the snapshot cache, the
+    request is conditional on the cached ETag and the cached json
+    is used when the element has not changed.
     
     :rtype ElementCache
     """
     request = SMCRequest(href=href)
     request.exception = FetchElementFailed
+    cached = None if only_etag else snapshot_cache.get(href)
+    if cached:
+        request.headers.update({'If-None-Match': cached[1]})
     result = request.read()
     if only_etag:
         return result.etag
+    if cached:
+        if result.code == 304:
+            return ElementCache(cached[0], etag=cached[1])
+        snapshot_cache.refresh(href, result.json, result.etag)
     return ElementCache(
         result.json, etag=result.etag)
 
 
+def current_transaction():
+    """
+    Return the transaction for the atomic block in process on the
+    current session, or None.
+    
+    :rtype: smc.base.transaction.Transaction
+    """
+    try:
+        return getattr(_get_session(), 'transaction', None)
+    except SessionManagerNotFound:
+        return None
+
+
 @create_hook
 def ElementCreator(cls, json, **kwargs):
     """
@@ -112,6 +142,10 @@ def ElementCreator(cls, json, **kwargs):
         kwargs.update(exception=CreateElementFailed)
     href = kwargs.pop('href') if 'href' in kwargs else cls.href
     
+    transaction = current_transaction()
+    if transaction is not None:
+        return transaction.add_create(cls, json, href, **kwargs)
+    
     result = SMCRequest(
         href=href,
         json=json,
@@ -122,8 +156,6 @@ def ElementCreator(cls, json, **kwargs):
         type=cls.typeof,
         href=result.href)
     
-    if result.user_session.in_atomic_block:
-        result.user_session.transactions.append(element)
     return element
 
 
@@ -153,11 +185,144 @@ def ElementFactory(href, smcresult=None, raise_exc=None):
         raise raise_exc(smcresult.msg)
 
 
+def _fingerprint(value):
+    """
+    Hashable fingerprint of a top level json value used to detect
+    modifications. None is returned if the value cannot be serialized,
+    in which case the value is always considered modified.
+    """
+    try:
+        return hash(json.dumps(value, sort_keys=True, cls=CacheEncoder))
+    except (TypeError, ValueError):
+        return None
+
+
+#: Fingerprint of a key that is not in the json
+_MISSING = object()
+
+
+#: Link templates shared between element caches in compact mode
+_link_templates = {}
+
+
+def _link_template(links):
+    """
+    Convert an elements list of links into the elements self href and a
+    shared template. Links are stored as a suffix of the elements self
+    href so elements of the same type share the same template. The
+    template is a tuple of (rel, href suffix, type).
+    
+    Links with an href that is not relative to the self href, i.e. links
+    to other elements, are unique per element and would grow the shared
+    templates without bound, so these elements keep their links.
+    
+    :return: tuple of self href, template or None if the links cannot
+        be represented
+    """
+    self_href = None
+    for link in links:
+        if link.get('rel') == 'self':
+            self_href = link.get('href')
+    if not self_href or any(set(link) - set(('rel', 'href', 'type')) or
+                            not (link.get('href') or '').startswith(self_href)
+                            for link in links):
+        return None
+    template = tuple(
+        (intern(str(link.get('rel'))),
+         intern(str(link['href'][len(self_href):])), link.get('type'))
+        for link in links)
+    return self_href, _link_templates.setdefault(template, template)
+
+
 class ElementCache(NestedDict):
+    """
+    Cache for an elements json. When the cache is created from a server
+    response (an ETag is provided), modifications are detected with a
+    fingerprint of each top level value. Fingerprints are taken lazily,
+    when a value is first returned from, set in or deleted from the cache,
+    so loading an element costs nothing extra and in place changes to
+    nested values are still found.
+    
+    When `compact` is enabled on the class, the elements links are not
+    kept in the json and are stored as the elements self href and a link
+    template shared by all elements with the same link layout. The links
+    are rebuilt when the 'link' key is accessed. This reduces memory when
+    hydrating large numbers of elements::
+    
+        ElementCache.compact = True
+    
+    .. note:: In compact mode the links are not sent when updating an
+        element. Links are read only and not required by the SMC API.
+    
+    The json provided is not modified; a compact cache keeps a copy of
+    the top level json without the links. Pass `compact=False` for json
+    nested within another elements json so the cache shares the json
+    owned by the parent and keeps the links sent when the parent is
+    updated.
+    """
+    #: Store links as shared templates to reduce memory use
+    compact = False
+    
     def __init__(self, data=None, **kw):
         self._etag = kw.pop('etag', None)
+        compact = kw.pop('compact', self.compact)
+        self._dirty = set()
+        self._fingerprints = None
+        self._links = None # (self href, template) in compact mode
         super(ElementCache, self).__init__(data=
             data if data else {})
+        if compact and isinstance(self.data.get('link'), list):
+            self._links = _link_template(self.data['link'])
+            if self._links:
+                # Copy so the callers json keeps its links
+                self.data = {key: value for key, value in self.data.items()
+                             if key != 'link'}
+        if self._etag is not None:
+            self._fingerprints = {}
+    
+    def _track(self, key):
+        # Fingerprint the value of a key as loaded before it can be
+        # modified, keys that were not loaded are _MISSING
+        if self._fingerprints is not None and key not in self._fingerprints:
+            self._fingerprints[key] = _fingerprint(self.data[key]) \
+                if key in self.data else _MISSING
+    
+    def __getitem__(self, key):
+        if key == 'link' and self._links:
+            self_href, template = self._links
+            return [{'rel': rel, 'href': self_href + href, 'type': typeof}
+                    if typeof else {'rel': rel, 'href': self_href + href}
+                    for rel, href, typeof in template]
+        value = self.data[key]
+        if isinstance(value, (dict, list)):
+            # Mutable values can be modified in place by the caller
+            self._track(key)
+        return value
+    
+    def __setitem__(self, key, value):
+        if key == 'link':
+            self._links = None
+            self.__dict__.pop('_links_index', None)
+        self._track(key)
+        self._dirty.add(key)
+        super(ElementCache, self).__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        if key == 'link' and self._links:
+            self._links = None
+            self._dirty.add(key)
+            return
+        self._track(key)
+        self._dirty.add(key)
+        super(ElementCache, self).__delitem__(key)
+    
+    def __iter__(self):
+        if self._links:
+            return iter(list(self.data) + ['link'])
+        return iter(self.data)
+    
+    def __len__(self):
+        return len(self.data) + (1 if self._links else 0)
 
     def etag(self, href):
         """
@@ -168,12 +333,78 @@ class ElementCache(NestedDict):
             self._etag = LoadElement(href, only_etag=True)
         return self._etag
     
-    @cached_property
+    def mark_clean(self, etag=None):
+        """
+        Consider the current contents of the cache as the servers version
+        of the element, optionally setting a new ETag. This is called after
+        the cache is successfully updated on the server. Values that were
+        returned from the cache are fingerprinted again as they may still
+        be modified in place.
+        
+        :param str etag: optional new etag for the cache
+        :return: None
+        """
+        if etag is not None:
+            self._etag = etag
+        self._dirty.clear()
+        keys = self.data if self._fingerprints is None else self._fingerprints
+        self._fingerprints = {key: _fingerprint(self.data[key])
+            for key in keys if key in self.data and
+            isinstance(self.data[key], (dict, list))}
+    
+    @property
+    def dirty_keys(self):
+        """
+        Top level keys of the element json that have been added, removed
+        or modified since the cache was loaded. If the cache was not loaded
+        from the server, only keys set or deleted through the cache are
+        known.
+        
+        :rtype: set
+        """
+        if self._fingerprints is None:
+            return set(self._dirty)
+        dirty = set()
+        for key, fingerprint in list(self._fingerprints.items()):
+            current = _fingerprint(self.data[key]) if key in self.data \
+                else _MISSING
+            if fingerprint is None or fingerprint != current:
+                dirty.add(key)
+        return dirty
+    
+    @property
+    def is_dirty(self):
+        """
+        Whether the cache has been modified since it was loaded from the
+        server. A cache that was not loaded from the server is always
+        considered modified.
+        
+        :rtype: bool
+        """
+        return self._fingerprints is None or bool(self.dirty_keys)
+    
+    @property
     def links(self):
-        return {link['rel']:link['href'] for link in self['link']}
+        """
+        Links of this element as dict of rel: href. The index is built
+        when first accessed.
+        
+        :rtype: dict
+        """
+        if self._links:
+            self_href, template = self._links
+            return {rel: self_href + href for rel, href, _ in template}
+        if '_links_index' not in self.__dict__:
+            self.__dict__['_links_index'] = {
+                link['rel']:link['href'] for link in self['link']}
+        return self.__dict__['_links_index']
     
     @property
     def type(self):
+        if self._links:
+            for rel, _, typeof in self._links[1]:
+                if rel == 'self':
+                    return typeof
         for link in self.get('link', []):
             if link.get('rel') == 'self':
                 return link.get('type')
@@ -182,7 +413,12 @@ class ElementCache(NestedDict):
         """
         Return link for specified resource
         """
-        if rel in self.links:
+        if self._links:
+            self_href, template = self._links
+            for _rel, href, _ in template:
+                if _rel == rel:
+                    return self_href + href
+        elif rel in self.links:
             return self.links[rel]
         raise ResourceNotFound('Resource requested: %r is not available '
             'on this element.' % rel)
@@ -245,6 +481,10 @@ class ElementLocator(object):
             return instance._meta.href
         if hasattr(cls, 'typeof'):
             if instance is not None:
+                meta = meta_cache.get(instance.typeof, instance.name)
+                if meta:
+                    instance._meta = meta
+                    return meta.href
                 element = fetch_meta_by_name(
                     instance.name,
                     filter_context=instance.typeof)
@@ -266,6 +506,148 @@ class ElementLocator(object):
                 'and cannot be referenced directly, type: {}'.format(instance))
 
 
+class MetaCache(object):
+    """
+    Process wide cache of element meta by element type and name. When
+    enabled, this is populated when elements are created in bulk or
+    loaded from a snapshot so that subsequent references to those
+    elements by name, i.e. ``Host('myhost')``, do not require a search to
+    find the element href. Entries are scoped to the domain of the current
+    session and removed when the element is deleted or renamed through
+    smc-python.
+    
+    Elements deleted or renamed by other clients are not seen, so the
+    cache is disabled by default and entries expire after `ttl` seconds::
+    
+        from smc.base.model import meta_cache
+        meta_cache.enabled = True
+        meta_cache.ttl = 600
+    
+    :ivar bool enabled: whether elements are added to the cache
+    :ivar int ttl: seconds an entry is used, None to never expire
+    """
+    def __init__(self, enabled=False, ttl=300):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._meta = {}
+    
+    def _key(self, typeof, name):
+        try:
+            domain = _get_session().domain
+        except Exception:
+            return None
+        return (domain, typeof, name)
+    
+    def get(self, typeof, name):
+        """
+        Return the meta for the element type and name or None
+        
+        :rtype: Meta
+        """
+        if self._meta:
+            key = self._key(typeof, name)
+            entry = self._meta.get(key)
+            if entry is not None:
+                meta, expires = entry
+                if expires is None or expires > time.time():
+                    return meta
+                self._meta.pop(key, None)
+    
+    def add(self, element):
+        """
+        Add the meta for the given element to the cache, if the cache
+        is enabled
+        
+        :param Element element: element with meta
+        """
+        if self.enabled and element._meta and element._meta.href:
+            key = self._key(element.typeof, element.name)
+            if key:
+                self._meta[key] = (element._meta, time.time() + self.ttl
+                    if self.ttl is not None else None)
+    
+    def discard(self, element):
+        """
+        Remove the element from the cache if it exists
+        
+        :param Element element: element to remove
+        """
+        if self._meta:
+            self._meta.pop(self._key(getattr(element, 'typeof', None),
+                element.name), None)
+    
+    def clear(self):
+        self._meta.clear()
+    
+    def __len__(self):
+        return len(self._meta)
+
+
+#: Meta cache used when resolving elements by name
+meta_cache = MetaCache()
+
+
+#: Number of unresolved elements of a single type at which a single listing
+#: of the element type is used instead of one search per element name. A
+#: listing returns every element of the type, so this is kept high enough
+#: that the listing is not larger than the searches it replaces.
+RESOLVE_LISTING_THRESHOLD = 100
+
+
+def resolve_elements(elements, max_workers=None, listing_threshold=None):
+    """
+    Resolve the meta for many :class:`Element` instances that were created
+    by name only, i.e. ``[Host('foo'), Host('bar')]``. Accessing `href` on
+    each of these would run one search per element. Instead, unresolved
+    elements are grouped by typeof and each group is resolved either
+    with one listing of the element type (larger groups) or with concurrent
+    searches by name (smaller groups). The resolved meta is set on each
+    instance so subsequent access to `href` does not require a query.
+
+    :param list elements: elements to resolve, any items that are not
+        unresolved Element instances are ignored
+    :param int max_workers: max concurrent searches per type
+    :param int listing_threshold: number of names of a type at which the
+        type is listed instead of searched, default is
+        :data:`RESOLVE_LISTING_THRESHOLD`
+    :return: elements that could not be found
+    :rtype: list(Element)
+    """
+    unresolved = collections.OrderedDict()
+    for element in elements:
+        if isinstance(element, Element) and element._meta is None and \
+            getattr(element, 'typeof', None):
+            element._meta = meta_cache.get(element.typeof, element.name)
+            if element._meta is None:
+                unresolved.setdefault(element.typeof, []).append(element)
+
+    if listing_threshold is None:
+        listing_threshold = RESOLVE_LISTING_THRESHOLD
+    not_found = []
+    for typeof, group in unresolved.items():
+        names = set(element.name for element in group)
+        if len(names) >= listing_threshold:
+            found = {meta.get('name'): meta for meta in SMCRequest(
+                params={'filter_context': typeof}).read().json or []}
+        else:
+            found = {}
+            for result in parallel_map(
+                lambda name: fetch_meta_by_name(name, filter_context=typeof),
+                names, max_workers):
+                if not result.ok:
+                    raise result.error
+                if result.result.json:
+                    found[result.item] = result.result.json[0]
+
+        for element in group:
+            meta = found.get(element.name)
+            if meta:
+                element._meta = Meta(**meta)
+            else:
+                not_found.append(element)
+    return not_found
+
+
 class ElementMeta(type):
     """
     Element metaclass that registers classes with the typeof
@@ -274,7 +656,7 @@ class ElementMeta(type):
     _map = {}
     def __new__(meta, name, bases, clsdict):  # @NoSelf
         cls = super(ElementMeta, meta).__new__(meta, name, bases, clsdict)
-        if 'typeof' in clsdict:
+        if 'typeof' in clsdict and not clsdict.get('_dynamic'):
             meta._map[clsdict['typeof']] = cls
         return cls
 
@@ -359,8 +741,11 @@ class ElementBase(RequestAction, UnicodeMixin):
             pass
     
     def __getstate__(self):
+        # Only include the elements data if it has already been loaded
         state = self.__dict__.copy()
-        state.update(data=self.data.data)
+        if 'data' in state:
+            cache = state.pop('data')
+            state.update(data=dict(cache), _etag=getattr(cache, '_etag', None))
         if '_cache' in state:
             del state['_cache']
         return state
@@ -368,7 +753,7 @@ class ElementBase(RequestAction, UnicodeMixin):
     def __setstate__(self, state):
         if 'data' in state:
             cache = state.pop('data')
-            state.update(data=ElementCache(cache))
+            state.update(data=ElementCache(cache, etag=state.pop('_etag', None)))
         self.__dict__.update(state)
     
     def __getattr__(self, key):
@@ -395,12 +780,18 @@ class ElementBase(RequestAction, UnicodeMixin):
             headers={'if-match': self.etag})
         request.exception = DeleteElementFailed
         request.delete()
+        meta_cache.discard(self)
+        snapshot_cache.discard(self.href)
 
     def update(self, *exception, **kwargs):
         """
-        Update the existing element and clear the instance cache.
-        Removing the cache will ensure subsequent calls requiring element
-        attributes will force a new fetch to obtain the latest copy.
+        Update the existing element. If the update is made against the
+        elements own cache and there are no effective modifications, the
+        update is skipped. After a successful update, the cache is refreshed
+        from the response and the new ETag so subsequent calls requiring
+        element attributes do not need to fetch the element again. If the
+        response does not provide an ETag, the cache is removed and the
+        next access will force a new fetch to obtain the latest copy.
         
         Calling update() with no args will assume the element has already
         been modified directly and the data cache will be used to update.
@@ -431,10 +822,16 @@ class ElementBase(RequestAction, UnicodeMixin):
         else:
             exception = exception[0]
 
+        # Updates within an atomic block are recorded and the ETag is
+        # obtained when the transaction is committed
+        transaction = current_transaction()
+        
         params = {
-            'href': self.href,
-            'etag': self.etag
+            'href': self.href
         }
+        
+        if transaction is None:
+            params.update(etag=self.etag)
 
         if 'href' in kwargs:
             params.update(href=kwargs.pop('href'))
@@ -445,6 +842,10 @@ class ElementBase(RequestAction, UnicodeMixin):
         json = kwargs.pop('json', self.data) #if 'json' in kwargs else self.data
         name = kwargs.get('name', json.get('name'))
         
+        # The cache can only be refreshed locally if it's the payload for
+        # this elements href
+        is_cache = isinstance(json, ElementCache) and params['href'] == self.href
+        
         del self.data       # Delete the cache before processing attributes
 
         # If kwarg settings are provided AND instance variables, kwargs
@@ -452,18 +853,52 @@ class ElementBase(RequestAction, UnicodeMixin):
         if kwargs:
             append_lists = kwargs.pop('append_lists', False)
             merge_dicts(json, kwargs, append_lists)
-
-        params.update(json=json)
-
-        request = SMCRequest(**params) 
-        request.exception = exception
-        result = request.update()
+        
+        if is_cache and not json.is_dirty: # Nothing to update
+            self.data = json
+            return self.href
+        
+        if transaction is not None:
+            transaction.add_update(self, json, params, exception)
+            if is_cache:
+                self.data = json
+            href = params['href']
+        else:
+            params.update(json=json)
+    
+            request = SMCRequest(**params) 
+            request.exception = exception
+            result = request.update()
+            
+            if is_cache:
+                if isinstance(result.json, dict) and 'link' in result.json:
+                    self.data = ElementCache(result.json, etag=result.etag)
+                elif result.etag:
+                    json.mark_clean(etag=result.etag)
+                    self.data = json
+            href = result.href
         
         if name: # Reset instance name
+            if name != self.name:
+                meta_cache.discard(self)
             self._meta = Meta(name=name, href=self.href, type=self._meta.type)
             self._name = name
         
-        return result.href
+        return href
+
+    @property
+    def is_dirty(self):
+        """
+        Whether this elements cache has been modified and not yet updated
+        on the SMC. This does not fetch the element if the cache has not
+        already been loaded. This can be used after calling
+        :meth:`~Element.update_or_create` with ``defer_update=True`` to
+        decide whether :meth:`~update` needs to be called.
+        
+        :rtype: bool
+        """
+        cache = self.__dict__.get('data')
+        return bool(cache is not None and cache.is_dirty)
 
 
 class Element(ElementBase):
@@ -589,6 +1024,28 @@ class Element(ElementBase):
             return element, was_created
         return element
     
+    @classmethod
+    def bulk_create(cls, elements, max_workers=None):
+        """
+        Create many elements of this type concurrently. Each item in
+        elements is a dict of keyword arguments for this classes ``create``
+        method. Failures do not stop the operation and are reported per
+        item in the result::
+        
+            >>> result = Host.bulk_create([
+            ...     {'name': 'host-1', 'address': '1.1.1.1'},
+            ...     {'name': 'host-2', 'address': '1.1.1.2'}])
+            >>> result.elements, result.errors
+            ([Host(name=host-1), Host(name=host-2)], [])
+        
+        :param list(dict) elements: keyword arguments for each element
+        :param int max_workers: maximum number of concurrent requests
+        :raises CreateElementFailed: this element type cannot be created
+        :rtype: smc.base.bulk.BulkResult
+        """
+        from smc.base.bulk import bulk_create
+        return bulk_create(cls, elements, max_workers)
+    
     @classmethod
     def update_or_create(cls, filter_key=None, with_status=False, **kwargs):
         """
@@ -614,6 +1071,10 @@ class Element(ElementBase):
             >>> print(host, host.address)
             Host(name=kali) 10.10.10.10
 
+        If ``defer_update=True`` is provided, the element is returned without
+        being updated. Complex attributes can then be modified and
+        :attr:`~ElementBase.is_dirty` used to decide whether to call update.
+
         :param dict filter_key: filter key represents the data attribute and
             value to use to find the element. If none is provided, the name
             field will be used.
@@ -891,19 +1352,47 @@ class UserElement(ElementBase):
         return not self.__eq__(other)
 
 
+#: Dynamic classes created for element types without a registered class,
+#: by (element type, base class)
+_dynamic_classes = {}
+
+
 def lookup_class(typeof, default=Element):
-    cls = ElementMeta._map.get(typeof, None)
+    """
+    Return the class registered for the element type. If the class is not
+    yet registered, the module that defines it is imported based on the
+    element manifest (:mod:`smc.base.manifest`). Element types without a
+    class get a dynamic class derived from `default`, which is created once
+    per type and base class and re-used for subsequent lookups.
+    
+    :param str typeof: element type
+    :param ElementBase default: base class to use for dynamic classes
+    :rtype: ElementBase
+    """
+    cls = ElementMeta._map.get(typeof)
+    if cls is not None:
+        return cls
+    
+    path = MANIFEST.get(typeof)
+    if path:
+        module, name = path.split(':')
+        importlib.import_module(module)
+        cls = ElementMeta._map.get(typeof)
+        if cls is not None:
+            return cls
+    
+    # There are multiple entry points for specific aliases
+    # that should derive from the smc.elements.network.Alias
+    # class so it has access to Alias class methods like ``resolve``.
+    if 'alias' in typeof:
+        default = lookup_class('alias')
+    cls = _dynamic_classes.get((typeof, default))
     if cls is None: # Create a dynamic class from meta type field
-        attrs = {'typeof': typeof}
-        # There are multiple entry points for specific aliases
-        # that should derive from the smc.elements.network.Alias
-        # class so it has access to Alias class methods like ``resolve``.
-        if 'alias' in typeof:
-            default = ElementMeta._map.get('alias')
+        attrs = {'typeof': typeof, '_dynamic': True}
         cls_name = '{0}Dynamic'.format(typeof.title())
-        return type(cls_name.replace('_',''), (default,), attrs)
-        
-    return ElementMeta._map.get(typeof, default)
+        cls = _dynamic_classes.setdefault((typeof, default),
+            type(str(cls_name.replace('_','')), (default,), attrs))
+    return cls
 
 
 class Meta(collections.namedtuple('Meta', 'name href type')):
@@ -914,5 +1403,9 @@ class Meta(collections.namedtuple('Meta', 'name href type')):
     Meta allows elements to be lazy loaded as they can be fetched to validate
     their existence without fetching the payload from the href location.
     """
+    __slots__ = ()
+    
     def __new__(cls, name=None, href=None, type=None):  # @ReservedAssignment
+        if isinstance(type, str):
+            type = intern(type)
         return super(Meta, cls).__new__(cls, name, href, type)
@@ -0,0 +1,247 @@
+"""
+Shared scheduler for polling long running operations.
+
+Operations such as policy uploads or waiting for a node status are
+tracked by polling the SMC. Instead of a thread per operation, polling
+jobs are added to a scheduler that keeps them in a timer heap and runs
+due polls on a small pool of worker threads::
+
+    from smc.base.scheduler import default_scheduler
+
+    default_scheduler.max_rate = 5    # polls per second across all jobs
+
+The delay between polls of a job starts at the jobs interval and is
+increased by the backoff factor after each poll, up to the maximum
+interval. Delays are randomized by the jitter fraction so jobs started
+at the same time do not poll at the same time. The total number of polls
+per second is capped by `max_rate`.
+
+Jobs that return the same :attr:`PollJob.batch_key` and are due at the
+same time are polled together with :meth:`PollJob.poll_batch`, which job
+types override when the SMC API can return the status of many resources
+in a single request.
+
+Each job has a :class:`concurrent.futures.Future` that is resolved when
+the job completes, which can be awaited with
+:func:`asyncio.wrap_future`.
+"""
+import time
+import heapq
+import random
+import logging
+import threading
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class PollJob(object):
+    """
+    A unit of work that is polled until it is finished. Subclasses
+    implement :meth:`poll`.
+
+    :param float interval: seconds before the first poll
+    :param float max_interval: maximum seconds between polls
+    :param float backoff: factor the delay is multiplied by after each poll
+    :param float jitter: fraction the delay is randomized by
+    :param int max_polls: stop polling after this number of polls, the
+        job is then completed without an error
+    """
+    #: Jobs with the same key that are due together are polled in a batch.
+    #: None polls each job on its own.
+    batch_key = None
+
+    def __init__(self, interval=5, max_interval=60, backoff=1.5,
+                 jitter=0.1, max_polls=None):
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_polls = max_polls
+        self.polls = 0
+        self.cancelled = False
+        self.future = Future()
+        self._delay = None
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def poll(self):
+        """
+        Poll the operation
+
+        :return: True if the job is finished
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def poll_batch(cls, jobs):
+        """
+        Poll jobs that share a batch key. Returns a result per job that
+        is either the return value of :meth:`poll` or the exception
+        raised while polling the job.
+
+        :param list jobs: jobs to poll
+        :rtype: list
+        """
+        results = []
+        for job in jobs:
+            try:
+                results.append(job.poll())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def next_delay(self):
+        """
+        Seconds until the next poll, with backoff and jitter applied
+
+        :rtype: float
+        """
+        if self._delay is None:
+            self._delay = self.interval
+        else:
+            self._delay = min(self.max_interval, self._delay * self.backoff)
+        return self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def complete(self, error=None):
+        """
+        Called once when the job is finished, cancelled, has reached the
+        maximum number of polls or polling raised an exception. Resolves
+        the jobs future.
+
+        :param Exception error: exception raised while polling
+        """
+        if error is not None:
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(self)
+
+    def cancel(self):
+        """
+        Stop polling this job and complete it
+        """
+        self.cancelled = True
+        self._finish()
+
+    def _finish(self, error=None):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        try:
+            self.complete(error)
+        except Exception:
+            logger.exception('Failed completing polling job: %s', self)
+
+
+class Scheduler(object):
+    """
+    Runs polling jobs on a timer heap. A single dispatcher thread waits
+    for the next due job and hands it to a worker pool. Threads are
+    started when the first job is added.
+
+    :param int max_workers: maximum concurrent polls
+    :param float max_rate: maximum polls per second across all jobs
+    """
+    def __init__(self, max_workers=4, max_rate=20.0):
+        self.max_workers = max_workers
+        self.max_rate = max_rate
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._tokens = 1.0
+        self._updated = time.time()
+
+    def add(self, job, delay=None):
+        """
+        Schedule a job to be polled
+
+        :param PollJob job: job to schedule
+        :param float delay: seconds until the first poll, by default the
+            delay is calculated by the job
+        :return: the job
+        :rtype: PollJob
+        """
+        delay = job.next_delay() if delay is None else delay
+        with self._cond:
+            heapq.heappush(self._heap, (time.time() + delay,
+                next(self._counter), job))
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                self._thread = threading.Thread(target=self._dispatch)
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        return job
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _due(self):
+        # Wait until at least one job is due and return all due jobs
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        due.append(heapq.heappop(self._heap)[2])
+                    return due
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def _throttle(self):
+        # Token bucket limiting the number of polls per second
+        while True:
+            now = time.time()
+            self._tokens = min(max(1.0, self.max_rate),
+                self._tokens + (now - self._updated) * self.max_rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            time.sleep((1 - self._tokens) / self.max_rate)
+
+    def _dispatch(self):
+        while True:
+            batches = {}
+            for job in self._due():
+                if job.cancelled:
+                    continue
+                key = job.batch_key
+                if key is None:
+                    key = id(job)
+                batches.setdefault((type(job), key), []).append(job)
+            for jobs in batches.values():
+                self._throttle()
+                self._executor.submit(self._poll, jobs)
+
+    def _poll(self, jobs):
+        if len(jobs) == 1:
+            try:
+                results = [jobs[0].poll()]
+            except Exception as e:
+                results = [e]
+        else:
+            try:
+                results = type(jobs[0]).poll_batch(jobs)
+            except Exception as e:
+                results = [e] * len(jobs)
+        for job, result in zip(jobs, results):
+            job.polls += 1
+            if isinstance(result, Exception):
+                job._finish(result)
+            elif result or job.cancelled or (
+                job.max_polls is not None and job.polls >= job.max_polls):
+                job._finish()
+            else:
+                self.add(job)
+
+
+#: Scheduler used by pollers and waiters unless another is provided
+default_scheduler = Scheduler()
@@ -0,0 +1,190 @@
+"""
+Snapshots of element data for warm starts.
+
+Jobs that repeatedly reference the same elements (networks, services,
+zones, engines, etc) can save the elements json and ETag to a local file
+and load it at startup instead of fetching each element again::
+
+    from smc.base import snapshot
+    from smc.elements.network import Network
+
+    snapshot.dump(list(Network.objects.all()), 'networks.snap')
+
+And in a later process::
+
+    elements = snapshot.load('networks.snap')
+    elements[0].data  # validated by ETag, not downloaded again
+
+Loading a snapshot adds each element to the snapshot cache (by href) and,
+if enabled, the meta cache (by type and name). Enable the meta cache
+before loading so elements referenced by name are also found without a
+search::
+
+    from smc.base.model import meta_cache
+
+    meta_cache.enabled = True
+    snapshot.load('networks.snap')
+    Network('internal').data  # no search, validated by ETag
+
+The snapshot is not trusted blindly; when an element loaded from the
+snapshot (or referenced by name) first needs its data, a conditional request is made with the cached ETag. If the
+element is unchanged, the SMC responds without a body and the snapshot
+json is used, otherwise the element is fetched as usual and the snapshot
+cache is refreshed.
+
+Snapshots are written using msgpack if it is installed, otherwise using
+pickle with the highest protocol available (protocol 5 on python >= 3.8).
+The format is stored in the file so either can be loaded.
+
+.. warning:: Snapshots written with pickle should only be loaded from
+    trusted locations.
+"""
+import copy
+import pickle
+import logging
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+logger = logging.getLogger(__name__)
+
+
+#: File header, followed by one byte identifying the format
+MAGIC = b'SMCSNAP1'
+PICKLE = b'p'
+MSGPACK = b'm'
+
+#: Pickle protocol used for snapshots
+PICKLE_PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+
+class SnapshotCache(object):
+    """
+    Process wide cache of element json and ETag by element href. Entries
+    are used to validate an element with a conditional request when the
+    elements data is loaded. The cache is empty unless a snapshot is
+    loaded.
+    """
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, href):
+        """
+        Return a tuple of (json, etag) for the href or None. The json is
+        a copy that can be modified by the caller.
+
+        :rtype: tuple
+        """
+        if self._entries:
+            entry = self._entries.get(href)
+            if entry:
+                return copy.deepcopy(entry[0]), entry[1]
+
+    def add(self, href, json, etag):
+        """
+        Add or replace the json and ETag for the href
+        """
+        if href and etag:
+            self._entries[href] = (json, etag)
+
+    def refresh(self, href, json, etag):
+        """
+        Replace the entry for the href only if it exists
+        """
+        if href in self._entries:
+            self.add(href, copy.deepcopy(json), etag)
+
+    def discard(self, href):
+        self._entries.pop(href, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, href):
+        return href in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+#: Snapshot cache used when loading element data
+snapshot_cache = SnapshotCache()
+
+
+def _records(elements):
+    for element in elements:
+        cache = element.data
+        yield (element.typeof, element.name, element.href, dict(cache),
+               cache.etag(element.href))
+
+
+def dump(elements, path, format=None):
+    """
+    Save the meta, json and ETag of the given elements to a snapshot
+    file. Elements that are not already loaded are fetched.
+
+    :param list elements: elements to save
+    :param str path: path of the snapshot file
+    :param str format: 'msgpack' or 'pickle'. If not provided, msgpack is
+        used if installed
+    :raises ValueError: invalid format or msgpack is not installed
+    :return: number of elements saved
+    :rtype: int
+    """
+    format = format or ('msgpack' if msgpack is not None else 'pickle')
+    records = list(_records(elements))
+    if format == 'msgpack':
+        if msgpack is None:
+            raise ValueError('The msgpack format requires the msgpack package.')
+        header, payload = MSGPACK, msgpack.packb(records, use_bin_type=True)
+    elif format == 'pickle':
+        header, payload = PICKLE, pickle.dumps(records, protocol=PICKLE_PROTOCOL)
+    else:
+        raise ValueError('Invalid snapshot format: %r' % format)
+
+    with open(path, 'wb') as snapshot:
+        snapshot.write(MAGIC + header)
+        snapshot.write(payload)
+    logger.debug('Saved %s elements to snapshot: %s', len(records), path)
+    return len(records)
+
+
+def load(path):
+    """
+    Load a snapshot file into the snapshot and meta caches. The returned
+    elements are not loaded; each element is validated by ETag when its
+    data is first required.
+
+    :param str path: path of the snapshot file
+    :raises ValueError: the file is not a snapshot or msgpack is required
+        and not installed
+    :return: elements in the snapshot
+    :rtype: list(Element)
+    """
+    from smc.base.model import lookup_class, meta_cache
+
+    with open(path, 'rb') as snapshot:
+        content = snapshot.read()
+
+    header = content[:len(MAGIC) + 1]
+    payload = content[len(header):]
+    if header == MAGIC + MSGPACK:
+        if msgpack is None:
+            raise ValueError('Snapshot %s requires the msgpack package.' % path)
+        records = msgpack.unpackb(payload, raw=False)
+    elif header == MAGIC + PICKLE:
+        records = pickle.loads(payload)
+    else:
+        raise ValueError('File %s is not a valid snapshot.' % path)
+
+    elements = []
+    for typeof, name, href, json, etag in records:
+        snapshot_cache.add(href, json, etag)
+        element = lookup_class(typeof)(name=name, href=href, type=typeof)
+        meta_cache.add(element)
+        elements.append(element)
+    logger.debug('Loaded %s elements from snapshot: %s', len(elements), path)
+    return elements
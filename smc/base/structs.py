@@ -1,7 +1,9 @@
 """
 Common structures
 """
+import ipaddress
 import collections
+from smc.compat import unicode
 
 
 class BaseIterable(object):
@@ -149,3 +151,142 @@ class NestedDict(collections.MutableMapping):
         raise AttributeError("%r object has no attribute %r" 
             % (self.__class__, key)) 
             
+
+
+class PrefixTrie(object):
+    """
+    Binary radix trie of IPv4 and IPv6 networks for longest prefix
+    match lookups. Networks are keys and can be provided as a string or
+    :mod:`ipaddress` network, addresses are looked up in the time of the
+    address length regardless of the number of networks::
+
+        >>> trie = PrefixTrie()
+        >>> trie['10.0.0.0/8'] = 'a'
+        >>> trie['10.1.0.0/16'] = 'b'
+        >>> trie.lookup('10.1.2.3')
+        (IPv4Network(u'10.1.0.0/16'), 'b')
+        >>> trie.matches('10.1.2.3')
+        [(IPv4Network(u'10.0.0.0/8'), 'a'), (IPv4Network(u'10.1.0.0/16'), 'b')]
+    """
+    def __init__(self):
+        # A node is [zero branch, one branch, network, value]
+        self._roots = {4: [None, None, None, None], 6: [None, None, None, None]}
+        self._len = 0
+
+    @staticmethod
+    def _network(network):
+        if isinstance(network, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+            return network
+        return ipaddress.ip_network(unicode(network).strip(), strict=False)
+
+    def _node(self, network, create=False):
+        node = self._roots[network.version]
+        bits = int(network.network_address)
+        for shift in range(network.max_prefixlen - 1,
+                           network.max_prefixlen - network.prefixlen - 1, -1):
+            bit = (bits >> shift) & 1
+            if node[bit] is None:
+                if not create:
+                    return None
+                node[bit] = [None, None, None, None]
+            node = node[bit]
+        return node
+
+    def __setitem__(self, network, value):
+        network = self._network(network)
+        node = self._node(network, create=True)
+        if node[2] is None:
+            self._len += 1
+        node[2], node[3] = network, value
+
+    def __getitem__(self, network):
+        node = self._node(self._network(network))
+        if node is None or node[2] is None:
+            raise KeyError(network)
+        return node[3]
+
+    def __contains__(self, network):
+        node = self._node(self._network(network))
+        return node is not None and node[2] is not None
+
+    def get(self, network, default=None):
+        try:
+            return self[network]
+        except KeyError:
+            return default
+
+    def setdefault(self, network, default=None):
+        network = self._network(network)
+        node = self._node(network, create=True)
+        if node[2] is None:
+            self._len += 1
+            node[2], node[3] = network, default
+        return node[3]
+
+    def matches(self, address):
+        """
+        All networks containing the address, from the shortest to the
+        longest prefix
+
+        :param str address: IP address or network
+        :rtype: list(tuple(network, value))
+        """
+        address = self._network(address)
+        node = self._roots[address.version]
+        bits = int(address.network_address)
+        found = []
+        shift = address.max_prefixlen - 1
+        while node is not None:
+            if node[2] is not None:
+                found.append((node[2], node[3]))
+            if shift < address.max_prefixlen - address.prefixlen:
+                break
+            node = node[(bits >> shift) & 1]
+            shift -= 1
+        return found
+
+    def lookup(self, address):
+        """
+        Longest prefix match for the address
+
+        :param str address: IP address or network
+        :return: (network, value) or None if no network contains the address
+        :rtype: tuple
+        """
+        found = self.matches(address)
+        return found[-1] if found else None
+
+    @staticmethod
+    def _walk(node):
+        items = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node[2] is not None:
+                items.append((node[2], node[3]))
+            stack.extend(child for child in (node[1], node[0]) if child)
+        return items
+
+    def within(self, network):
+        """
+        Networks within the network, including the network itself
+
+        :param str network: network
+        :rtype: list(tuple(network, value))
+        """
+        node = self._node(self._network(network))
+        return self._walk(node) if node is not None else []
+
+    def items(self):
+        """
+        Networks and values in address order
+
+        :rtype: list(tuple(network, value))
+        """
+        return self._walk(self._roots[4]) + self._walk(self._roots[6])
+
+    def __iter__(self):
+        return iter(network for network, _ in self.items())
+
+    def __len__(self):
+        return self._len
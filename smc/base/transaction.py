@@ -0,0 +1,323 @@
+"""
+Atomic transactions for creating and updating elements.
+
+Within an atomic block, element creates (any class ``create`` method that
+uses :func:`smc.base.model.ElementCreator`) and element updates (calls to
+:meth:`smc.base.model.ElementBase.update`) are recorded instead of being
+sent to the SMC. When the block exits without an exception, the recorded
+operations are executed with bounded parallelism::
+
+    from smc import session
+
+    with session.atomic(max_workers=8) as transaction:
+        host = Host.create(name='host-1', address='1.1.1.1')
+        Group.create(name='group-1', members=[host])
+        network = Network('existing')
+        network.update(comment='updated')
+
+    print(transaction.timing)
+
+Elements created within the block are returned with a placeholder href.
+The placeholder can be referenced by other creates or updates in the same
+block and is replaced with the real href before the request is sent.
+Creates are executed in layers so an element is only created after the
+elements it references, then updates run. If any operation fails, the
+elements that were already created are deleted in reverse order and the
+original exception is raised.
+
+If an exception is raised within the block, the recorded operations are
+discarded and nothing is sent to the SMC.
+
+.. note:: Elements created within the block cannot be read (i.e. access
+    attributes that require the elements data) until the block exits.
+    Operations other than create and update are not deferred.
+"""
+import re
+import time
+import itertools
+import logging
+from smc.compat import string_types
+from smc.base.structs import NestedDict
+from smc.base.workers import parallel_map
+from smc.api.common import SMCRequest
+from smc.api.exceptions import CreateElementFailed, DeleteElementFailed
+
+
+logger = logging.getLogger(__name__)
+
+
+PLACEHOLDER = re.compile(r'atomic://\d+/\d+')
+
+
+def _placeholders(value):
+    """
+    Find all placeholder hrefs within a json value
+
+    :rtype: set
+    """
+    found = set()
+    if isinstance(value, (dict, NestedDict)):
+        for item in value.values():
+            found.update(_placeholders(item))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            found.update(_placeholders(item))
+    elif isinstance(value, string_types):
+        found.update(PLACEHOLDER.findall(value))
+    return found
+
+
+def _substitute(value, hrefs):
+    """
+    Replace placeholder hrefs in place within the json value, returning
+    the new value
+    """
+    if isinstance(value, (dict, NestedDict)):
+        for key, item in list(value.items()):
+            value[key] = _substitute(item, hrefs)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            value[index] = _substitute(item, hrefs)
+    elif isinstance(value, string_types) and 'atomic://' in value:
+        return PLACEHOLDER.sub(lambda m: hrefs.get(m.group(0), m.group(0)), value)
+    return value
+
+
+class PendingCreate(object):
+    """
+    A create operation recorded in an atomic block
+    """
+    def __init__(self, placeholder, element, href, json, kwargs):
+        self.placeholder = placeholder
+        self.element = element
+        self.href = href
+        self.json = json
+        self.kwargs = kwargs
+
+    @property
+    def depends_on(self):
+        return _placeholders(self.json) | _placeholders(self.href)
+
+
+class PendingUpdate(object):
+    """
+    An update operation recorded in an atomic block
+    """
+    def __init__(self, element, json, params, exception):
+        self.element = element
+        self.json = json
+        self.params = params
+        self.exception = exception
+
+
+class Transaction(object):
+    """
+    Context manager returned from :meth:`smc.api.session.Session.atomic`.
+    After the block exits, ``timing`` holds the elapsed time in seconds
+    for each phase that ran ('create', 'update' and 'rollback'),
+    ``created`` the elements created, ``updated`` the elements updated,
+    ``rolled_back`` the elements deleted after a failure and
+    ``rollback_failed`` the created elements that could not be deleted
+    and still exist in the SMC.
+    Nested atomic blocks join the outer transaction. The transaction is
+    only active in the thread that entered the block.
+
+    :param Session session: session for this transaction
+    :param int max_workers: maximum concurrent requests per phase
+    """
+    _counter = itertools.count(1)
+
+    def __init__(self, session, max_workers=None):
+        self.session = session
+        self.max_workers = max_workers
+        self.operations = []
+        self.timing = {}
+        self.created = []
+        self.updated = []
+        self.rolled_back = []
+        self.rollback_failed = []
+        self._depth = 0
+        self._id = next(Transaction._counter)
+        self._hrefs = {}
+
+    def __enter__(self):
+        current = self.session.transaction
+        if current is not None and current is not self:
+            current._depth += 1
+            return current
+        self._depth += 1
+        self.session._transaction = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current = self.session.transaction
+        if current is not None and current is not self:
+            current._depth -= 1
+            return False
+        self._depth -= 1
+        if self._depth > 0:
+            return False
+        self.session._transaction = None
+        operations, self.operations = self.operations, []
+        if exc_type is None:
+            self.commit(operations)
+        else:
+            logger.debug('Exception raised in atomic block, discarding %s '
+                'operations', len(operations))
+        return False
+
+    def add_create(self, cls, json, href, **kwargs):
+        """
+        Record a create operation. This is called by ElementCreator.
+
+        :return: element with a placeholder href
+        :rtype: Element
+        """
+        placeholder = 'atomic://{}/{}'.format(self._id, len(self.operations))
+        element = cls(
+            name=json.get('name'),
+            type=getattr(cls, 'typeof', None),
+            href=placeholder)
+        self.operations.append(
+            PendingCreate(placeholder, element, href, json, kwargs))
+        return element
+
+    def add_update(self, element, json, params, exception):
+        """
+        Record an update operation. This is called by ElementBase.update.
+        Repeated updates to the same element replace the previously
+        recorded update.
+        """
+        for index, op in enumerate(self.operations):
+            if isinstance(op, PendingUpdate) and op.element is element and \
+                op.params['href'] == params['href']:
+                self.operations[index] = PendingUpdate(
+                    element, json, params, exception)
+                return
+        self.operations.append(
+            PendingUpdate(element, json, params, exception))
+
+    def _layers(self, creates):
+        """
+        Order the creates into layers where each create only references
+        elements created in previous layers.
+        """
+        pending = {op.placeholder: op for op in creates}
+        depends_on = {op.placeholder: (op.depends_on & set(pending)) -
+                      set([op.placeholder]) for op in creates}
+        done = set()
+        layers = []
+        while pending:
+            layer = [op for op in pending.values()
+                     if depends_on[op.placeholder] <= done]
+            if not layer:
+                raise CreateElementFailed('Circular reference between elements '
+                    'created in atomic block: %s' % [op.element for op in
+                        pending.values()])
+            layer.sort(key=lambda op: int(op.placeholder.rsplit('/', 1)[-1]))
+            for op in layer:
+                pending.pop(op.placeholder)
+                done.add(op.placeholder)
+            layers.append(layer)
+        return layers
+
+    def _create(self, op):
+        from smc.base.model import Meta
+        href = _substitute(op.href, self._hrefs)
+        json = _substitute(op.json, self._hrefs)
+        kwargs = dict(op.kwargs)
+        kwargs.setdefault('exception', CreateElementFailed)
+        result = SMCRequest(href=href, json=json, **kwargs).create()
+        op.element._meta = Meta(
+            name=op.element._meta.name, href=result.href, type=op.element._meta.type)
+        self._hrefs[op.placeholder] = result.href
+        return op.element
+
+    def _update(self, op):
+        from smc.base.model import ElementCache, LoadElement
+        params = dict(op.params)
+        params.update(
+            href=_substitute(params['href'], self._hrefs),
+            json=_substitute(op.json, self._hrefs))
+        if params.get('etag') is None:
+            params.update(etag=op.json.etag(params['href']) if
+                isinstance(op.json, ElementCache) else
+                LoadElement(params['href'], only_etag=True))
+        request = SMCRequest(**params)
+        request.exception = op.exception
+        result = request.update()
+        if isinstance(op.json, ElementCache) and result.etag:
+            op.json.mark_clean(etag=result.etag)
+        return op.element
+
+    def _delete(self, element):
+        # Elements were just created, delete without fetching the ETag
+        SMCRequest(href=element.href, exception=DeleteElementFailed).delete()
+        return element
+
+    def _run(self, func, operations):
+        results = parallel_map(func, operations, self.max_workers)
+        errors = [result.error for result in results if not result.ok]
+        for error in errors:
+            logger.error('Operation failed in atomic block: %s', error)
+        return [result.result for result in results if result.ok], errors
+
+    def commit(self, operations):
+        """
+        Execute the recorded operations. Creates are executed first in
+        dependency order, followed by updates. On failure, elements created
+        by this transaction are deleted and the first exception is raised.
+
+        :param list operations: recorded operations
+        :return: None
+        """
+        creates = [op for op in operations if isinstance(op, PendingCreate)]
+        updates = [op for op in operations if isinstance(op, PendingUpdate)]
+        created = []
+        try:
+            start = time.time()
+            for layer in self._layers(creates):
+                elements, errors = self._run(self._create, layer)
+                created.append(elements)
+                self.created.extend(elements)
+                if errors:
+                    raise errors[0]
+            self.timing['create'] = time.time() - start
+
+            start = time.time()
+            elements, errors = self._run(self._update, updates)
+            self.updated.extend(elements)
+            self.timing['update'] = time.time() - start
+            if errors:
+                if self.updated:
+                    logger.warning('Atomic block failed after updating elements '
+                        'which are not rolled back: %s', self.updated)
+                raise errors[0]
+        except Exception:
+            self.rollback(created)
+            raise
+        finally:
+            logger.debug('Atomic block timing: %s', self.timing)
+
+    def rollback(self, created):
+        """
+        Delete created elements, in reverse order of creation layers.
+        Elements within a layer are deleted concurrently. Deleted elements
+        are kept in ``rolled_back`` and elements that failed to delete in
+        ``rollback_failed``.
+
+        :param list created: list of layers of created elements
+        :return: None
+        """
+        start = time.time()
+        self.rolled_back, self.rollback_failed = [], []
+        for layer in reversed(created):
+            for result in parallel_map(self._delete, layer, self.max_workers):
+                if result.ok:
+                    self.rolled_back.append(result.item)
+                else:
+                    logger.error('Failed to roll back element: %s',
+                        result.error)
+                    self.rollback_failed.append(result.item)
+        self.created = []
+        self.timing['rollback'] = time.time() - start
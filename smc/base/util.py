@@ -5,7 +5,6 @@ import time
 import base64
 import datetime
 import smc.compat as compat
-import smc.api.exceptions
 
 
 def datetime_to_ms(dt):
@@ -79,18 +78,31 @@ def element_resolver(elements, do_raise=True):
     raising an exception and just return None or [] instead,
     set do_raise=False.
 
+    When a list is provided, elements that were created by name only
+    and have not yet resolved their meta are resolved in a batch by
+    element type instead of one search per element.
+
     :raises ElementNotFound: if this is of type Element,
         ElementLocator will attempt to retrieve meta if it
         doesn't already exist but the element was not found.
     """
+    from smc.api.exceptions import ElementNotFound
     if isinstance(elements, list):
+        from smc.base.model import resolve_elements
+        not_found = set(id(element) for element in resolve_elements(elements))
         e = []
         for element in elements:
+            if id(element) in not_found:
+                if do_raise:
+                    raise ElementNotFound(
+                        'Cannot find specified element: {}, type: {}'
+                        .format(unicode_to_bytes(element.name), element.typeof))
+                continue
             try:
                 e.append(element.href)
             except AttributeError:
                 e.append(element)
-            except smc.api.exceptions.ElementNotFound:
+            except ElementNotFound:
                 if do_raise:
                     raise
         return e
@@ -98,7 +110,7 @@ def element_resolver(elements, do_raise=True):
         return elements.href
     except AttributeError:
         return elements
-    except smc.api.exceptions.ElementNotFound:
+    except ElementNotFound:
         if do_raise:
             raise
 
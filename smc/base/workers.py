@@ -0,0 +1,168 @@
+"""
+Worker helpers used to run independent SMC API requests concurrently.
+
+Requests made to the SMC are I/O bound, so a small pool of threads sharing
+the sessions connection pool is enough to overlap round trips. These helpers
+are used internally when many elements need to be fetched or resolved at once
+and keep results in the same order as the provided input::
+
+    from smc.base.workers import parallel_map
+
+    results = parallel_map(lambda host: host.data, hosts, max_workers=8)
+    for result in results:
+        if result.error:
+            print('Failed: %s, %s' % (result.item, result.error))
+"""
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from smc.api.exceptions import SMCConnectionError
+
+
+#: Default number of concurrent workers
+DEFAULT_WORKERS = 8
+
+#: HTTP status codes, other than server errors, that indicate the SMC is
+#: overloaded
+BACKOFF_STATUS = frozenset([429])
+
+
+class WorkResult(collections.namedtuple('WorkResult', 'item result error')):
+    """
+    Result of a single unit of work. If the callable raised, `error` will
+    be the exception and `result` will be None.
+
+    :param item: the input item
+    :param result: return value of the callable
+    :param Exception error: exception raised by the callable, if any
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _call(func, item):
+    try:
+        return WorkResult(item, func(item), None)
+    except Exception as e:
+        return WorkResult(item, None, e)
+
+
+def should_back_off(error):
+    """
+    Whether a failure indicates the SMC is overloaded and concurrency
+    should be reduced. Connection errors, timeouts, server errors and
+    429 responses are; other failures, i.e. validation errors for a
+    duplicate name, are not.
+
+    :param Exception error: exception raised by a unit of work
+    :rtype: bool
+    """
+    if isinstance(error, (SMCConnectionError, IOError)):
+        return True
+    code = getattr(error, 'code', None)
+    return isinstance(code, int) and (code >= 500 or code in BACKOFF_STATUS)
+
+
+def parallel_map(func, items, max_workers=None):
+    """
+    Call `func` for each item using a thread pool and return a list of
+    :class:`.WorkResult` in the same order as the input. Exceptions are
+    captured per item and never raised from this function.
+    If there is only a single item or max_workers is 1, the work is done
+    in the calling thread.
+
+    :param callable func: function taking a single item
+    :param iterable items: items to process
+    :param int max_workers: maximum number of threads (default: 8)
+    :rtype: list(WorkResult)
+    """
+    items = list(items)
+    max_workers = min(max_workers or DEFAULT_WORKERS, len(items))
+    if max_workers <= 1:
+        return [_call(func, item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda item: _call(func, item), items))
+
+
+class AdaptiveLimiter(object):
+    """
+    Limits the number of concurrent units of work using additive increase
+    and multiplicative decrease. Each successful unit of work increases
+    the limit by a fraction until the maximum is reached and each failure
+    caused by load (see :func:`should_back_off`) halves the limit. This
+    backs off quickly when the SMC starts rejecting or timing out requests
+    and ramps back up while requests succeed. Other failures do not
+    change the limit.
+
+    :param int initial: initial concurrency limit
+    :param int maximum: upper bound for the concurrency limit
+    :param int minimum: lower bound for the concurrency limit
+    """
+    def __init__(self, initial=2, maximum=DEFAULT_WORKERS, minimum=1):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """
+        Block until there is capacity to run a unit of work
+        """
+        with self._cond:
+            while self._active >= int(self.limit):
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, success=True, backoff=None):
+        """
+        Release capacity after a unit of work completes and adjust
+        the limit based on the outcome.
+
+        :param bool success: whether the unit of work succeeded
+        :param bool backoff: whether a failure should reduce the limit,
+            default is to back off on any failure
+        """
+        if backoff is None:
+            backoff = not success
+        with self._cond:
+            self._active -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif backoff:
+                self.limit = max(self.minimum, self.limit / 2.0)
+            self._cond.notify_all()
+
+
+def adaptive_map(func, items, max_workers=None, limiter=None):
+    """
+    Like :func:`parallel_map` but the number of units of work running at
+    the same time is controlled by an :class:`.AdaptiveLimiter`. Exceptions
+    raised by `func` that indicate the SMC is overloaded, see
+    :func:`should_back_off`, reduce the concurrency. Other exceptions are
+    recorded as ordinary failures.
+
+    :param callable func: function taking a single item
+    :param iterable items: items to process
+    :param int max_workers: maximum number of threads (default: 8)
+    :param AdaptiveLimiter limiter: optional limiter, one will be created
+        if not provided
+    :rtype: list(WorkResult)
+    """
+    max_workers = max_workers or DEFAULT_WORKERS
+    limiter = limiter or AdaptiveLimiter(maximum=max_workers)
+
+    def limited(item):
+        limiter.acquire()
+        result = _call(func, item)
+        limiter.release(result.ok,
+            not result.ok and should_back_off(result.error))
+        return result
+
+    items = list(items)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        return list(executor.map(limited, items))
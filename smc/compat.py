@@ -16,6 +16,11 @@ if PY3:
 else:
     unicode = unicode
 
+if PY3:
+    from sys import intern
+else:
+    intern = intern
+
 def min_smc_version(version):
     """
     Is version at least the minimum provided
@@ -1857,6 +1857,30 @@ class AllInterfaces(BaseIterable):
         return None
 
 
+_vlan_classes = {}
+
+
+def vlan_interface(interface, data):
+    """
+    Return a VLAN of the interface from the VLAN json. The VLAN is an
+    instance of a class derived from both VlanInterface and the parent
+    interface class. Derived classes are created once per parent class.
+
+    :param Interface interface: parent interface
+    :param dict data: VLAN json from the parents `vlanInterfaces`
+    :rtype: VlanInterface
+    """
+    clz = _vlan_classes.get(type(interface))
+    if clz is None:
+        clz = _vlan_classes[type(interface)] = type(
+            '{}Vlan'.format(type(interface).__name__),
+            (VlanInterface, interface.__class__), {})
+    vlan = clz()
+    vlan.data = ElementCache(data, compact=False)
+    vlan._parent = interface
+    return vlan
+
+
 class VlanCollection(BaseIterable):
     """
     A collection of VLAN interfaces based on the parent interface type.
@@ -1867,9 +1891,7 @@ class VlanCollection(BaseIterable):
     :rtype: BaseIterable
     """
     def __init__(self, interface):
-        name = '{}Vlan'.format(type(interface).__name__)
-        data = [type(name, (VlanInterface, interface.__class__), {
-                'data': ElementCache(vlan), '_parent': interface})()
+        data = [vlan_interface(interface, vlan)
                 for vlan in interface.data.get('vlanInterfaces', [])]
         super(VlanCollection, self).__init__(data)
     
@@ -1934,6 +1956,50 @@ class VlanCollection(BaseIterable):
                     return item
                 
 
+#: Interface options found with :meth:`InterfaceEditor.find_mgmt_interface`
+MGMT_OPTIONS = ('primary_mgt', 'backup_mgt', 'primary_heartbeat',
+                'backup_heartbeat', 'outgoing', 'auth_request')
+
+
+class InterfaceIndex(object):
+    """
+    Index of the top level interfaces in a version of the engine json.
+    Interfaces are indexed by interface id, by VLAN as (interface id,
+    vlan id) and by each half of an inline pair so a lookup does not
+    iterate the engine interfaces. Management interfaces are found once
+    and kept in `mgmt`.
+
+    The index is kept on the engines json cache with the ETag of the
+    cache, so it is rebuilt when the engine cache is replaced or its ETag
+    changes, i.e. after an engine or interface update. Methods of the
+    :class:`InterfaceEditor` that modify the interfaces drop the index.
+
+    :param list interfaces: the engines `physicalInterfaces` json
+    """
+    def __init__(self, interfaces):
+        self.count = len(interfaces)
+        self.interfaces = [(typeof, data) for interface in interfaces
+                           for typeof, data in interface.items()]
+        self.by_id = {}
+        self.vlans = {}
+        self.inline = {}
+        self.mgmt = {}
+        for entry in self.interfaces:
+            data = entry[1]
+            interface_id = str(data.get('interface_id'))
+            self.by_id.setdefault(interface_id, entry)
+            for vlan in data.get('vlanInterfaces', []):
+                vlan_id = str(vlan.get('interface_id')).split('.')[-1]
+                self.vlans.setdefault((interface_id, vlan_id), vlan)
+            for sub_interface in data.get('interfaces', []):
+                for kind, values in sub_interface.items():
+                    clz = get_sub_interface(kind)
+                    if clz and issubclass(clz, InlineInterface):
+                        nicid = str(values.get('nicid'))
+                        for key in [nicid] + nicid.split('-'):
+                            self.inline.setdefault(key, entry)
+
+
 class InterfaceEditor(object):
     def __init__(self, engine):
         self.engine = engine
@@ -1943,29 +2009,51 @@ class InterfaceEditor(object):
             if keys.get('rel') =='self':
                 return keys.get('href')
     
-    def serialize(self):
-        for interface in self.engine.data.get('physicalInterfaces', []):
-            for typeof, data in interface.items():
-                subif_type = extract_sub_interface(data)
-                if isinstance(subif_type, (InlineInterface, CaptureInterface)):
-                    clz = Layer2PhysicalInterface
+    @property
+    def index(self):
+        """
+        Interface index for the current engine json
+        
+        :rtype: InterfaceIndex
+        """
+        data = self.engine.data
+        interfaces = data.get('physicalInterfaces', [])
+        etag, index = getattr(data, '_interface_index', (None, None))
+        if index is None or etag != data._etag or \
+            index.count != len(interfaces):
+            index = InterfaceIndex(interfaces)
+            data._interface_index = (data._etag, index)
+        return index
+    
+    def _del_index(self):
+        # Interfaces were modified in place
+        vars(self.engine.data).pop('_interface_index', None)
+    
+    def _build(self, typeof, data):
+        subif_type = extract_sub_interface(data)
+        if isinstance(subif_type, (InlineInterface, CaptureInterface)):
+            clz = Layer2PhysicalInterface
+        else:
+            if typeof == 'physical_interface':
+                if 'cluster' in self.engine.type:
+                    clz = ClusterPhysicalInterface
                 else:
-                    if typeof == 'physical_interface':
-                        if 'cluster' in self.engine.type:
-                            clz = ClusterPhysicalInterface
-                        else:
-                            clz = Layer3PhysicalInterface
-                    else:
-                        clz = lookup_class(typeof, Interface)
+                    clz = Layer3PhysicalInterface
+            else:
+                clz = lookup_class(typeof, Interface)
+
+        clazz = clz(meta=dict(
+            name=data.get('name', 'Interface %s' % data.get('interface_id')),
+            type=typeof,
+            href=self.extract_self(data.get('link'))))
 
-                clazz = clz(meta=dict(
-                    name=data.get('name', 'Interface %s' % data.get('interface_id')),
-                    type=typeof,
-                    href=self.extract_self(data.get('link'))))
+        clazz.data = ElementCache(data, compact=False)
+        clazz._engine = self.engine
+        return clazz
     
-                clazz.data = ElementCache(data)
-                clazz._engine = self.engine
-                yield clazz
+    def serialize(self):
+        for typeof, data in self.index.interfaces:
+            yield self._build(typeof, data)
 
     def __iter__(self):
         return self.serialize()
@@ -1977,21 +2065,31 @@ class InterfaceEditor(object):
         """
         Find the management interface specified and return
         either the string representation of the interface_id.
+        All management interfaces are found in a single pass and
+        kept with the interface index.
         
         Valid options: primary_mgt, backup_mgt, primary_heartbeat,
             backup_heartbeat, outgoing, auth_request
         
         :return: str interface_id
         """
-        for intf in self:
-            for allitf in intf.all_interfaces:
-                if isinstance(allitf, VlanInterface):
-                    for vlan in allitf.interfaces:
-                        if getattr(vlan, mgmt, None):
-                            return allitf.interface_id
-                else:
-                    if getattr(allitf, mgmt, None):
-                        return intf.interface_id
+        index = self.index
+        if mgmt not in index.mgmt:
+            options = [option for option in MGMT_OPTIONS + (mgmt,)
+                       if option not in index.mgmt]
+            found = dict.fromkeys(options)
+            for intf in self:
+                for allitf in intf.all_interfaces:
+                    if isinstance(allitf, VlanInterface):
+                        subs, interface_id = allitf.interfaces, allitf.interface_id
+                    else:
+                        subs, interface_id = [allitf], intf.interface_id
+                    for sub in subs:
+                        for option in options:
+                            if found[option] is None and getattr(sub, option, None):
+                                found[option] = interface_id
+            index.mgmt.update(found)
+        return index.mgmt[mgmt]
     
     def get(self, interface_id):
         """
@@ -2000,30 +2098,26 @@ class InterfaceEditor(object):
         :param str interface_id: interface ID to find
         :raises InterfaceNotFound: Cannot find interface
         """
-        # From within engine, skips nested iterators for this find
         # Make sure were dealing with a string
         interface_id = str(interface_id)
-        for intf in self:
-            if intf.interface_id == interface_id:
-                intf._engine = self.engine
-                return intf
-            else: # Check for inline interfaces
-                if '.' in interface_id:
-                    # It's a VLAN interface
-                    vlan = interface_id.split('.')
-                    # Check that we're on the right interface
-                    if intf.interface_id == vlan[0]:
-                        if intf.has_vlan:
-                            return intf.vlan_interface.get_vlan(vlan[-1])
-
-                elif intf.has_interfaces:
-                    for interface in intf.interfaces:
-                        if isinstance(interface, InlineInterface):
-                            split_intf = interface.nicid.split('-')
-                            if interface_id == interface.nicid or \
-                                str(interface_id) in split_intf:
-                                intf._engine = self.engine
-                                return intf
+        index = self.index
+        entry = index.by_id.get(interface_id)
+        if entry is not None:
+            return self._build(*entry)
+        if '.' in interface_id:
+            # It's a VLAN interface
+            vlan = interface_id.split('.')
+            entry = index.by_id.get(vlan[0])
+            if entry is not None and entry[1].get('vlanInterfaces'):
+                data = index.vlans.get((vlan[0], vlan[-1]))
+                if data is None:
+                    raise InterfaceNotFound('VLAN ID {} was not found on this '
+                        'engine.'.format(vlan[-1]))
+                return vlan_interface(self._build(*entry), data)
+        else: # Check for inline interfaces
+            entry = index.inline.get(interface_id)
+            if entry is not None:
+                return self._build(*entry)
 
         raise InterfaceNotFound(
             'Interface id {} was not found on this engine.'.format(interface_id))
@@ -2065,6 +2159,7 @@ class InterfaceEditor(object):
                                 sub_interface[attribute] = True
                         else: #unset
                             sub_interface[attribute] = False
+        self._del_index()
 
     def set_auth_request(self, interface_id, address=None):
         """
@@ -2112,6 +2207,7 @@ class InterfaceEditor(object):
                             itf['auth_request'] = True
                     else:
                         itf['auth_request'] = True
+        self._del_index()
 
 
 def extract_sub_interface(data):
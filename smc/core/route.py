@@ -113,14 +113,37 @@ IPv6 to the router element, or run this operation for each network respectively.
 
 .. seealso:: :meth:`.Routing.add_static_route`
 
+To find the interface or gateway that routes an address, use the routing
+index. The index is built once from the routing data and answers lookups
+in memory with a longest prefix match::
+
+    >>> index = engine.routing.index
+    >>> index.interface_for('10.1.2.3')
+    Routing(name=Interface 0,level=interface,type=physical_interface)
+    >>> index.gateway_for('10.1.2.3')
+    Routing(name=router-10.0.0.1,level=gateway,type=router)
+
+.. seealso:: :class:`.RoutingIndex`
+
 .. note:: When changing are made to a routing node, i.e. adding OSPF, BGP, Netlink's, the
     configuration is updated immediately without calling .update()
 """
+import ipaddress
 import collections
+from smc.compat import unicode
 from smc.base.model import SubElement, Element, ElementCache
 from smc.base.util import element_resolver
-from smc.api.exceptions import InterfaceNotFound, ModificationAborted
-from smc.base.structs import SerializedIterable
+from smc.api.exceptions import InterfaceNotFound, ModificationAborted, \
+    ResourceNotFound
+from smc.base.structs import SerializedIterable, PrefixTrie
+from smc.base.workers import parallel_map
+from smc.api.common import _get_session
+
+
+def _node_data(node):
+    # Routing node json, or the cache of a gateway that was added and
+    # not yet updated
+    return node.data if isinstance(node, RoutingTree) else node
 
 
 def flush_parent_cache(node):
@@ -147,16 +170,53 @@ class RoutingTree(SubElement):
     def __init__(self, data=None, **meta):
         super(RoutingTree, self).__init__(**meta)
         if data is not None:
-            self.data = ElementCache(data)
+            # Nested in the parents json, links are kept in place
+            self.data = ElementCache(data, compact=False)
     
     def __iter__(self):
-        for node in self.data[self.typeof]:
-            data = ElementCache(node)
-            yield(self.__class__(
-                    href=data.get_link('self'),
-                    type=self.__class__.__name__,
+        # Child nodes are created once and kept with the cache until the
+        # number of nodes changes or the cache is flushed
+        nodes = self.data.get(self.typeof, [])
+        children = getattr(self.data, '_children', None)
+        if children is None or children[0] != len(nodes):
+            children = (len(nodes), [])
+            cls = Routing if isinstance(self, RoutingNodeGateway) else \
+                self.__class__
+            for node in nodes:
+                if isinstance(node, RoutingTree):
+                    # Gateway added to the cache and not yet updated
+                    node._parent = self
+                    children[1].append(node)
+                    continue
+                try:
+                    href = ElementCache(node, compact=False).get_link('self')
+                except (KeyError, ResourceNotFound):
+                    href = None
+                children[1].append(cls(
+                    href=href,
+                    type=cls.__name__,
                     data=node,
                     parent=self))
+            self.data._children = children
+        return iter(children[1])
+    
+    @property
+    def index(self):
+        """
+        Index of the nodes below this node. The index is built once from
+        the routing data and rebuilt after the routing is modified.
+
+        :rtype: RoutingIndex
+        """
+        index = getattr(self.data, '_routing_index', None)
+        if index is None:
+            index = self.data._routing_index = RoutingIndex(self)
+        return index
+    
+    def _del_index(self):
+        if 'data' in vars(self):
+            vars(self.data).pop('_routing_index', None)
+            vars(self.data).pop('_children', None)
     
     @property
     def name(self):
@@ -253,10 +313,9 @@ class RoutingTree(SubElement):
         :return: Routing element, or None if not found
         :rtype: Routing
         """
-        for interface in self:
-            if interface.nicid == str(interface_id) or \
-                interface.dynamic_nicid == str(interface_id):
-                return interface
+        interface = self.index.interfaces.get(str(interface_id))
+        if interface is not None:
+            return interface
         raise InterfaceNotFound('Specified interface {} does not exist on '
             'this engine.'.format(interface_id))
     
@@ -265,6 +324,7 @@ class RoutingTree(SubElement):
         flush_parent_cache(self._parent)
         
     def update(self):
+        self._del_index()
         super(RoutingTree, self).update()
         flush_parent_cache(self._parent)
     
@@ -569,10 +629,10 @@ class Routing(RoutingTree):
             modified = True
         # Have peering
         else:
-            peers = [node.routing_node_element for peer in peering
-                for node in peer]
+            peers = set(node.data.get('href') for peer in peering
+                for node in peer)
             for destination in routing_node_gateway.destinations:
-                if destination not in peers:
+                if destination.href not in peers:
                     peering[0].data.setdefault('routing_node', []).append(
                         {'level': 'any', 'href': destination.href,
                          'name': destination.name})
@@ -633,10 +693,10 @@ class Routing(RoutingTree):
                 # A gateway exists on this network
                 for gw in network:
                     if gw.routing_node_element == gateway_element_type:
-                        existing_dests = [node.routing_node_element for node in gw]
+                        existing_dests = set(node.data.get('href') for node in gw)
                         for destination in routing_node_gateway.destinations:
                             is_valid_destination = False
-                            if destination not in existing_dests:
+                            if destination.href not in existing_dests:
                                 dest_ipv4, dest_ipv6 = _which_ip_protocol(destination)
                                 if len(network.ip.split(':')) > 1: # IPv6
                                     if dest_ipv6:
@@ -710,10 +770,44 @@ class Routing(RoutingTree):
                     node_changed = True
         return node_changed
 
+    def _remove_gateway_node(self, element, network=None):
+        """
+        Remove a gateway from the routing data of this interface and
+        update the interface, instead of deleting each gateway routing
+        node.
+
+        :return: Whether a change was made or not
+        :rtype: bool
+        """
+        element = element_resolver(element)
+        modified = False
+        nodes = self.data.get('routing_node', [])
+        # Tunnel Interface binds gateways to the interface
+        remaining = [node for node in nodes if not (
+            _node_data(node).get('level') == 'gateway' and
+            _node_data(node).get('href') == element)]
+        if len(remaining) != len(nodes):
+            self.data['routing_node'] = remaining
+            modified = True
+        for network_node in self:
+            if network_node.level != 'network' or (
+                network is not None and network_node.ip != network):
+                continue
+            nodes = network_node.data.get('routing_node', [])
+            remaining = [node for node in nodes
+                         if _node_data(node).get('href') != element]
+            if len(remaining) != len(nodes):
+                network_node.data['routing_node'] = remaining
+                modified = True
+        if modified:
+            self.update()
+        return modified
+
 
 class RoutingNodeGateway(Routing):
     def __init__(self, element=None, level='gateway', **kwargs):
         self.destinations = kwargs.pop('destinations', [])
+        self._element = element
         self.data = ElementCache(kwargs)
         self.data.update(
             level=level,
@@ -731,6 +825,13 @@ class RoutingNodeGateway(Routing):
                  'name': destination.name,
                  'level': 'any'})
 
+    @property
+    def routing_node_element(self):
+        # The element is known, avoid resolving it from the href
+        if self._element is not None:
+            return self._element
+        return super(RoutingNodeGateway, self).routing_node_element
+
 
 class Antispoofing(RoutingTree):
     """
@@ -833,6 +934,176 @@ class Antispoofing(RoutingTree):
                 return True
         return False
 
+class RoutingChangeSet(object):
+    """
+    Stage many routing and antispoofing changes for an engine and send
+    them with one update per modified interface. Adding routes one at a
+    time with :meth:`Routing.add_static_route` updates the interface and
+    reloads the routing for every route::
+
+        with RoutingChangeSet(engine) as changes:
+            for network in networks:
+                changes.add_static_route(0, Router('router-1'), [network])
+            changes.add_bgp_peering(1, BGPPeering('peer'))
+            changes.remove_route_gateway(2, StaticNetlink('old-link'))
+            changes.add_antispoofing(0, Network('extra-net'))
+
+        print(changes.updated)
+
+    Changes are applied when the block exits or :meth:`commit` is called.
+    The routing and antispoofing trees are loaded once and the elements
+    used as gateways and destinations are fetched concurrently before the
+    IP version of each gateway and destination is validated against the
+    interface networks. Modified interface nodes are then updated
+    concurrently within a :meth:`smc.api.session.Session.atomic` block.
+
+    .. note:: Removed gateways are removed from the interface routing
+        data and sent with the interface update, instead of deleting each
+        gateway routing node.
+
+    :param Engine engine: engine to modify
+    :param int max_workers: maximum concurrent requests
+    """
+    def __init__(self, engine, max_workers=None):
+        self.engine = engine
+        self.max_workers = max_workers
+        self.operations = []
+        self.updated = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        return False
+    
+    def _stage(self, tree, interface_id, method, elements, *args, **kwargs):
+        self.operations.append(
+            (tree, str(interface_id), method, elements, args, kwargs))
+    
+    def add_static_route(self, interface_id, gateway, destination, network=None):
+        """
+        Stage a static route. See :meth:`Routing.add_static_route`.
+
+        :param str,int interface_id: interface routing node
+        """
+        self._stage('routing', interface_id, 'add_static_route',
+            [gateway] + list(destination), gateway, destination, network)
+    
+    def add_traffic_handler(self, interface_id, netlink, netlink_gw=None,
+                            network=None):
+        """
+        Stage a traffic handler. See :meth:`Routing.add_traffic_handler`.
+
+        :param str,int interface_id: interface routing node
+        """
+        self._stage('routing', interface_id, 'add_traffic_handler',
+            [netlink] + list(netlink_gw or []), netlink, netlink_gw, network)
+    
+    def add_bgp_peering(self, interface_id, bgp_peering, external_bgp_peer=None,
+                        network=None):
+        """
+        Stage a BGP peering. See :meth:`Routing.add_bgp_peering`.
+
+        :param str,int interface_id: interface routing node
+        """
+        self._stage('routing', interface_id, 'add_bgp_peering', [],
+            bgp_peering, external_bgp_peer, network)
+    
+    def add_ospf_area(self, interface_id, ospf_area, ospf_interface_setting=None,
+                      network=None, communication_mode='NOT_FORCED',
+                      unicast_ref=None):
+        """
+        Stage an OSPF area. See :meth:`Routing.add_ospf_area`.
+
+        :param str,int interface_id: interface routing node
+        """
+        self._stage('routing', interface_id, 'add_ospf_area', [],
+            ospf_area, ospf_interface_setting, network, communication_mode,
+            unicast_ref)
+    
+    def remove_route_gateway(self, interface_id, element, network=None):
+        """
+        Stage removing a gateway. See :meth:`Routing.remove_route_gateway`.
+
+        :param str,int interface_id: interface routing node
+        """
+        self._stage('routing', interface_id, '_remove_gateway_node', [],
+            element, network)
+    
+    def add_antispoofing(self, interface_id, element):
+        """
+        Stage an antispoofing entry. See :meth:`Antispoofing.add`.
+
+        :param str,int interface_id: interface antispoofing node
+        """
+        self._stage('antispoofing', interface_id, 'add', [], element)
+    
+    def remove_antispoofing(self, interface_id, element):
+        """
+        Stage removing an antispoofing entry. See :meth:`Antispoofing.remove`.
+
+        :param str,int interface_id: interface antispoofing node
+        """
+        self._stage('antispoofing', interface_id, 'remove', [], element)
+    
+    def _prefetch(self, elements):
+        # Load the data of gateway and destination elements used to
+        # validate IP versions, once per href
+        pending, loaded = {}, {}
+        for element in elements:
+            if isinstance(element, Element) and element.typeof in (
+                'host', 'router', 'netlink', 'network'):
+                if 'data' in vars(element):
+                    loaded.setdefault(element.href, element.data)
+                else:
+                    pending.setdefault(element.href, element)
+        for result in parallel_map(lambda element: element.data,
+                [element for href, element in pending.items()
+                 if href not in loaded], self.max_workers):
+            if result.ok:
+                loaded[result.item.href] = result.result
+        for element in elements:
+            if isinstance(element, Element) and 'data' not in vars(element) \
+                and element.href in loaded:
+                element.data = loaded[element.href]
+    
+    def commit(self):
+        """
+        Apply the staged changes. Interfaces that were modified are
+        updated concurrently.
+        
+        When called within an open atomic block, the changes join that
+        transaction and are sent when the outer block exits. The
+        returned list and `updated` are then empty; the updated nodes
+        are in the outer transactions `updated`.
+
+        :raises InterfaceNotFound: a staged interface does not exist
+        :raises UpdateElementFailed: failure updating an interface
+        :return: routing and antispoofing nodes that were updated
+        :rtype: list(RoutingTree)
+        """
+        operations, self.operations = self.operations, []
+        if not operations:
+            return []
+        trees = {}
+        for tree in set(op[0] for op in operations):
+            root = getattr(self.engine, tree)
+            trees[tree] = {interface_id: root.get(interface_id)
+                for interface_id in set(op[1] for op in operations
+                                        if op[0] == tree)}
+        self._prefetch([element for op in operations for element in op[3]])
+        
+        session = _get_session()
+        nested = session.transaction is not None
+        with session.atomic(self.max_workers) as transaction:
+            for tree, interface_id, method, _, args, kwargs in operations:
+                getattr(trees[tree][interface_id], method)(*args, **kwargs)
+        self.updated = [] if nested else list(transaction.updated)
+        return self.updated
+
+
 def from_meta(node):
     """
     Helper method that reolves a routing node to element. Rather than doing
@@ -854,21 +1125,172 @@ def from_meta(node):
         href=node.data.get('href'))
 
 
-def route_level(root, level):
+def _gateway_parents(gateway):
+    # If the parent is level interface, this is a tunnel interface
+    # where the gateway is bound to interface versus network
+    parent = gateway._parent
+    if parent is None:
+        return (None, None)
+    if parent.level == 'interface':
+        return (parent, None)
+    return (parent._parent, parent)
+
+
+RouteEntry = collections.namedtuple('RouteEntry',
+    'network interface network_node gateway destination')
+"""
+A network in the routing table. Networks directly connected to an
+interface have no gateway. Destinations of a gateway, i.e. the networks
+of a static route, have the gateway and destination node.
+
+:ivar network: network of the route
+:ivar Routing interface: interface routing node
+:ivar Routing network_node: network routing node, None for gateways
+    bound to a tunnel interface
+:ivar Routing gateway: gateway routing node or None
+:ivar Routing destination: destination routing node or None
+"""
+
+
+class RoutingIndex(object):
     """
-    Helper method to recurse the current node and return
-    the specified routing node level.
+    Index of a routing tree built in one pass over the routing data.
+    Interfaces are indexed by nic id, nodes by level, gateways by type and
+    network, and networks and gateway destinations in a :class:`PrefixTrie`
+    so the routes for an address are found with a longest prefix match::
+
+        >>> index = engine.routing.index
+        >>> for route in index.lookup('10.1.2.3'):
+        ...   route.interface, route.gateway
+        ...
+        (Routing(name=Interface 0,level=interface,type=physical_interface),
+         Routing(name=router-1.1.1.1,level=gateway,type=router))
+
+    The index of a routing node is available from :attr:`RoutingTree.index`
+    and is rebuilt after the routing is modified.
+
+    :param RoutingTree root: routing node to index
     """
-    def recurse(nodes):
-        for node in nodes:
-            if node.level == level:
-                routing_node.append(node)
-            else:
-                recurse(node)
+    def __init__(self, root):
+        self.interfaces = {}
+        self.levels = collections.defaultdict(list)
+        self.gateways = []  # (interface, network, gateway)
+        self.networks = PrefixTrie()
+        self._by_type = None
+        
+        def walk(node):
+            for child in node:
+                level = child.level
+                self.levels[level].append(child)
+                if level == 'interface':
+                    for nicid in (child.nicid, child.dynamic_nicid):
+                        if nicid is not None:
+                            self.interfaces.setdefault(str(nicid), child)
+                elif level == 'network':
+                    self._add(child.ip, RouteEntry(
+                        None, node, child, None, None))
+                elif level == 'gateway':
+                    self.gateways.append(_gateway_parents(child) + (child,))
+                else:
+                    interface, network = _gateway_parents(node)
+                    self._add(child.ip, RouteEntry(
+                        None, interface, network, node, child))
+                walk(child)
+        
+        walk(root)
+    
+    def _add(self, ip, entry):
+        if not ip:
+            return
+        try:
+            network = ipaddress.ip_network(unicode(ip), strict=False)
+        except ValueError:
+            return
+        self.networks.setdefault(network, []).append(
+            entry._replace(network=network))
+    
+    def level(self, level):
+        """
+        Nodes at a routing level
+
+        :param str level: interface, network, gateway or any
+        :rtype: list(Routing)
+        """
+        return self.levels.get(level, [])
+    
+    def gateways_by_type(self, type=None, on_network=None):  # @ReservedAssignment
+        """
+        Gateways of a type, optionally only on a network
 
-    routing_node = []
-    recurse(root)
-    return routing_node
+        :param str type: bgp_peering, netlink, ospfv2_area, router, etc.
+            None returns gateways of all types
+        :param str on_network: network CIDR
+        :return: tuple of (interface, network, gateway)
+        :rtype: list
+        """
+        if type is None:
+            gateways = self.gateways
+        else:
+            if self._by_type is None:
+                by_type = collections.defaultdict(list)
+                for entry in self.gateways:
+                    gateway = entry[2]
+                    #TODO: Change to gateway.related_element_type when
+                    # only supporting SMC >= 6.4
+                    typeof = gateway.data.get('related_element_type') or \
+                        gateway.routing_node_element.typeof
+                    by_type[typeof].append(entry)
+                self._by_type = by_type
+            gateways = self._by_type.get(type, [])
+        if on_network is not None:
+            return [entry for entry in gateways
+                    if entry[1] is not None and entry[1].ip == on_network]
+        return list(gateways)
+    
+    def lookup(self, address):
+        """
+        Routes for the longest matching network of an address. Directly
+        connected networks and gateway destinations with the same network
+        are all returned.
+
+        :param str address: IP address or network
+        :return: list of routes, empty if no route matches
+        :rtype: list(RouteEntry)
+        """
+        match = self.networks.lookup(address)
+        return list(match[1]) if match else []
+    
+    def interface_for(self, address):
+        """
+        Interface routing node with the longest matching network for an
+        address
+
+        :param str address: IP address
+        :rtype: Routing or None
+        """
+        for route in self.lookup(address):
+            return route.interface
+    
+    def gateway_for(self, address):
+        """
+        Gateway routing node with the longest matching destination for an
+        address. Directly connected networks have no gateway.
+
+        :param str address: IP address
+        :rtype: Routing or None
+        """
+        for _network, routes in reversed(self.networks.matches(address)):
+            for route in routes:
+                if route.gateway is not None:
+                    return route.gateway
+
+
+def route_level(root, level):
+    """
+    Helper method to return the routing nodes of the specified
+    level below the current node.
+    """
+    return list(root.index.level(level))
 
 
 def gateway_by_type(self, type=None, on_network=None):  # @ReservedAssignment
@@ -885,30 +1307,13 @@ def gateway_by_type(self, type=None, on_network=None):  # @ReservedAssignment
     :return: tuple of RoutingNode(interface,network,gateway)
     :rtype: list
     """
-    gateways = route_level(self, 'gateway')
     if not type:
-        for gw in gateways:
+        for gw in route_level(self, 'gateway'):
             yield gw
     else:
-        for node in gateways:
-            #TODO: Change to type == node.related_element_type when
-            # only supporting SMC >= 6.4
-            if type == node.routing_node_element.typeof:
-                # If the parent is level interface, this is a tunnel interface
-                # where the gateway is bound to interface versus network
-                parent = node._parent
-                if parent.level == 'interface':
-                    interface = parent
-                    network = None
-                else:
-                    network = parent
-                    interface = network._parent
-                
-                if on_network is not None:
-                    if network and network.ip == on_network:
-                        yield (interface, network, node)
-                else:
-                    yield (interface, network, node)
+        for interface, network, node in self.index.gateways_by_type(
+            type, on_network):
+            yield (interface, network, node)
 
 
 def _which_ip_protocol(element):
@@ -938,26 +1343,47 @@ def _which_ip_protocol(element):
     return True, True
 
 
-def del_invalid_routes(engine, nicids):
+def del_invalid_routes(engine, nicids, max_workers=None):
     """
     Helper method to run through and delete any routes that are tagged
     as invalid or to_delete by a list of nicids. Since we could have a
     list of routes, iterate from top level engine routing node to avoid
     fetch exceptions. Route list should be a list of nicids as str.
     
+    Deletable nodes are collected in one pass over the routing tree and
+    deleted concurrently, each with its ETag. The routing cache is
+    flushed once after all nodes are deleted.
+    
     :param list nicids: list of nicids
+    :param int max_workers: maximum concurrent deletes
     :raises DeleteElementFailed: delete element failed with reason
+    :return: routing nodes that were deleted
+    :rtype: list(Routing)
     """
-    nicids = map(str, nicids)
-    for interface in engine.routing:
-        if interface.nicid in nicids:
-            if getattr(interface, 'to_delete', False): # Delete the invalid interface
-                interface.delete()
-                continue
+    nicids = set(str(nicid) for nicid in nicids)
+    routing = engine.routing
+    deletable = []
+    for interface in routing:
+        if interface.nicid in nicids and interface.data.get('to_delete', False):
+            deletable.append(interface) # Delete the invalid interface
+            continue
         for network in interface:
-            if getattr(network, 'invalid', False) or \
-                getattr(network, 'to_delete', False):
-                network.delete()
+            if network.data.get('invalid', False) or \
+                network.data.get('to_delete', False):
+                deletable.append(network)
+    if not deletable:
+        return []
+    
+    def delete(node):
+        super(RoutingTree, node).delete()
+        return node
+    
+    results = parallel_map(delete, deletable, max_workers)
+    flush_parent_cache(routing)
+    errors = [result.error for result in results if not result.ok]
+    if errors:
+        raise errors[0]
+    return [result.result for result in results]
 
 
 route = collections.namedtuple('Route',
@@ -1,6 +1,6 @@
 """
-Waiters are convenience classes that use blocking or non-blocking threads to
-monitor for a particular state of an engine node.
+Waiters are convenience classes that monitor for a particular state of an
+engine node, either blocking or non-blocking.
 
 A waiter can have a callback added that will be executed after either
 the state has matched, a number of iterations exceeded or an exception is
@@ -33,9 +33,20 @@ to block input while waiting for the engine to reach a specific status::
     while not waiter.done():
         print("Status after 5 sec wait: %s" % waiter.result(5))
 
+Waiters do not run a thread each. Waiters of the nodes of an engine are
+polled together by a single job on the shared :mod:`smc.base.scheduler`,
+which retrieves the status of each node once per interval and updates all
+waiters of that node. Each waiter has a `future` that resolves to the last
+status, and waiters can be awaited from asyncio code::
+
+    waiters = [ConfigurationStatusWaiter(node, 'Configured', max_wait=120)
+               for engine in engines for node in engine.nodes]
+    statuses = await asyncio.gather(*waiters)
+
 """
-import time
 import threading
+from concurrent import futures
+from smc.base.scheduler import PollJob, default_scheduler
 
 #: Configuration status constant values
 CFG_STATUS = frozenset(['Initial', 'Declared', 'Configured', 'Installed'])
@@ -51,96 +62,202 @@ STATE = frozenset(['INITIAL', 'READY', 'ERROR', 'SERVER_ERROR', 'NO_STATUS',
                    'TIMEOUT', 'DELETED', 'DUMMY'])
 
 
-class NodeWaiter(threading.Thread):
+#: Guards the registry of engine pollers and the waiters of each poller
+_registry_lock = threading.Lock()
+
+
+def _engine_key(node):
+    # Engine href of the node, nodes are located below their engine
+    engine = getattr(node, '_engine', None)
+    if engine is not None:
+        return engine.href
+    return node.href.rsplit('/node/', 1)[0]
+
+
+class EngineStatusPoller(PollJob):
     """
-    Node Waiter provides a common threaded interface to monitoring
-    a nodes status and wait for a specific response.
+    Polls the status of the nodes of one engine for all waiters of those
+    nodes. The status of each node is retrieved once per interval, no
+    matter how many waiters monitor the node. The poller finishes when
+    it has no waiters left and a new poller is started for the next
+    waiter of the engine.
+
+    :param str key: engine href
+    :param int interval: seconds between polls
+    """
+    _pollers = {}
+
+    def __init__(self, key, interval):
+        super(EngineStatusPoller, self).__init__(
+            interval=interval, max_interval=interval, backoff=1)
+        self.key = key
+        self.waiters = []
+
+    @classmethod
+    def register(cls, waiter, scheduler=None):
+        """
+        Add a waiter to the poller of its engine, starting the poller
+        if the engine is not being polled.
+
+        :param NodeWaiter waiter: waiter to poll
+        :param Scheduler scheduler: scheduler used to poll the engine
+        """
+        key = (_engine_key(waiter._resource), waiter._timeout)
+        with _registry_lock:
+            poller = cls._pollers.get(key)
+            if poller is None:
+                poller = cls._pollers[key] = cls(key[0], waiter._timeout)
+                poller.waiters.append(waiter)
+                if scheduler is None:
+                    scheduler = default_scheduler
+                scheduler.add(poller)
+            else:
+                poller.waiters.append(waiter)
+
+    def _unregister(self):
+        # Called with the registry lock held
+        key = (self.key, self.interval)
+        if self._pollers.get(key) is self:
+            del self._pollers[key]
+
+    def poll(self):
+        with _registry_lock:
+            waiters = [waiter for waiter in self.waiters if not waiter.done()]
+        statuses = {}
+        for waiter in waiters:
+            href = waiter._resource.href
+            if href not in statuses:
+                try:
+                    statuses[href] = waiter._resource.status()
+                except Exception as e:
+                    statuses[href] = e
+            waiter._update(statuses[href])
+        with _registry_lock:
+            self.waiters = [waiter for waiter in self.waiters
+                            if not waiter.done()]
+            if not self.waiters:
+                self._unregister()
+                return True
+        return False
+
+    def complete(self, error=None):
+        with _registry_lock:
+            self._unregister()
+            waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            waiter._finish(error)
+        super(EngineStatusPoller, self).complete(error)
+
+
+class NodeWaiter(object):
+    """
+    Node Waiter provides a common interface to monitoring a nodes status
+    and wait for a specific response. The node is polled by the
+    :class:`EngineStatusPoller` of its engine.
+
+    :param Node resource: Engine node to check for status
+    :param str status: status to wait for
+    :param int timeout: seconds between status checks
+    :param int max_wait: maximum number of status checks
+    :param Scheduler scheduler: scheduler used to poll the engine
     """
     def __init__(self, resource, status, timeout=5,
-                 max_wait=36, **kw):
-        threading.Thread.__init__(self)
+                 max_wait=36, scheduler=None, **kw):
         self._desired_status = status
         self._resource = resource #node resource
         self._status = None
         self._max_wait = max_wait
         self._timeout = timeout
         self.callbacks = []
-        self._done = threading.Event()
-        self.daemon = True
-        self.start()
-
-    def run(self):
-        while not self.finished():
-            time.sleep(self._timeout)
-            try:
-                self._status = self._get_status()
-                self._max_wait -= 1
-            except Exception as e:
-                self._status = e
-                break
-
-        self._done.set()
-        for call in self.callbacks:
-            call(self._status)
-
-    def _get_status(self):
-        # Raises NodeCommandFailed
+        self.future = futures.Future()
+        self._lock = threading.Lock()
+        EngineStatusPoller.register(self, scheduler)
+
+    def _update(self, status):
+        # Called by the engine poller with the latest node status or
+        # the exception raised retrieving it
+        if isinstance(status, Exception):
+            self._status = status
+            self._finish(status)
+            return
+        self._status = self._get_status(status)
+        self._max_wait -= 1
+        if self.finished():
+            self._finish()
+
+    def _get_status(self, status):
         # Modified in 0.6.2 to support SMC 6.5 where the attribute name changed
-        status = self._resource.status()
         latest = [getattr(status, attr) for attr in self.value if getattr(status, attr)]
         if self._desired_status in latest:
             return self._desired_status
-        else:
-            return latest[0] or None
+        return latest[0] if latest else None
+
+    def _finish(self, error=None):
+        with self._lock:
+            if self.future.done():
+                return
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(self._status)
+        for call in self.callbacks:
+            call(self._status)
 
     def finished(self):
-        return self._done.is_set() or \
+        return self.future.done() or \
             self._status == self._desired_status or \
-            self._max_wait == 0
+            self._max_wait <= 0
 
     def add_done_callback(self, callback):
         """
-        Add a callback to run after the task completes.
+        Add a callback to run after the waiter completes.
         The callable must take 1 argument which will be
-        the completed Task.
+        the last status, or the exception raised while
+        retrieving the status.
 
         :param callable callback
         """
-        if self._done.is_set():
-            raise ValueError('Thread has already terminated, cannot add callback.')
-        if callable(callback):
-            self.callbacks.append(callback)
+        with self._lock:
+            if self.future.done():
+                raise ValueError('Waiter has already finished, cannot add callback.')
+            if callable(callback):
+                self.callbacks.append(callback)
 
     def done(self):
         """
-        Is the task still running or considered complete
+        Is the waiter still running or considered complete
 
         :rtype: bool
         """
-        return self._done.is_set() or not self.isAlive()
+        return self.future.done()
 
     def result(self, timeout=None):
         """
-        Get current status result after waiting timeout
-        Result does a join on the thread to get a status update. It
-        is possible the first couple of statuses are None if an
-        update has not yet been joined.
+        Get current status result after waiting timeout. It is
+        possible the first couple of statuses are None if the
+        node has not yet been polled.
         """
         self.wait(timeout)
         return self._status
 
     def wait(self, timeout=None):
         """
-        Blocking method to wait for thread
+        Blocking method to wait for the waiter to complete
         """
-        self.join(timeout)
+        futures.wait([self.future], timeout=timeout)
 
     def stop(self):
         """
-        Stop thread if it's still running
+        Stop waiting. The node is no longer polled for this waiter.
+        """
+        self._finish()
+
+    def __await__(self):
+        """
+        Await the last status from asyncio code
         """
-        if self.isAlive():
-            self._done.set()
+        import asyncio
+        return asyncio.wrap_future(self.future).__await__()
 
 
 class ConfigurationStatusWaiter(NodeWaiter):
@@ -152,8 +269,8 @@ class ConfigurationStatusWaiter(NodeWaiter):
     :param str status: used defined status to wait for.
     :raises NodeCommandFailed: Failure to obtain a status back
         from the engine. This can be thrown when getting initial
-        status. If thrown after the thread has started, it is caught
-        and returned in the ``result`` after ending the thread.
+        status. If thrown while waiting, it is caught and returned
+        in the ``result`` after the waiter completes.
     """
     value = ('configuration_status',)
 
@@ -173,8 +290,8 @@ class NodeStatusWaiter(NodeWaiter):
     :param str status: used defined status to wait for.
     :raises NodeCommandFailed: Failure to obtain a status back
         from the engine. This can be thrown when getting initial
-        status. If thrown after the thread has started, it is caught
-        and returned in the ``result`` after ending the thread.
+        status. If thrown while waiting, it is caught and returned
+        in the ``result`` after the waiter completes.
     """
     # Node status changed in SMC 6.5 from status to monitoring_status so
     # value was changed to an iterable to check for a status other than
@@ -197,8 +314,8 @@ class NodeStateWaiter(NodeWaiter):
     :param str status: used defined status to wait for.
     :raises NodeCommandFailed: Failure to obtain a status back
         from the engine. This can be thrown when getting initial
-        status. If thrown after the thread has started, it is caught
-        and returned in the ``result`` after ending the thread.
+        status. If thrown while waiting, it is caught and returned
+        in the ``result`` after the waiter completes.
     """
     value = ('state', 'monitoring_state')
 
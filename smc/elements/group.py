@@ -3,9 +3,12 @@ Groups that are used for element types, such as TCPServiceGroup,
 Group (generic), etc. All group types inherit from GroupMixin which
 allow for modifications of existing groups and their members.
 """
+import collections
 from smc.base.model import Element, ElementCreator
 from smc.api.exceptions import ElementNotFound
 from smc.base.util import element_resolver
+from smc.base.workers import parallel_map
+from smc.api.common import fetch_meta_by_name
 
 
 class GroupMixin(object):
@@ -16,7 +19,7 @@ class GroupMixin(object):
     
     @classmethod
     def update_or_create(cls, append_lists=True, with_status=False,
-                         remove_members=False, **kwargs):
+                         remove_members=False, max_members=None, **kwargs):
         """
         Update or create group entries. If the group exists, the members
         will be updated. Set append_lists=True to add new members to
@@ -26,6 +29,8 @@ class GroupMixin(object):
         :param bool append_lists: add to existing members, if any
         :param bool remove_members: remove specified members instead of appending
             or overwriting
+        :param int max_members: split members into nested groups when the
+            group would have more members, see :meth:`update_members`
         :paran dict kwargs: keyword arguments to satisfy the `create`
             constructor if the group needs to be created.
         :raises CreateElementFailed: could not create element with reason 
@@ -39,47 +44,126 @@ class GroupMixin(object):
             was_modified = element.update_members(
                 kwargs.get('members', []),
                 append_lists=append_lists,
-                remove_members=remove_members)
+                remove_members=remove_members,
+                max_members=max_members)
         except ElementNotFound: 
-            element = cls.create(
-                kwargs.get('name'),
-                members = kwargs.get('members', []))
+            members = kwargs.get('members', [])
+            if max_members and len(members) > max_members:
+                element = cls.create(kwargs.get('name'))
+                element.update_members(members, max_members=max_members)
+            else:
+                element = cls.create(
+                    kwargs.get('name'),
+                    members = members)
             was_created = True
         
         if with_status:
             return element, was_modified, was_created
         return element
     
-    def update_members(self, members, append_lists=False, remove_members=False):
+    def update_members(self, members, append_lists=False, remove_members=False,
+                       max_members=None):
         """
         Update group members with member list. Set append=True
         to append to existing members, or append=False to overwrite.
+        Members provided as elements that are not yet resolved are
+        resolved in a batch. If the membership does not change, the
+        group is not updated.
+        
+        Very large groups can be split into nested groups by setting
+        `max_members`. If the resulting membership exceeds `max_members`,
+        members are placed in groups of the same type named
+        ``<name>_part_<n>`` that become the members of this group. When
+        splitting, the members of existing nested groups are considered the
+        members of this group.
 
         :param list members: new members for group by href or Element
         :type members: list[str, Element]
         :param bool append_lists: whether to append
         :param bool remove_members: remove members from the group
+        :param int max_members: maximum members per group before splitting
+            into nested groups
         :return: bool was modified or not
         """
-        if members:
-            elements = [element_resolver(element) for element in members]
-            if remove_members:
-                element = [e for e in self.members if e not in elements]
-                if set(element) == set(self.members):
-                    remove_members = element = False
-                append_lists = False
-            elif append_lists:
-                element = [e for e in elements if e not in self.members]
-            else:
-                element = list(set(elements))
-            
-            if element or remove_members:
-                self.update(
-                    element=element,
-                    append_lists=append_lists)
-                return True
+        if not members:
+            return False
+        
+        elements = list(collections.OrderedDict.fromkeys(
+            element_resolver(members)))
+        subgroups = self._subgroups() if max_members else []
+        if subgroups:
+            # Members added directly next to the nested groups are kept
+            nested = set(group.href for group in subgroups)
+            for result in parallel_map(lambda group: group.members, subgroups):
+                if not result.ok:
+                    raise result.error
+            current = [member for member in self.members
+                       if member not in nested] + \
+                [member for group in subgroups for member in group.members]
+        else:
+            current = self.members
+        existing = set(current)
+        
+        if remove_members:
+            removed = set(elements)
+            element = [e for e in current if e not in removed]
+            modified = len(element) != len(current)
+        elif append_lists:
+            element = current + [e for e in elements if e not in existing]
+            modified = len(element) != len(current)
+        else:
+            element = elements
+            modified = set(element) != existing
+        
+        if not modified:
+            return False
         
-        return False
+        if max_members and len(element) > max_members:
+            self._split_members(element, max_members, subgroups)
+        else:
+            self.update(element=element, append_lists=False)
+            for group in subgroups:
+                group.delete()
+        return True
+    
+    def _subgroups(self):
+        """
+        Nested groups created by splitting this group, in order. The
+        nested groups are found with a single search by name prefix
+        rather than fetching each member.
+        
+        :rtype: list
+        """
+        members = set(member for member in self.members
+                      if '/{}/'.format(self.typeof) in member)
+        if not members:
+            return []
+        subgroups = {}
+        prefix = '{}_part_'.format(self.name)
+        for meta in fetch_meta_by_name(prefix, filter_context=self.typeof,
+                                       exact_match=False).json:
+            name = meta.get('name', '')
+            if meta.get('href') in members and name.startswith(prefix) and \
+                name[len(prefix):].isdigit():
+                subgroups[int(name[len(prefix):])] = type(self)(**meta)
+        return [subgroups[index] for index in sorted(subgroups)]
+    
+    def _split_members(self, members, max_members, subgroups):
+        chunks = [members[i:i + max_members]
+                  for i in range(0, len(members), max_members)]
+        results = parallel_map(
+            lambda index: type(self).update_or_create(
+                name='{}_part_{}'.format(self.name, index + 1),
+                members=chunks[index], append_lists=False),
+            range(len(chunks)))
+        for result in results:
+            if not result.ok:
+                raise result.error
+        nested = [result.result.href for result in results]
+        if set(nested) != set(self.members):
+            self.update(element=nested, append_lists=False)
+        for group in subgroups[len(chunks):]:
+            group.delete()
 
     def obtain_members(self):
         """
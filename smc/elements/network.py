@@ -1,10 +1,16 @@
 """
 Module representing network elements used within the SMC
 """
+import tempfile
 from smc.base.model import Element, ElementCreator
 from smc.api.exceptions import MissingRequiredInput, CreateElementFailed,\
     ElementNotFound, FetchElementFailed
 from smc.base.util import element_resolver
+from smc.api.web import MultipartFile
+
+
+#: Size in bytes at which IPList uploads are spooled to a temporary file
+SPOOL_SIZE = 8 * 1024 * 1024
 
 
 class Host(Element):
@@ -470,7 +476,8 @@ class IPList(Element):
             element = cls.get(kwargs.get('name')) 
             if append_lists:
                 iplist = element.iplist
-                diff = [i for i in kwargs.get('iplist', []) if i not in iplist]
+                existing = set(iplist)
+                diff = [i for i in kwargs.get('iplist', []) if i not in existing]
                 if diff:
                     iplist.extend(diff)
                 else:
@@ -492,6 +499,112 @@ class IPList(Element):
             return element, was_modified, was_created 
         return element 
                 
+    def sync(self, entries, collapse=False, as_type='zip'):
+        """
+        Replace the contents of the IPList with the provided entries if
+        they differ from the current contents. Entries are IP addresses,
+        networks or ranges (i.e. '1.1.1.1-1.1.1.10') and are normalized
+        before comparing, so '10.0.0.1/32' matches an existing '10.0.0.1'.
+        Invalid entries are skipped and counted.
+        The current contents are downloaded in text format and compared
+        in linear time. If there are changes, the full list is uploaded
+        in zip (default) or txt format.
+        ::
+
+            >>> IPList('threat-intel').sync(open('feed.txt'), collapse=True)
+            {'added': 1200, 'removed': 35, 'total': 310442, 'invalid': 2,
+             'uploaded': True, 'payload_size': 1288765}
+
+        :param iterable entries: IP addresses, networks or ranges
+        :param bool collapse: collapse entries into the smallest list of
+            networks before comparing
+        :param str as_type: upload format, zip or txt
+        :raises FetchElementFailed: failed to download the current list
+        :raises CreateElementFailed: failed to upload the list
+        :return: count of 'added', 'removed', 'total' and 'invalid'
+            entries, whether the list was 'uploaded' and the 'payload_size'
+            in bytes
+        :rtype: dict
+        """
+        from smc.base import addresses
+        invalid = []
+        desired = list(addresses.normalize_all(entries, errors=invalid))
+        if collapse:
+            desired = addresses.collapse(desired)
+        content = self.download(as_type='txt') or ''
+        current = addresses.normalize_all(content.splitlines(), errors=[])
+        added, removed = addresses.diff(current, desired)
+        
+        result = dict(added=len(added), removed=len(removed), total=len(desired),
+                      invalid=len(invalid), uploaded=False, payload_size=0)
+        if added or removed:
+            result.update(uploaded=True,
+                payload_size=self._upload_entries(desired, as_type)[0])
+        return result
+    
+    def _upload_entries(self, entries, as_type='zip'):
+        """
+        Upload entries in zip or txt format, returning the payload size
+        and number of entries
+        """
+        from smc.base import addresses
+        count = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as payload:
+            if as_type == 'zip':
+                count = addresses.write_zip(entries, payload)
+            else:
+                for entry in entries:
+                    payload.write('{}\n'.format(entry).encode('utf-8'))
+                    count += 1
+            size = payload.tell()
+            payload.seek(0)
+            self.make_request(
+                CreateElementFailed,
+                method='create',
+                resource='ip_address_list',
+                files=MultipartFile('ip_addresses', 'iplist.{}'.format(as_type),
+                    payload),
+                params={'format': 'txt'} if as_type == 'txt' else None)
+        return size, count
+    
+    def ingest(self, source, column=None, delimiter=',', unique=False,
+               as_type='zip'):
+        """
+        Replace the contents of the IPList from a stream of entries, such
+        as a threat intelligence feed. Entries are read, validated and
+        normalized as they are consumed and written to a zip (or txt)
+        payload that is spooled to a temporary file and streamed when
+        uploaded, so memory use does not grow with the size of the feed.
+        Invalid entries are skipped.
+        ::
+
+            >>> with open('drop.txt') as feed:
+            ...     IPList('spamhaus-drop').ingest(feed)
+            {'total': 1042, 'invalid': 0, 'invalid_sample': [], 'payload_size': 6211}
+            >>> with open('indicators.csv') as feed:
+            ...     IPList('intel').ingest(feed, column='ip', unique=True)
+
+        :param iterable source: iterable or file of entries, one per line.
+            See :func:`smc.base.addresses.iter_entries` for supported formats
+        :param column: read entries from this CSV column (index or header name)
+        :param str delimiter: CSV delimiter
+        :param bool unique: remove duplicate entries. This requires keeping
+            the entries seen in memory
+        :param str as_type: upload format, zip or txt
+        :raises CreateElementFailed: failed to upload the list
+        :return: count of 'total' entries uploaded, 'invalid' entries with
+            an 'invalid_sample' of them, and the 'payload_size' in bytes
+        :rtype: dict
+        """
+        from smc.base import addresses
+        errors = addresses.ErrorSample()
+        entries = addresses.normalize_all(
+            addresses.iter_entries(source, column, delimiter),
+            errors=errors, unique=unique)
+        size, count = self._upload_entries(entries, as_type)
+        return dict(total=count, invalid=errors.count,
+                    invalid_sample=errors.entries, payload_size=size)
+
     @property
     def iplist(self):
         """
@@ -0,0 +1,316 @@
+"""
+Collect node status and health for many engines.
+
+:meth:`smc.core.node.Node.status` and :attr:`~smc.core.node.Node.health`
+return the same node status, and
+:attr:`~smc.core.node.Node.interface_status` and
+:attr:`~smc.core.node.Node.hardware_status` are both read from the nodes
+appliance status. The collector fetches each of these once per node,
+for all nodes concurrently, and normalizes them into tables of records::
+
+    from smc.fleet.select import select_engines
+    from smc.fleet.health import HealthCollector
+
+    collector = HealthCollector(select_engines(pattern='branch-*'))
+    snapshot = collector.collect()
+    down = [row for row in snapshot.interfaces if row.status != 'Up']
+    columns = snapshot.columns('nodes')
+    print(columns['name'], columns['monitoring_status'])
+
+Collecting again returns only what changed since the previous snapshot.
+Collection can also run periodically on the shared scheduler, with a
+callback that receives the changes::
+
+    def report(changes, snapshot):
+        for change in changes:
+            print(change)
+
+    job = collector.every(60, report)
+    ...
+    job.cancel()
+
+To bound the load on the SMC, `max_requests` limits the number of
+requests made per collection. When all nodes cannot be collected within
+the budget, nodes are collected in rotation and rows of nodes that were
+not collected are carried over from the previous snapshot.
+"""
+import time
+import logging
+import collections
+from smc.api.exceptions import NodeCommandFailed
+from smc.base.workers import parallel_map
+from smc.base.scheduler import PollJob, default_scheduler
+
+
+logger = logging.getLogger(__name__)
+
+
+NodeHealth = collections.namedtuple('NodeHealth',
+    'engine name configuration_status dyn_up installed_policy platform state '
+    'status version engine_node_status monitoring_state monitoring_status error')
+
+InterfaceHealth = collections.namedtuple('InterfaceHealth',
+    'engine node interface_id name status speed_duplex mtu port capability '
+    'flow_control aggregate_is_active')
+
+HardwareHealth = collections.namedtuple('HardwareHealth',
+    'engine node sub_system label param value status')
+
+Change = collections.namedtuple('Change', 'table key field old new')
+"""
+A change between two snapshots. Rows that were added or removed have a
+field of None and the row as the new or old value.
+
+:ivar str table: nodes, interfaces or hardware
+:ivar tuple key: key of the row
+:ivar str field: field that changed
+"""
+
+#: Table name: (record type, number of leading fields that are the key)
+TABLES = collections.OrderedDict([
+    ('nodes', (NodeHealth, 2)),
+    ('interfaces', (InterfaceHealth, 3)),
+    ('hardware', (HardwareHealth, 5))])
+
+
+def _record(cls, values):
+    return cls(**{field: values.get(field) for field in cls._fields})
+
+
+class Snapshot(object):
+    """
+    Node status and health collected at a point in time
+
+    :ivar list nodes: list of :class:`NodeHealth`
+    :ivar list interfaces: list of :class:`InterfaceHealth`
+    :ivar list hardware: list of :class:`HardwareHealth`
+    :ivar float time: time the collection completed
+    """
+    def __init__(self, nodes=None, interfaces=None, hardware=None):
+        self.nodes = nodes or []
+        self.interfaces = interfaces or []
+        self.hardware = hardware or []
+        self.time = time.time()
+
+    def rows(self, table):
+        """
+        Rows of a table by key
+
+        :param str table: nodes, interfaces or hardware
+        :rtype: dict
+        """
+        size = TABLES[table][1]
+        return collections.OrderedDict(
+            (row[:size], row) for row in getattr(self, table))
+
+    def columns(self, table):
+        """
+        A table in columnar form
+
+        :param str table: nodes, interfaces or hardware
+        :return: dict of field: list of values
+        :rtype: dict
+        """
+        fields = TABLES[table][0]._fields
+        rows = getattr(self, table)
+        return collections.OrderedDict(
+            (field, [row[position] for row in rows])
+            for position, field in enumerate(fields))
+
+    def diff(self, previous):
+        """
+        Changes since a previous snapshot
+
+        :param Snapshot previous: earlier snapshot, or None
+        :rtype: list(Change)
+        """
+        changes = []
+        for table, (cls, size) in TABLES.items():
+            old = previous.rows(table) if previous is not None else {}
+            new = self.rows(table)
+            for key, row in new.items():
+                before = old.get(key)
+                if before is None:
+                    changes.append(Change(table, key, None, None, row))
+                elif before != row:
+                    for position in range(size, len(cls._fields)):
+                        if before[position] != row[position]:
+                            changes.append(Change(table, key,
+                                cls._fields[position], before[position],
+                                row[position]))
+            for key, row in old.items():
+                if key not in new:
+                    changes.append(Change(table, key, None, row, None))
+        return changes
+
+    def __repr__(self):
+        return 'Snapshot(nodes=%s, interfaces=%s, hardware=%s)' % (
+            len(self.nodes), len(self.interfaces), len(self.hardware))
+
+
+def _collect_node(engine_name, node, appliance):
+    nodes, interfaces, hardware = [], [], []
+    try:
+        status = node.make_request(NodeCommandFailed, resource='status')
+    except Exception as e:
+        nodes.append(_record(NodeHealth, dict(
+            engine=engine_name, name=node.name, error=str(e))))
+        return nodes, interfaces, hardware
+    nodes.append(_record(NodeHealth, dict(
+        status, engine=engine_name, name=node.name)))
+    if not appliance:
+        return nodes, interfaces, hardware
+
+    try:
+        result = node.make_request(NodeCommandFailed,
+            resource='appliance_status')
+    except Exception as e:
+        nodes[0] = nodes[0]._replace(error=str(e))
+        return nodes, interfaces, hardware
+    for interface in result.get('interface_statuses', {}).get(
+        'interface_status', []):
+        interfaces.append(_record(InterfaceHealth, dict(
+            interface, engine=engine_name, node=node.name)))
+    for subsystem in result.get('hardware_statuses', {}).get(
+        'hardware_statuses', []):
+        for item in subsystem.get('items', []):
+            for status in item.get('statuses', []):
+                hardware.append(_record(HardwareHealth, dict(
+                    status, engine=engine_name, node=node.name,
+                    sub_system=status.get('sub_system', subsystem.get('name')))))
+    return nodes, interfaces, hardware
+
+
+class HealthCollector(object):
+    """
+    Collects the status and health of all nodes of a set of engines.
+
+    :param list engines: engines to collect, see
+        :func:`smc.fleet.select.select_engines`
+    :param bool appliance: also collect interface and hardware status.
+        This is an additional request per node.
+    :param int max_workers: maximum concurrent requests
+    :param int max_requests: maximum requests per collection, None for
+        no limit
+    """
+    def __init__(self, engines, appliance=True, max_workers=None,
+                 max_requests=None):
+        self.engines = list(engines)
+        self.appliance = appliance
+        self.max_workers = max_workers
+        self.max_requests = max_requests
+        self.snapshot = None
+        self._nodes = None
+        self._offset = 0
+
+    @property
+    def nodes(self):
+        """
+        Nodes of all engines as a list of (engine name, Node). Nodes are
+        found concurrently on first use.
+
+        :rtype: list(tuple)
+        """
+        if self._nodes is None:
+            self._nodes = []
+            for result in parallel_map(lambda engine: list(engine.nodes),
+                                       self.engines, self.max_workers):
+                if not result.ok:
+                    logger.error('Failed to get nodes for engine %s: %s',
+                        result.item.name, result.error)
+                    continue
+                for node in result.result:
+                    self._nodes.append((result.item.name, node))
+        return self._nodes
+
+    def refresh_nodes(self):
+        """
+        Find the engines nodes again on the next collection, i.e. after
+        nodes were added to a cluster.
+        """
+        self._nodes = None
+
+    def _window(self):
+        # Nodes to collect within the request budget, in rotation
+        nodes = self.nodes
+        per_node = 2 if self.appliance else 1
+        if self.max_requests is None or len(nodes) * per_node <= self.max_requests:
+            return nodes
+        count = max(1, self.max_requests // per_node)
+        start = self._offset % len(nodes)
+        self._offset = start + count
+        return (nodes + nodes)[start:start + count]
+
+    def collect(self):
+        """
+        Collect a new snapshot. The previous snapshot is replaced.
+
+        :rtype: Snapshot
+        """
+        window = self._window()
+        collected = set((engine, node.name) for engine, node in window)
+        snapshot = Snapshot()
+        for result in parallel_map(
+            lambda item: _collect_node(item[0], item[1], self.appliance),
+            window, self.max_workers):
+            nodes, interfaces, hardware = result.result
+            snapshot.nodes.extend(nodes)
+            snapshot.interfaces.extend(interfaces)
+            snapshot.hardware.extend(hardware)
+
+        if self.snapshot is not None and len(window) < len(self.nodes):
+            for table in TABLES:
+                getattr(snapshot, table).extend(
+                    row for row in getattr(self.snapshot, table)
+                    if tuple(row[:2]) not in collected)
+        order = dict(((engine, node.name), position)
+                     for position, (engine, node) in enumerate(self.nodes))
+        for table in TABLES:
+            getattr(snapshot, table).sort(
+                key=lambda row: order.get(tuple(row[:2]), len(order)))
+        self.snapshot = snapshot
+        return snapshot
+
+    def changes(self):
+        """
+        Collect a new snapshot and return the changes since the previous
+        snapshot. All rows are returned as added on the first collection.
+
+        :rtype: list(Change)
+        """
+        previous = self.snapshot
+        return self.collect().diff(previous)
+
+    def every(self, interval, callback, scheduler=None):
+        """
+        Collect periodically on the scheduler. The callback is called
+        with the list of changes and the snapshot after each collection.
+        Cancel the returned job to stop collecting.
+
+        :param int interval: seconds between collections
+        :param callable callback: callable taking changes and snapshot
+        :param Scheduler scheduler: scheduler, default is the shared
+            scheduler
+        :rtype: PollJob
+        """
+        job = _PeriodicCollection(self, callback, interval)
+        if scheduler is None:
+            scheduler = default_scheduler
+        return scheduler.add(job, delay=0)
+
+
+class _PeriodicCollection(PollJob):
+    def __init__(self, collector, callback, interval):
+        super(_PeriodicCollection, self).__init__(
+            interval=interval, backoff=1, jitter=0.05)
+        self.collector = collector
+        self.callback = callback
+
+    def poll(self):
+        try:
+            changes = self.collector.changes()
+            if changes:
+                self.callback(changes, self.collector.snapshot)
+        except Exception:
+            logger.exception('Health collection failed')
+        return False
@@ -0,0 +1,474 @@
+"""
+Provision many engines from a manifest.
+
+A manifest lists the engines to create with the keyword arguments for the
+engine classes ``create_bulk`` method. Values shared by all engines are
+provided once in ``defaults``::
+
+    defaults:
+      type: single_fw
+      log_server_ref: LogServer 172.18.1.150
+      location_ref: Branches
+      domain_server_address: [8.8.8.8]
+      policy: Branch Policy
+      initial_contact:
+        enable_ssh: true
+        filename: contact/{name}-{node}.cfg
+    engines:
+      - name: branch-001
+        primary_mgt: 0
+        interfaces:
+          - interface_id: 0
+            zone_ref: Internal
+            interfaces:
+              - nodes: [{address: 10.1.0.1, network_value: 10.1.0.0/24, nodeid: 1}]
+
+Besides the ``create_bulk`` arguments, an engine can specify the engine
+``type`` (engines with a ``create_bulk`` method, default: single_fw), the
+``policy`` to upload and ``initial_contact`` settings, which are the
+keyword arguments of :meth:`smc.core.node.Node.initial_contact` or True.
+The filename can include the ``{name}`` of the engine and the ``{node}``
+name.
+
+The manifest is validated and shared references are resolved once before
+any engine is created. The log server, policies and existing engines are
+resolved from a single listing each, and zones and locations are resolved
+(or created) once per name instead of once per engine. Each engine is then
+created, the initial contact is generated for each node and the policy is
+uploaded. Engines are provisioned concurrently and progress is streamed as
+each step completes::
+
+    from smc.fleet.provision import Provisioner
+
+    provisioner = Provisioner('branches.yml', journal='branches.journal')
+    for progress in provisioner.run():
+        print(progress)
+    print(provisioner.summary)
+
+Steps that complete are recorded in the journal. Running again with the
+same journal resumes after a partial failure; completed steps are skipped
+and engines that already exist are not created again.
+"""
+import os
+import re
+import copy
+import json
+import time
+import logging
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from smc.compat import string_types
+from smc.base.workers import parallel_map, AdaptiveLimiter, DEFAULT_WORKERS, \
+    should_back_off
+from smc.api.exceptions import TaskRunFailed
+from smc.fleet.select import listings
+from smc.reconcile.document import read
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+logger = logging.getLogger(__name__)
+
+
+CREATE = 'create'
+INITIAL_CONTACT = 'initial_contact'
+POLICY = 'policy'
+
+#: Provisioning steps in the order they run
+STEPS = (CREATE, INITIAL_CONTACT, POLICY)
+
+#: Manifest keys that are not passed to create_bulk
+PROVISION_KEYS = ('type', POLICY, INITIAL_CONTACT)
+
+#: Policy entry point by engine type
+POLICY_TYPES = {'single_fw': 'fw_policy', 'fw_cluster': 'fw_policy'}
+
+
+class Progress(collections.namedtuple(
+        'Progress', 'name step status detail')):
+    """
+    Outcome of a provisioning step for an engine.
+
+    :param str name: engine name
+    :param str step: create, initial_contact or policy
+    :param str status: ok, failed or skipped
+    :param detail: error message for failed steps; reason for skipped
+        steps; initial contact filenames (or configurations if a
+        filename was not provided) for the initial_contact step
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.status != 'failed'
+
+
+def load(source):
+    """
+    Load a manifest from a dict, a file path or an open file. Yaml
+    requires PyYAML. Engine specs are returned with the defaults
+    applied.
+
+    :param source: dict, path or file like object
+    :raises ValueError: invalid manifest
+    :return: list of engine specs
+    :rtype: list(dict)
+    """
+    manifest = read(source)
+    if not isinstance(manifest, dict) or not isinstance(
+        manifest.get('engines'), list):
+        raise ValueError('Manifest must contain a list of engines.')
+    defaults = manifest.get('defaults') or {}
+    if not isinstance(defaults, dict):
+        raise ValueError('Manifest defaults must be a dict.')
+
+    specs, errors, seen = [], [], set()
+    for position, engine in enumerate(manifest['engines']):
+        if not isinstance(engine, dict) or not engine.get('name'):
+            errors.append('Engine %s does not have a name' % position)
+            continue
+        spec = dict(copy.deepcopy(defaults), **copy.deepcopy(engine))
+        spec.setdefault('type', 'single_fw')
+        name = spec['name']
+        if name in seen:
+            errors.append('%s: duplicate engine name' % name)
+        seen.add(name)
+        interfaces = spec.get('interfaces')
+        if not isinstance(interfaces, list) or not all(
+            isinstance(interface, dict) and 'interface_id' in interface
+            for interface in interfaces):
+            errors.append('%s: interfaces must be a list of dicts with an '
+                'interface_id' % name)
+        if not isinstance(spec.get(POLICY) or '', string_types):
+            errors.append('%s: policy must be a policy name' % name)
+        if not isinstance(spec.get(INITIAL_CONTACT) or {}, (dict, bool)):
+            errors.append('%s: initial_contact must be a dict or bool' % name)
+        specs.append(spec)
+    if errors:
+        raise ValueError('Invalid manifest: %s' % '; '.join(errors))
+    return specs
+
+
+def _zones(value, found):
+    # Collect zone names referenced within interface definitions
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == 'zone_ref' and isinstance(item, string_types) and \
+                not item.startswith('http'):
+                found.add(item)
+            else:
+                _zones(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _zones(item, found)
+    return found
+
+
+def _replace_zones(value, hrefs):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == 'zone_ref' and item in hrefs:
+                value[key] = hrefs[item]
+            else:
+                _replace_zones(item, hrefs)
+    elif isinstance(value, list):
+        for item in value:
+            _replace_zones(item, hrefs)
+
+
+class Journal(object):
+    """
+    Record of completed provisioning steps, stored as one json object
+    per line. The journal is appended to as steps complete so progress
+    is kept if provisioning is interrupted.
+
+    :param str path: path of the journal file, or None to keep the
+        journal in memory only
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as fp:
+                for line in fp:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry.get('status') == 'ok':
+                            self.completed.add((entry['name'], entry['step']))
+
+    def done(self, name, step):
+        return (name, step) in self.completed
+
+    def record(self, progress):
+        with self._lock:
+            if progress.status == 'ok':
+                self.completed.add((progress.name, progress.step))
+            if self.path:
+                detail = progress.detail if progress.status != 'ok' or \
+                    progress.step != INITIAL_CONTACT else None
+                with open(self.path, 'a') as fp:
+                    fp.write(json.dumps(dict(
+                        name=progress.name, step=progress.step,
+                        status=progress.status, detail=detail,
+                        time=time.time()), default=str) + '\n')
+
+
+class Provisioner(object):
+    """
+    Create and prepare many engines from a manifest.
+
+    Engine creation and initial contact requests are limited by an
+    :class:`smc.base.workers.AdaptiveLimiter` that ramps up to
+    `max_workers` while requests succeed and backs off when they fail.
+    Policy uploads are long running tasks on the SMC and are limited
+    separately by `max_uploads`.
+
+    :param manifest: manifest as a dict, path or file, see :func:`load`
+    :param str journal: path of the journal used to resume provisioning
+    :param int max_workers: maximum concurrent create requests
+    :param int max_uploads: maximum concurrent policy uploads
+    :param int poll_interval: seconds between policy upload status checks
+    :param int upload_timeout: seconds to wait for a policy upload
+    :raises ValueError: invalid manifest
+    """
+    def __init__(self, manifest, journal=None, max_workers=None,
+                 max_uploads=None, poll_interval=5, upload_timeout=1800):
+        self.specs = load(manifest)
+        self.journal = Journal(journal)
+        self.max_workers = max_workers or DEFAULT_WORKERS
+        self.max_uploads = max_uploads or self.max_workers
+        self.poll_interval = poll_interval
+        self.upload_timeout = upload_timeout
+        self.results = collections.OrderedDict(
+            (spec['name'], {}) for spec in self.specs)
+        self._existing = None
+        self._stop = threading.Event()
+
+    def resolve(self):
+        """
+        Validate the manifest against the SMC and resolve shared
+        references. Log servers, policies and existing engines are
+        each resolved from a single listing. Zones and locations are
+        resolved once per name and created if they do not exist, the
+        same as when creating a single engine.
+
+        This is called by :meth:`run` if it has not been called.
+
+        :raises ValueError: an engine type, log server or policy in the
+            manifest does not exist
+        :return: None
+        """
+        from smc.base.model import lookup_class
+        from smc.elements.helpers import zone_helper, location_helper
+
+        errors = []
+        types = set(spec['type'] for spec in self.specs)
+        for typeof in sorted(types):
+            if not hasattr(lookup_class(typeof), 'create_bulk'):
+                errors.append('Engine type %s cannot be provisioned' % typeof)
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        policy_types = set(POLICY_TYPES.get(spec['type'], 'fw_policy')
+                           for spec in self.specs if spec.get(POLICY))
+        found = listings(types | policy_types | set(['log_server']),
+                         self.max_workers)
+
+        log_servers = found['log_server']
+        default_log_server = next(iter(log_servers.values()), {}).get('href')
+        for spec in self.specs:
+            name, log_server = spec['name'], spec.get('log_server_ref')
+            if log_server is None:
+                spec['log_server_ref'] = default_log_server
+            elif not log_server.startswith('http'):
+                if log_server in log_servers:
+                    spec['log_server_ref'] = log_servers[log_server]['href']
+                else:
+                    errors.append('%s: log server %s not found' % (name, log_server))
+            policy = spec.get(POLICY)
+            if policy and '*' not in policy and policy not in found[
+                POLICY_TYPES.get(spec['type'], 'fw_policy')]:
+                errors.append('%s: policy %s not found' % (name, policy))
+        if errors:
+            raise ValueError('; '.join(errors))
+
+        zones = set()
+        for spec in self.specs:
+            _zones(spec.get('interfaces'), zones)
+        locations = set(spec['location_ref'] for spec in self.specs
+            if isinstance(spec.get('location_ref'), string_types) and
+            not spec['location_ref'].startswith('http'))
+        hrefs = {}
+        for helper, names in ((zone_helper, zones), (location_helper, locations)):
+            resolved = {}
+            for result in parallel_map(helper, sorted(names), self.max_workers):
+                if not result.ok:
+                    raise result.error
+                resolved[result.item] = result.result
+            hrefs[helper] = resolved
+        for spec in self.specs:
+            _replace_zones(spec.get('interfaces'), hrefs[zone_helper])
+            if spec.get('location_ref') in hrefs[location_helper]:
+                spec['location_ref'] = hrefs[location_helper][spec['location_ref']]
+
+        self._existing = {typeof: found[typeof] for typeof in types}
+
+    def _record(self, events, name, step, status, detail=None):
+        progress = Progress(name, step, status, detail)
+        self.results[name][step] = progress
+        self.journal.record(progress)
+        events.put(progress)
+        return progress
+
+    def _existing_engine(self, spec):
+        from smc.base.model import lookup_class
+        meta = self._existing[spec['type']].get(spec['name'])
+        if meta:
+            return lookup_class(spec['type'])(**meta)
+
+    def _create(self, spec):
+        from smc.base.model import lookup_class
+        kwargs = {key: value for key, value in copy.deepcopy(spec).items()
+                  if key not in PROVISION_KEYS}
+        return lookup_class(spec['type']).create_bulk(**kwargs)
+
+    def _initial_contact(self, engine, options):
+        options = dict(options) if isinstance(options, dict) else {}
+        filename = options.pop('filename', None)
+        contact = []
+        for node in engine.nodes:
+            if filename:
+                path = filename.format(
+                    name=engine.name, node=re.sub(r'[\\/:\s]+', '_', node.name))
+                node.initial_contact(filename=path, **options)
+                contact.append(path)
+            else:
+                contact.append(node.initial_contact(**options))
+        return contact
+
+    def _upload(self, engine, policy):
+        # Poll at a fixed interval so max_tries bounds the upload timeout
+        start = time.time()
+        poller = engine.upload(policy, timeout=self.poll_interval,
+            wait_for_finish=True,
+            max_tries=max(1, int(self.upload_timeout / self.poll_interval)),
+            max_interval=self.poll_interval)
+        poller.wait()
+        task = poller.task
+        if task.in_progress:
+            raise TaskRunFailed('Policy upload did not complete within %d '
+                'seconds' % (time.time() - start))
+        if not task.success:
+            raise TaskRunFailed(task.last_message)
+
+    def _provision(self, spec, events, limiter, uploads):
+        name = spec['name']
+        if self._stop.is_set():
+            return
+        engine = self._existing_engine(spec)
+        for step in STEPS:
+            if step != CREATE and not spec.get(step):
+                continue
+            if step == CREATE and engine is not None:
+                self._record(events, name, step, 'skipped', 'engine exists')
+                continue
+            if step != CREATE and self.journal.done(name, step):
+                self._record(events, name, step, 'skipped',
+                    'completed in a previous run')
+                continue
+            detail = None
+            try:
+                if step == POLICY:
+                    with uploads:
+                        self._upload(engine, spec[POLICY])
+                else:
+                    limiter.acquire()
+                    try:
+                        if step == CREATE:
+                            engine = self._create(spec)
+                        else:
+                            detail = self._initial_contact(engine, spec[step])
+                    except Exception as e:
+                        limiter.release(False, should_back_off(e))
+                        raise
+                    limiter.release(True)
+            except Exception as e:
+                logger.error('Provisioning %s failed at %s: %s', name, step, e)
+                self._record(events, name, step, 'failed', str(e))
+                return
+            self._record(events, name, step, 'ok', detail)
+
+    def run(self):
+        """
+        Provision the engines in the manifest. This is a generator of
+        :class:`Progress` for each step as it completes. A failed step
+        stops the provisioning of that engine; other engines continue.
+
+        :raises ValueError: manifest is invalid for this SMC
+        :rtype: Progress
+        """
+        if self._existing is None:
+            self.resolve()
+        self._stop.clear()
+        events = queue.Queue()
+        limiter = AdaptiveLimiter(maximum=self.max_workers)
+        uploads = threading.BoundedSemaphore(self.max_uploads)
+
+        def provision(spec):
+            try:
+                self._provision(spec, events, limiter, uploads)
+            finally:
+                events.put(None)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(
+            self.max_workers + self.max_uploads, len(self.specs))))
+        try:
+            for spec in self.specs:
+                executor.submit(provision, spec)
+            remaining = len(self.specs)
+            while remaining:
+                progress = events.get()
+                if progress is None:
+                    remaining -= 1
+                else:
+                    yield progress
+        finally:
+            # Engines not yet started are skipped if iteration stops early
+            self._stop.set()
+            executor.shutdown(wait=True)
+
+    def stop(self):
+        """
+        Stop provisioning engines that have not started. Engines already
+        being provisioned complete the current step.
+        """
+        self._stop.set()
+
+    @property
+    def summary(self):
+        """
+        Number of steps by step and status
+
+        :rtype: dict
+        """
+        summary = {}
+        for steps in self.results.values():
+            for step, progress in steps.items():
+                counts = summary.setdefault(step, {})
+                counts[progress.status] = counts.get(progress.status, 0) + 1
+        return summary
+
+    @property
+    def failed(self):
+        """
+        Engines that failed a step, as a dict of name: Progress
+
+        :rtype: dict
+        """
+        return {name: progress for name, steps in self.results.items()
+                for progress in steps.values() if progress.status == 'failed'}
@@ -0,0 +1,269 @@
+"""
+Active route tables of many engines.
+
+The active routes of an engine (:attr:`smc.core.engine.Engine.routing_monitoring`)
+are loaded into a :class:`~smc.base.structs.PrefixTrie` so the route for an
+address is found with a longest prefix match instead of a scan of the
+route table::
+
+    from smc.fleet.select import select_engines
+    from smc.fleet.routes import FleetRoutes
+
+    fleet = FleetRoutes(select_engines(pattern='branch-*'))
+    fleet.collect()
+    for engine, route in fleet.who_routes('10.1.2.0/24'):
+        print(engine, route.route_gateway, route.dst_if)
+
+    table = fleet.tables['branch-001']
+    print(table.lookup('10.1.2.3'))
+
+The static routing configuration of an engine can be compared to its
+active routes to find configured routes that are not active or are
+active through another gateway::
+
+    for conflict in fleet.conflicts():
+        print(conflict)
+
+Route tables and routing configuration are retrieved concurrently.
+"""
+import ipaddress
+import logging
+import collections
+from smc.compat import unicode
+from smc.base.structs import PrefixTrie
+from smc.base.workers import parallel_map
+
+
+logger = logging.getLogger(__name__)
+
+
+Conflict = collections.namedtuple('Conflict',
+    'engine network kind configured active')
+"""
+Difference between the static routing configuration and active routes.
+
+:ivar str engine: engine name
+:ivar network: network of the configured route
+:ivar str kind: missing when the network has no active route, gateway
+    when no active route for the network uses the configured gateway and
+    more_specific when a longer active prefix within the network uses
+    another gateway
+:ivar RouteEntry configured: configured route, see
+    :class:`smc.core.route.RoutingIndex`
+:ivar list active: active routes involved
+"""
+
+
+def route_network(route):
+    """
+    Network of an active route
+
+    :param Route route: route from routing monitoring
+    :raises ValueError: route network is invalid
+    :rtype: ipaddress.IPv4Network, ipaddress.IPv6Network
+    """
+    return ipaddress.ip_network(u'{}/{}'.format(
+        unicode(route.route_network), route.route_netmask), strict=False)
+
+
+class RouteTable(object):
+    """
+    Active routes of an engine indexed for longest prefix match lookups.
+    Routes with the same network, i.e. ECMP or routes from several
+    interfaces, are kept together.
+
+    :param iterable routes: routes from routing monitoring
+    """
+    def __init__(self, routes):
+        self.trie = PrefixTrie()
+        self.size = 0
+        for route in routes:
+            try:
+                network = route_network(route)
+            except ValueError:
+                logger.debug('Skipping invalid route: %s', route)
+                continue
+            self.trie.setdefault(network, []).append(route)
+            self.size += 1
+
+    def lookup(self, address):
+        """
+        Routes of the longest matching network
+
+        :param str address: IP address or network
+        :return: list of routes, empty if no route matches
+        :rtype: list(Route)
+        """
+        match = self.trie.lookup(address)
+        return list(match[1]) if match else []
+
+    def matches(self, address):
+        """
+        Routes of all networks containing the address, from the shortest
+        to the longest prefix
+
+        :param str address: IP address or network
+        :rtype: list(Route)
+        """
+        return [route for _, routes in self.trie.matches(address)
+                for route in routes]
+
+    def get(self, network):
+        """
+        Routes for exactly this network
+
+        :param str network: network
+        :rtype: list(Route)
+        """
+        return list(self.trie.get(network, []))
+
+    def within(self, network):
+        """
+        Routes for networks within the network, including the network
+
+        :param str network: network
+        :rtype: list(Route)
+        """
+        return [route for _, routes in self.trie.within(network)
+                for route in routes]
+
+    def __iter__(self):
+        return (route for _, routes in self.trie.items() for route in routes)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return 'RouteTable(routes={}, networks={})'.format(
+            self.size, len(self.trie))
+
+
+def _gateway_ip(entry):
+    # Address of a configured gateway, None for gateways without an
+    # address such as netlinks or dynamic routing
+    if entry.gateway is None or not entry.gateway.ip:
+        return None
+    try:
+        return ipaddress.ip_network(
+            unicode(entry.gateway.ip), strict=False).network_address
+    except ValueError:
+        return None
+
+
+def _active_gateway(route):
+    try:
+        return ipaddress.ip_address(unicode(route.route_gateway))
+    except ValueError:
+        return None
+
+
+def conflicts(engine_name, index, table):
+    """
+    Compare configured static routes of an engine to its active routes
+
+    :param str engine_name: engine name used in the result
+    :param RoutingIndex index: index of the engines routing
+    :param RouteTable table: active routes of the engine
+    :rtype: list(Conflict)
+    """
+    found = []
+    for network, entries in index.networks.items():
+        for entry in entries:
+            gateway = _gateway_ip(entry)
+            if entry.destination is None or gateway is None:
+                continue
+            active = table.get(network)
+            if not active:
+                found.append(Conflict(engine_name, network, 'missing',
+                    entry, []))
+                continue
+            if not any(_active_gateway(route) == gateway for route in active):
+                found.append(Conflict(engine_name, network, 'gateway',
+                    entry, active))
+            specific = [route for route in table.within(network)
+                        if route_network(route) != network and
+                        _active_gateway(route) is not None and
+                        _active_gateway(route) != gateway]
+            if specific:
+                found.append(Conflict(engine_name, network, 'more_specific',
+                    entry, specific))
+    return found
+
+
+class FleetRoutes(object):
+    """
+    Active route tables of a set of engines.
+
+    :param list engines: engines to collect, see
+        :func:`smc.fleet.select.select_engines`
+    :param int max_workers: maximum concurrent requests
+    :ivar dict tables: engine name: :class:`RouteTable`
+    :ivar dict errors: engine name: exception for engines that failed
+    """
+    def __init__(self, engines, max_workers=None):
+        self.engines = list(engines)
+        self.max_workers = max_workers
+        self.tables = collections.OrderedDict()
+        self.errors = {}
+
+    def collect(self):
+        """
+        Retrieve the active routes of all engines concurrently. Engines
+        that fail are recorded in `errors`.
+
+        :return: engine name: RouteTable
+        :rtype: dict
+        """
+        self.tables.clear()
+        self.errors.clear()
+        for result in parallel_map(
+            lambda engine: RouteTable(engine.routing_monitoring),
+            self.engines, self.max_workers):
+            if result.ok:
+                self.tables[result.item.name] = result.result
+            else:
+                logger.error('Failed to get routes for engine %s: %s',
+                    result.item.name, result.error)
+                self.errors[result.item.name] = result.error
+        return self.tables
+
+    def who_routes(self, prefix, include_default=True):
+        """
+        Engines with an active route for the prefix and the longest
+        matching route of each engine
+
+        :param str prefix: IP address or network
+        :param bool include_default: include engines that only match
+            with a default route
+        :return: list of (engine name, Route)
+        :rtype: list(tuple)
+        """
+        found = []
+        for name, table in self.tables.items():
+            for route in table.lookup(prefix):
+                if not include_default and not route.route_netmask:
+                    continue
+                found.append((name, route))
+        return found
+
+    def conflicts(self):
+        """
+        Compare the static routing configuration of each collected engine
+        to its active routes. Routing configuration is retrieved
+        concurrently.
+
+        :rtype: list(Conflict)
+        """
+        engines = [engine for engine in self.engines
+                   if engine.name in self.tables]
+        found = []
+        for result in parallel_map(lambda engine: engine.routing.index,
+                                   engines, self.max_workers):
+            if not result.ok:
+                logger.error('Failed to get routing for engine %s: %s',
+                    result.item.name, result.error)
+                self.errors[result.item.name] = result.error
+                continue
+            found.extend(conflicts(result.item.name, result.result,
+                self.tables[result.item.name]))
+        return found
@@ -0,0 +1,100 @@
+"""
+Bulk listings used to resolve elements by name for fleet operations.
+
+Each listing is a single request to an element type entry point that
+returns the meta (name, href and type) of every element of that type.
+Resolving many names against a listing avoids a search request per
+element::
+
+    from smc.fleet.select import listing
+
+    engines = listing('single_fw')
+    print(engines['branch-001']['href'])
+
+Engines can be selected by name, name pattern, location and category tag.
+All engines are listed with one request and each location or tag is
+resolved with one request::
+
+    from smc.fleet.select import select_engines
+
+    engines = select_engines(pattern='branch-*', tag='Wave 1')
+"""
+import fnmatch
+from smc.compat import string_types
+from smc.base.workers import parallel_map
+from smc.api.common import SMCRequest, fetch_entry_point
+from smc.api.exceptions import FetchElementFailed
+
+
+def listing(typeof):
+    """
+    List all elements of a type
+
+    :param str typeof: element type entry point, i.e. 'single_fw'
+    :raises FetchElementFailed: listing failed
+    :return: dict of element name: meta
+    :rtype: dict
+    """
+    result = SMCRequest(
+        href=fetch_entry_point(typeof),
+        exception=FetchElementFailed).read().json or []
+    return {meta.get('name'): meta for meta in result}
+
+
+def listings(types, max_workers=None):
+    """
+    List all elements of multiple types concurrently
+
+    :param list types: element type entry points
+    :param int max_workers: maximum concurrent requests
+    :raises FetchElementFailed: a listing failed
+    :return: dict of typeof: dict of element name: meta
+    :rtype: dict
+    """
+    found = {}
+    for result in parallel_map(listing, sorted(set(types)), max_workers):
+        if not result.ok:
+            raise result.error
+        found[result.item] = result.result
+    return found
+
+
+def select_engines(names=None, pattern=None, location=None, tag=None):
+    """
+    Select engines by name, name pattern, location and category tag.
+    Engines must match all criteria that are provided. Without criteria,
+    all engines are returned.
+
+    :param list names: engine names
+    :param str pattern: shell style name pattern, i.e. 'branch-*'
+    :param location: engines using this location
+    :type location: str,Location
+    :param tag: engines assigned this category tag
+    :type tag: str,Category
+    :raises ElementNotFound: the location or tag does not exist
+    :return: engines sorted by name
+    :rtype: list(Engine)
+    """
+    from smc.base.model import Element
+    from smc.elements.other import Category, Location
+    engines = listing('engine_clusters')
+    if names is not None:
+        names = set(names)
+        engines = {name: meta for name, meta in engines.items()
+                   if name in names}
+    if pattern is not None:
+        engines = {name: meta for name, meta in engines.items()
+                   if fnmatch.fnmatchcase(name, pattern)}
+    if location is not None:
+        if isinstance(location, string_types):
+            location = Location(location)
+        hrefs = set(element.href for element in location.used_on)
+        engines = {name: meta for name, meta in engines.items()
+                   if meta.get('href') in hrefs}
+    if tag is not None:
+        if isinstance(tag, string_types):
+            tag = Category(tag)
+        hrefs = set(element.href for element in tag.search_elements())
+        engines = {name: meta for name, meta in engines.items()
+                   if meta.get('href') in hrefs}
+    return [Element.from_meta(**engines[name]) for name in sorted(engines)]
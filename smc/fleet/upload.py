@@ -0,0 +1,303 @@
+"""
+Upload or refresh policy across many engines.
+
+A rollout runs the policy upload (or refresh) for a list of engines in
+waves. Each wave starts after the previous wave is complete, so a small
+canary wave can be verified before the policy reaches the rest of the
+fleet. Wave sizes are a number of engines or a fraction of all engines;
+engines not in a listed wave are in a final wave::
+
+    from smc.fleet.select import select_engines
+    from smc.fleet.upload import Rollout
+
+    rollout = Rollout(
+        select_engines(pattern='branch-*'),
+        policy='Branch Policy',
+        waves=[1, 10, 0.25],
+        max_concurrent=20,
+        max_failures=0)
+
+    for result in rollout.run():
+        print(result, '%.0f%%' % rollout.progress)
+    print(rollout.summary)
+
+Up to `max_concurrent` uploads run at the same time within a wave. Tasks
+are polled by the shared :mod:`smc.base.scheduler`, so the number of
+threads does not grow with the number of engines. Failures that are
+considered transient (see :func:`is_transient`) are retried. When more
+than `max_failures` engines have failed, uploads that have not started
+are aborted and later waves are not run.
+"""
+import time
+import heapq
+import logging
+import collections
+from smc.compat import string_types
+from smc.api.exceptions import SMCConnectionError, TaskRunFailed
+from smc.base.scheduler import default_scheduler
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Task messages of failures that are retried
+TRANSIENT_MESSAGES = ('timeout', 'timed out', 'connection', 'busy',
+                      'locked', 'try again', 'temporarily')
+
+
+def is_transient(error):
+    """
+    Whether an upload failure is likely to succeed if retried. Connection
+    errors and task failures with a message matching one of
+    :data:`TRANSIENT_MESSAGES` are considered transient.
+
+    :param Exception error: failure raised or task failure
+    :rtype: bool
+    """
+    if isinstance(error, SMCConnectionError):
+        return True
+    message = str(error).lower()
+    return any(transient in message for transient in TRANSIENT_MESSAGES)
+
+
+class UploadResult(collections.namedtuple(
+        'UploadResult', 'name wave status attempts message')):
+    """
+    Status of the upload to an engine. Results are yielded from
+    :meth:`Rollout.run` as the status of each engine changes.
+
+    :param str name: engine name
+    :param int wave: wave number, starting at 1
+    :param str status: started, retrying, ok, failed or aborted
+    :param int attempts: number of upload attempts
+    :param str message: last task message or failure reason
+    """
+    __slots__ = ()
+
+
+def _sizes(waves, total):
+    sizes, remaining = [], total
+    for wave in waves or ():
+        size = int(round(wave * total)) if isinstance(wave, float) else int(wave)
+        size = min(max(size, 1), remaining)
+        if size:
+            sizes.append(size)
+            remaining -= size
+    if remaining:
+        sizes.append(remaining)
+    return sizes
+
+
+class Rollout(object):
+    """
+    Policy upload or refresh across engines in waves.
+
+    :param list engines: engines to upload to, see
+        :func:`smc.fleet.select.select_engines`
+    :param str policy: policy to upload, if None the engines current
+        policy is refreshed
+    :param list waves: wave sizes as a number of engines or a float
+        fraction of all engines. Remaining engines are in a final wave.
+    :param int max_concurrent: maximum uploads running at the same time
+        within a wave
+    :param max_failures: abort when more engines than this have failed,
+        either a number of engines or a float fraction of all engines.
+        None never aborts.
+    :param int retries: retries for transient failures per engine
+    :param int retry_delay: seconds before retrying a failed upload
+    :param int poll_interval: seconds between task status checks
+    :param int upload_timeout: seconds to wait for an upload task
+    :param callable retry_on: called with the failure to decide whether
+        to retry, defaults to :func:`is_transient`
+    :param Scheduler scheduler: scheduler used to poll upload tasks
+    """
+    def __init__(self, engines, policy=None, waves=None, max_concurrent=10,
+                 max_failures=None, retries=2, retry_delay=30,
+                 poll_interval=5, upload_timeout=1800, retry_on=None,
+                 scheduler=None):
+        self.engines = list(engines)
+        self.policy = policy
+        self.waves = []
+        start = 0
+        for size in _sizes(waves, len(self.engines)):
+            self.waves.append(self.engines[start:start + size])
+            start += size
+        self.max_concurrent = max(1, max_concurrent)
+        if isinstance(max_failures, float):
+            max_failures = int(max_failures * len(self.engines))
+        self.max_failures = max_failures
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.upload_timeout = upload_timeout
+        self.retry_on = retry_on or is_transient
+        self.scheduler = scheduler if scheduler is not None else default_scheduler
+        self.results = collections.OrderedDict()
+        self.aborted = False
+        self._pollers = {}
+
+    def _start(self, engine, events):
+        # Poll at a fixed interval so max_tries bounds the upload timeout
+        max_tries = max(1, int(self.upload_timeout / self.poll_interval))
+        if self.policy is not None:
+            poller = engine.upload(self.policy, timeout=self.poll_interval,
+                wait_for_finish=True, max_tries=max_tries,
+                max_interval=self.poll_interval, scheduler=self.scheduler)
+        else:
+            poller = engine.refresh(timeout=self.poll_interval,
+                wait_for_finish=True, max_tries=max_tries,
+                max_interval=self.poll_interval, scheduler=self.scheduler)
+        self._pollers[engine.name] = poller
+        poller.future.add_done_callback(lambda _: events.put(engine))
+
+    def _outcome(self, engine):
+        # Return None if the upload succeeded, otherwise the failure
+        poller = self._pollers[engine.name]
+        error = poller.future.exception()
+        if error is not None:
+            return error
+        task = poller.task
+        if task.in_progress:
+            return TaskRunFailed('Upload did not complete within %s seconds'
+                % self.upload_timeout)
+        if not task.success:
+            return TaskRunFailed(task.last_message)
+
+    def _result(self, engine, wave, status, attempts, message=None):
+        result = UploadResult(engine.name, wave, status, attempts,
+            message if message is None or isinstance(message, string_types)
+            else str(message))
+        self.results[engine.name] = result
+        return result
+
+    @property
+    def failures(self):
+        return sum(1 for result in self.results.values()
+                   if result.status == 'failed')
+
+    def _exceeded(self):
+        return self.max_failures is not None and \
+            self.failures > self.max_failures
+
+    def _run_wave(self, number, engines):
+        events = queue.Queue()
+        pending = collections.deque(engines)
+        retries = []    # heap of (time, counter, engine)
+        attempts = collections.Counter()
+        running = 0
+        counter = 0
+        while pending or retries or running:
+            now = time.time()
+            while retries and retries[0][0] <= now and not self.aborted:
+                pending.appendleft(heapq.heappop(retries)[2])
+            while pending and running < self.max_concurrent and not self.aborted:
+                engine = pending.popleft()
+                attempts[engine.name] += 1
+                try:
+                    self._start(engine, events)
+                except Exception as e:
+                    if attempts[engine.name] <= self.retries and self.retry_on(e):
+                        counter += 1
+                        heapq.heappush(retries, (time.time() + self.retry_delay,
+                            counter, engine))
+                        yield self._result(engine, number, 'retrying',
+                            attempts[engine.name], e)
+                    else:
+                        yield self._result(engine, number, 'failed',
+                            attempts[engine.name], e)
+                        self.aborted = self._exceeded()
+                    continue
+                running += 1
+                yield self._result(engine, number, 'started',
+                    attempts[engine.name])
+
+            if self.aborted:
+                for engine in list(pending) + [item[2] for item in retries]:
+                    yield self._result(engine, number, 'aborted',
+                        attempts[engine.name], 'Failure threshold exceeded')
+                pending.clear()
+                del retries[:]
+            if not running:
+                if retries:
+                    time.sleep(max(0, retries[0][0] - time.time()))
+                continue
+
+            timeout = max(0, retries[0][0] - time.time()) if retries else None
+            try:
+                engine = events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            running -= 1
+            error = self._outcome(engine)
+            task = self._pollers[engine.name].task
+            if error is None:
+                yield self._result(engine, number, 'ok', attempts[engine.name],
+                    task.last_message)
+            elif attempts[engine.name] <= self.retries and self.retry_on(error) \
+                and not self.aborted:
+                counter += 1
+                heapq.heappush(retries, (time.time() + self.retry_delay,
+                    counter, engine))
+                yield self._result(engine, number, 'retrying',
+                    attempts[engine.name], error)
+            else:
+                logger.error('Policy upload to %s failed: %s', engine.name, error)
+                yield self._result(engine, number, 'failed',
+                    attempts[engine.name], error)
+                self.aborted = self.aborted or self._exceeded()
+
+    def run(self):
+        """
+        Run the rollout. This is a generator of :class:`UploadResult` for
+        each engine as its status changes.
+
+        :rtype: UploadResult
+        """
+        for number, engines in enumerate(self.waves, 1):
+            if self.aborted:
+                for engine in engines:
+                    yield self._result(engine, number, 'aborted', 0,
+                        'Failure threshold exceeded')
+                continue
+            logger.info('Starting policy wave %s with %s engines', number,
+                len(engines))
+            for result in self._run_wave(number, engines):
+                yield result
+
+    @property
+    def progress(self):
+        """
+        Overall percentage complete, based on the progress of running
+        tasks. Finished engines count as complete.
+
+        :rtype: float
+        """
+        if not self.engines:
+            return 100.0
+        total = 0
+        for engine in self.engines:
+            result = self.results.get(engine.name)
+            if result is None:
+                continue
+            if result.status in ('ok', 'failed', 'aborted'):
+                total += 100
+            elif engine.name in self._pollers:
+                total += int(self._pollers[engine.name].task.progress or 0)
+        return total / float(len(self.engines))
+
+    @property
+    def summary(self):
+        """
+        Number of engines by status
+
+        :rtype: dict
+        """
+        summary = {}
+        for result in self.results.values():
+            summary[result.status] = summary.get(result.status, 0) + 1
+        return summary
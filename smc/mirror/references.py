@@ -0,0 +1,264 @@
+"""
+Local reference index to find where elements are used.
+
+:meth:`smc.administration.system.System.references_by_element` requires a
+request per element. When many elements need to be checked, i.e. during a
+cleanup, a reference index can be built from element json that is already
+loaded. Any element href found in the json (rule sources, destinations and
+services, group members, routing nodes, NAT translation values, alias
+values, etc) is recorded as a reference from the element to the href::
+
+    from smc.mirror.references import ReferenceIndex
+
+    index = ReferenceIndex.from_mirror(mirror)
+    for reference in index.referenced_by(Network('internal')):
+        print(reference['type'], reference['name'], reference['paths'])
+
+    unused = index.unused(typeof='host')
+
+The index can also be built from elements. Element data that is not
+already loaded is fetched, so build from loaded elements or from a
+:class:`smc.mirror.sync.Mirror` to avoid requests to the SMC::
+
+    index = ReferenceIndex()
+    index.update(policy.fw_ipv4_access_rules.all())
+    index.update(Group.objects.all())
+
+Calling :meth:`ReferenceIndex.update` or
+:meth:`ReferenceIndex.update_from_mirror` again only walks elements whose
+ETag changed since they were indexed.
+"""
+import json
+from smc.compat import string_types
+
+
+def extract_references(data, path=''):
+    """
+    Generator of (href, path) for each element href found in an
+    elements json. The path is the dotted location of the href within
+    the json, i.e. 'sources.src'. The elements own links are not
+    considered references.
+
+    :param data: element json
+    :param str path: path of `data` within the element json
+    :rtype: tuple
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key != 'link':
+                for reference in extract_references(
+                    value, '{}.{}'.format(path, key) if path else key):
+                    yield reference
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            for reference in extract_references(value, path):
+                yield reference
+    elif isinstance(data, string_types):
+        if '://' in data and '/elements/' in data:
+            yield data, path
+
+
+class ReferenceIndex(object):
+    """
+    Index of references between elements with reverse lookup. Elements
+    added to the index are nodes identified by href; referenced hrefs do
+    not need to be indexed themselves.
+    """
+    def __init__(self):
+        self._meta = {}         # href: (typeof, name, etag)
+        self._references = {}   # source href: {target href: set(paths)}
+        self._referenced_by = {}  # target href: set(source href)
+
+    def add(self, href, data, typeof=None, name=None, etag=None):
+        """
+        Add or replace an element in the index from its json. If the
+        element is already indexed with the same ETag, it is not walked
+        again.
+
+        :param str href: href of the element
+        :param dict data: element json
+        :param str typeof: element type
+        :param str name: element name
+        :param str etag: ETag of the element json
+        :return: whether the element was indexed
+        :rtype: bool
+        """
+        known = self._meta.get(href)
+        if known and etag and known[2] == etag:
+            return False
+        self.remove(href)
+        self._meta[href] = (typeof, name if name else data.get('name'), etag)
+        references = {}
+        for target, path in extract_references(data):
+            if target != href:
+                references.setdefault(target, set()).add(path)
+        self._references[href] = references
+        for target in references:
+            self._referenced_by.setdefault(target, set()).add(href)
+        return True
+
+    def add_element(self, element):
+        """
+        Add an element to the index. The elements data is fetched if it
+        is not already loaded.
+
+        :param Element element: element to index
+        :rtype: bool
+        """
+        cache = element.data
+        return self.add(element.href, cache.data, getattr(element, 'typeof', None),
+            element.name, getattr(cache, '_etag', None))
+
+    def update(self, elements):
+        """
+        Add elements to the index, only walking elements that are new or
+        have changed since they were indexed.
+
+        :param list elements: elements to index
+        :return: number of elements indexed
+        :rtype: int
+        """
+        return sum(1 for element in elements if self.add_element(element))
+
+    def remove(self, href):
+        """
+        Remove an element and the references from it
+
+        :param str href: href of the element
+        :return: None
+        """
+        self._meta.pop(href, None)
+        for target in self._references.pop(href, {}):
+            sources = self._referenced_by.get(target)
+            if sources:
+                sources.discard(href)
+                if not sources:
+                    del self._referenced_by[target]
+
+    def references(self, element):
+        """
+        Hrefs referenced by the element, with the paths in the elements
+        json where each href is referenced
+
+        :param element: element or href
+        :rtype: dict
+        """
+        href = getattr(element, 'href', element)
+        return {target: sorted(paths) for target, paths in
+                self._references.get(href, {}).items()}
+
+    def referenced_by(self, element, typeof=None):
+        """
+        Indexed elements that reference the given element. Each reference
+        is a dict with the 'href', 'type' and 'name' of the referencing
+        element and the 'paths' where the element is referenced.
+
+        :param element: element or href
+        :param str typeof: only return references from this element type
+        :rtype: list(dict)
+        """
+        href = getattr(element, 'href', element)
+        result = []
+        for source in sorted(self._referenced_by.get(href, ())):
+            source_type, name, _ = self._meta[source]
+            if typeof is None or source_type == typeof:
+                result.append(dict(
+                    href=source, type=source_type, name=name,
+                    paths=sorted(self._references[source][href])))
+        return result
+
+    def describe(self, href):
+        """
+        Return a dict with the 'href', 'type' and 'name' of an href. The
+        type and name are None if the href is not indexed.
+
+        :rtype: dict
+        """
+        typeof, name, _ = self._meta.get(href, (None, None, None))
+        return dict(href=href, type=typeof, name=name)
+
+    def is_referenced(self, element):
+        return getattr(element, 'href', element) in self._referenced_by
+
+    def unused(self, typeof=None):
+        """
+        Indexed elements that are not referenced by any other indexed
+        element. Elements are only considered used by references found
+        in the index, so index the policies, rules, groups and engines
+        that may use them.
+
+        :param str typeof: only return elements of this type
+        :return: list of dict with 'href', 'type' and 'name'
+        :rtype: list(dict)
+        """
+        return [self.describe(href) for href, meta in sorted(self._meta.items())
+                if href not in self._referenced_by and
+                (typeof is None or meta[0] == typeof)]
+
+    def orphans(self):
+        """
+        References to hrefs that are not indexed. If all element types
+        that can be referenced are indexed, these are references to
+        elements that no longer exist.
+
+        :return: dict of href: list of referencing hrefs
+        :rtype: dict
+        """
+        return {target: sorted(sources) for target, sources in
+                self._referenced_by.items() if target not in self._meta}
+
+    def export(self, fp, typeof=None):
+        """
+        Write the unused elements and orphaned references as json
+
+        :param fp: file like object opened for writing
+        :param str typeof: only export unused elements of this type
+        :return: None
+        """
+        json.dump(dict(
+            unused=self.unused(typeof),
+            orphans=self.orphans()), fp, indent=2, sort_keys=True)
+
+    def update_from_mirror(self, mirror, typeof=None):
+        """
+        Update the index from the elements in a mirror without any
+        requests to the SMC. Elements whose ETag did not change are not
+        walked again and indexed elements no longer in the mirror are
+        removed.
+
+        :param Mirror mirror: local mirror
+        :param str typeof: only index elements of this type
+        :return: number of elements indexed
+        :rtype: int
+        """
+        indexed, seen = 0, set()
+        for row in mirror.store.find(typeof):
+            seen.add(row['href'])
+            known = self._meta.get(row['href'])
+            if known and row['etag'] and known[2] == row['etag']:
+                continue
+            indexed += self.add(row['href'], json.loads(row['json']),
+                row['typeof'], row['name'], row['etag'])
+        for href, meta in list(self._meta.items()):
+            if href not in seen and (typeof is None or meta[0] == typeof):
+                self.remove(href)
+        return indexed
+
+    @classmethod
+    def from_mirror(cls, mirror, typeof=None):
+        """
+        Build an index from the elements in a mirror
+
+        :param Mirror mirror: local mirror
+        :param str typeof: only index elements of this type
+        :rtype: ReferenceIndex
+        """
+        index = cls()
+        index.update_from_mirror(mirror, typeof)
+        return index
+
+    def __contains__(self, element):
+        return getattr(element, 'href', element) in self._meta
+
+    def __len__(self):
+        return len(self._meta)
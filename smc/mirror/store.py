@@ -0,0 +1,186 @@
+"""
+SQLite storage for the configuration mirror.
+
+The store keeps one row per element with the elements meta (href, type and
+name), the ETag and the json, and one row per reference from an element
+to another element href found in the elements json.
+"""
+import json
+import time
+import sqlite3
+import threading
+from smc.api.web import CacheEncoder
+from smc.mirror.references import extract_references
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS element (
+    href TEXT PRIMARY KEY,
+    typeof TEXT NOT NULL,
+    name TEXT,
+    etag TEXT,
+    json TEXT NOT NULL,
+    synced REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS element_typeof_name ON element (typeof, name);
+CREATE TABLE IF NOT EXISTS reference (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+);
+CREATE INDEX IF NOT EXISTS reference_target ON reference (target);
+'''
+
+
+class MirrorStore(object):
+    """
+    SQLite database holding mirrored elements. A single connection is
+    shared and access is serialized so the store can be used from the
+    thread receiving notifications.
+
+    :param str path: path to the database file, or ':memory:'
+    """
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def execute(self, sql, parameters=()):
+        """
+        Run a read only query against the mirror
+
+        :return: list of rows
+        :rtype: list(sqlite3.Row)
+        """
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def upsert(self, href, typeof, name, etag, data):
+        """
+        Insert or replace an element and its references
+
+        :param str href: href of the element
+        :param str typeof: element type
+        :param str name: element name
+        :param str etag: ETag of the element
+        :param dict data: element json
+        """
+        self.upsert_many([(href, typeof, name, etag, data)])
+
+    def upsert_many(self, elements):
+        """
+        Insert or replace many elements in a single transaction
+
+        :param list elements: tuples of (href, typeof, name, etag, data)
+        """
+        now = time.time()
+        with self._lock, self.connection:
+            for href, typeof, name, etag, data in elements:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO element VALUES (?, ?, ?, ?, ?, ?)',
+                    (href, typeof, name, etag,
+                     json.dumps(data, cls=CacheEncoder), now))
+                self.connection.execute(
+                    'DELETE FROM reference WHERE source = ?', (href,))
+                self.connection.executemany(
+                    'INSERT OR IGNORE INTO reference VALUES (?, ?)',
+                    [(href, target) for target in
+                     set(target for target, _ in extract_references(data))
+                     if target != href])
+
+    def touch(self, hrefs):
+        """
+        Mark elements as synced without modifying them, i.e. after an
+        ETag revalidation found the element unchanged.
+
+        :param list hrefs: element hrefs
+        """
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'UPDATE element SET synced = ? WHERE href = ?',
+                [(now, href) for href in hrefs])
+
+    def delete(self, hrefs):
+        """
+        Remove elements and their references
+
+        :param list hrefs: element hrefs
+        """
+        with self._lock, self.connection:
+            for href in hrefs:
+                self.connection.execute(
+                    'DELETE FROM element WHERE href = ?', (href,))
+                self.connection.execute(
+                    'DELETE FROM reference WHERE source = ?', (href,))
+
+    def etags(self, typeof=None):
+        """
+        ETag of each element, optionally of a single element type
+
+        :return: dict of href: etag
+        :rtype: dict
+        """
+        if typeof:
+            rows = self.execute(
+                'SELECT href, etag FROM element WHERE typeof = ?', (typeof,))
+        else:
+            rows = self.execute('SELECT href, etag FROM element')
+        return {row['href']: row['etag'] for row in rows}
+
+    def get(self, href):
+        """
+        Return the element row for the href or None
+
+        :rtype: sqlite3.Row
+        """
+        rows = self.execute('SELECT * FROM element WHERE href = ?', (href,))
+        return rows[0] if rows else None
+
+    def find(self, typeof=None, name=None, contains=None):
+        """
+        Find elements by type and exact name or a name substring
+
+        :rtype: list(sqlite3.Row)
+        """
+        clauses, parameters = [], []
+        if typeof:
+            clauses.append('typeof = ?')
+            parameters.append(typeof)
+        if name is not None:
+            clauses.append('name = ?')
+            parameters.append(name)
+        if contains:
+            clauses.append('name LIKE ?')
+            parameters.append('%{}%'.format(contains))
+        sql = 'SELECT * FROM element'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return self.execute(sql + ' ORDER BY typeof, name', parameters)
+
+    def referenced_by(self, href):
+        """
+        Hrefs of mirrored elements that reference the given href
+
+        :rtype: list(str)
+        """
+        return [row['source'] for row in self.execute(
+            'SELECT source FROM reference WHERE target = ?', (href,))]
+
+    def references(self, href):
+        """
+        Hrefs referenced by the given element
+
+        :rtype: list(str)
+        """
+        return [row['target'] for row in self.execute(
+            'SELECT target FROM reference WHERE source = ?', (href,))]
+
+    def __len__(self):
+        return self.execute('SELECT COUNT(*) FROM element')[0][0]
@@ -0,0 +1,237 @@
+"""
+Synchronize SMC elements into a local SQLite mirror.
+
+Reporting and analytics jobs can query a local copy of the configuration
+instead of exporting it from the SMC each time. The first sync downloads
+all elements of the selected entry points, later syncs only download
+elements whose ETag changed::
+
+    from smc.mirror.sync import Mirror
+
+    mirror = Mirror('smc.db', entry_points=['host', 'network', 'group'])
+    mirror.sync()
+
+    for host in mirror.find('host', contains='web'):
+        print(host.name, host.address)
+
+    for element in mirror.referenced_by(Host('web-1')):
+        print(element)
+
+To keep the mirror current, :meth:`Mirror.follow` uses the notification
+socket from smc-python-monitoring if it is installed, or periodic
+revalidation sweeps otherwise. The SQLite database can also be queried
+directly through ``mirror.store``.
+"""
+import json
+import time
+import logging
+import threading
+from smc.base.workers import parallel_map
+from smc.api.common import SMCRequest, fetch_entry_point
+from smc.api.exceptions import FetchElementFailed
+from smc.mirror.store import MirrorStore
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Notification actions that add or modify an element
+MODIFY_ACTIONS = frozenset(['create', 'update', 'untrashed'])
+#: Notification actions that remove an element
+REMOVE_ACTIONS = frozenset(['delete', 'trashed'])
+
+
+class Mirror(object):
+    """
+    Local mirror of the elements of the given entry points.
+
+    :param str path: path to the SQLite database file. The default is an
+        in memory database
+    :param list entry_points: element types to mirror, i.e. 'host',
+        'network', 'fw_policy'
+    :param int max_workers: maximum concurrent requests when fetching
+        elements
+    """
+    def __init__(self, path=':memory:', entry_points=None, max_workers=None):
+        self.store = MirrorStore(path)
+        self.entry_points = list(entry_points or [])
+        self.max_workers = max_workers
+        self._stop = threading.Event()
+
+    def _fetch(self, href, etag=None):
+        request = SMCRequest(href=href, exception=FetchElementFailed)
+        if etag:
+            request.headers.update({'If-None-Match': etag})
+        return request.read()
+
+    def _typeof(self, href, data):
+        row = self.store.get(href)
+        if row:
+            return row['typeof']
+        for link in data.get('link', []):
+            if link.get('rel') == 'self':
+                return link.get('type')
+
+    def sync(self, entry_points=None):
+        """
+        Synchronize the mirror with the SMC. Each entry point is listed
+        to find new and removed elements. Elements already in the mirror
+        are fetched with a conditional request using the stored ETag and
+        only downloaded if they changed. The first sync downloads all
+        elements; later calls act as a revalidation sweep.
+
+        :param list entry_points: element types to sync, by default all
+            entry points of the mirror
+        :return: number of elements by outcome, 'created', 'updated',
+            'unchanged', 'deleted' and 'failed'
+        :rtype: dict
+        """
+        summary = dict(created=0, updated=0, unchanged=0, deleted=0, failed=0)
+        for typeof in entry_points or self.entry_points:
+            known = self.store.etags(typeof)
+            listing = SMCRequest(
+                href=fetch_entry_point(typeof),
+                exception=FetchElementFailed).read().json or []
+            listed = set(meta['href'] for meta in listing)
+
+            removed = set(known) - listed
+            self.store.delete(removed)
+            summary['deleted'] += len(removed)
+
+            results = parallel_map(
+                lambda meta: self._fetch(meta['href'], known.get(meta['href'])),
+                listing, self.max_workers)
+
+            modified, unchanged = [], []
+            for result in results:
+                meta = result.item
+                if not result.ok:
+                    logger.error('Failed to mirror element: %s, %s',
+                        meta.get('href'), result.error)
+                    summary['failed'] += 1
+                elif result.result.code == 304:
+                    unchanged.append(meta['href'])
+                else:
+                    modified.append((meta['href'], typeof, meta.get('name'),
+                        result.result.etag, result.result.json))
+                    summary['updated' if meta['href'] in known else 'created'] += 1
+
+            self.store.upsert_many(modified)
+            self.store.touch(unchanged)
+            summary['unchanged'] += len(unchanged)
+        logger.debug('Mirror sync complete: %s', summary)
+        return summary
+
+    def apply_event(self, action, href):
+        """
+        Apply a notification event to the mirror. Modified elements are
+        fetched and removed elements are deleted from the mirror.
+
+        :param str action: event action, i.e. 'create', 'update', 'delete'
+        :param str href: href of the element
+        :return: None
+        """
+        if action in REMOVE_ACTIONS:
+            self.store.delete([href])
+        elif action in MODIFY_ACTIONS:
+            row = self.store.get(href)
+            result = self._fetch(href, row['etag'] if row else None)
+            if result.code == 304:
+                self.store.touch([href])
+            elif result.json:
+                self.store.upsert(href, self._typeof(href, result.json),
+                    result.json.get('name'), result.etag, result.json)
+
+    def follow(self, interval=300):
+        """
+        Keep the mirror current until :meth:`stop` is called. If
+        smc-python-monitoring is installed, changes are received from the
+        SMC notification socket and a revalidation sweep runs each time the
+        socket is (re)connected. Otherwise a revalidation sweep runs every
+        `interval` seconds.
+
+        :param int interval: seconds between revalidation sweeps
+        :return: None
+        """
+        try:
+            from smc_monitoring.pubsub.subscribers import Notification
+        except ImportError:
+            Notification = None
+
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.sync()
+            if Notification is None:
+                self._stop.wait(interval)
+                continue
+            try:
+                notification = Notification(','.join(self.entry_points))
+                for result in notification.notify():
+                    for event in result.get('events', []):
+                        self.apply_event(event.get('type'), event.get('element'))
+                    if self._stop.is_set():
+                        break
+            except Exception as e:
+                logger.warning('Notification socket failed, resyncing: %s', e)
+                self._stop.wait(min(interval, 10))
+
+    def stop(self):
+        """
+        Stop following changes
+        """
+        self._stop.set()
+
+    def _element(self, row):
+        from smc.base.model import ElementCache, lookup_class
+        element = lookup_class(row['typeof'])(
+            name=row['name'], href=row['href'], type=row['typeof'])
+        element.data = ElementCache(json.loads(row['json']), etag=row['etag'])
+        return element
+
+    def get(self, href):
+        """
+        Return the mirrored element for the href or None. The element
+        data is loaded from the mirror.
+
+        :rtype: Element
+        """
+        row = self.store.get(href)
+        return self._element(row) if row else None
+
+    def find(self, typeof=None, name=None, contains=None):
+        """
+        Find mirrored elements by type and exact name or a name
+        substring. The element data is loaded from the mirror::
+
+            for host in mirror.find('host', contains='web'):
+                print(host.name, host.address)
+
+        :rtype: list(Element)
+        """
+        return [self._element(row) for row in
+                self.store.find(typeof, name, contains)]
+
+    def referenced_by(self, element):
+        """
+        Mirrored elements that reference the given element or href
+
+        :param element: element or href
+        :rtype: list(Element)
+        """
+        href = getattr(element, 'href', element)
+        return [self.get(source) for source in self.store.referenced_by(href)]
+
+    @property
+    def age(self):
+        """
+        Seconds since the least recently synchronized element was
+        synchronized, or None if the mirror is empty
+
+        :rtype: float
+        """
+        oldest = self.store.execute('SELECT MIN(synced) FROM element')[0][0]
+        return time.time() - oldest if oldest else None
+
+    def close(self):
+        self.stop()
+        self.store.close()
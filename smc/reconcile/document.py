@@ -0,0 +1,129 @@
+"""
+Desired state documents.
+
+A desired state document maps an element type (the elements `typeof`,
+i.e. 'host', 'network', 'group') to a list of elements of that type. Each
+element is a dict of the keyword arguments for the element classes
+``create`` method and must include a name. Other elements are referenced
+with a ``$ref`` of ``<typeof>/<name>``::
+
+    host:
+      - name: web-1
+        address: 10.0.0.1
+      - name: web-2
+        address: 10.0.0.2
+    group:
+      - name: web-servers
+        members:
+          - $ref: host/web-1
+          - $ref: host/web-2
+
+The same document can be provided as json. Loading yaml requires PyYAML.
+"""
+import json
+from smc.compat import string_types
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+def read(source):
+    """
+    Read a document from a dict, a file path or an open file. Files
+    ending in .yml or .yaml are loaded as yaml, otherwise json is
+    expected.
+
+    :param source: dict, path or file like object
+    :raises ValueError: invalid json or yaml, or PyYAML is not installed
+    :rtype: dict
+    """
+    if isinstance(source, dict):
+        return source
+    name = source if isinstance(source, string_types) else \
+        getattr(source, 'name', '')
+    is_yaml = str(name).endswith(('.yml', '.yaml'))
+    if is_yaml and yaml is None:
+        raise ValueError('Loading %s requires PyYAML.' % name)
+    if isinstance(source, string_types):
+        with open(source) as fp:
+            content = fp.read()
+    else:
+        content = source.read()
+    return yaml.safe_load(content) if is_yaml else json.loads(content)
+
+
+def load(source):
+    """
+    Load a desired state document from a dict, a file path or an open
+    file. See :func:`read`.
+
+    :param source: dict, path or file like object
+    :raises ValueError: invalid document or PyYAML is not installed
+    :rtype: dict
+    """
+    document = read(source)
+    if not isinstance(document, dict):
+        raise ValueError('Desired state must map element types to a list '
+            'of elements.')
+    for typeof, elements in document.items():
+        if not isinstance(elements, list) or not all(
+            isinstance(element, dict) and element.get('name')
+            for element in elements):
+            raise ValueError('Elements of type %r must be a list of dicts '
+                'with a name.' % typeof)
+    return document
+
+
+def parse_ref(value):
+    """
+    Return the (typeof, name) referenced by a value or None if the value
+    is not a reference.
+
+    :rtype: tuple
+    """
+    if isinstance(value, dict) and list(value) == ['$ref']:
+        ref = value['$ref']
+        if isinstance(ref, string_types) and '/' in ref:
+            typeof, name = ref.split('/', 1)
+            return typeof, name
+        raise ValueError('Invalid reference: %r, expected <typeof>/<name>' % ref)
+
+
+def references(value):
+    """
+    Set of (typeof, name) referenced within an elements spec
+
+    :rtype: set
+    """
+    ref = parse_ref(value)
+    if ref:
+        return set([ref])
+    found = set()
+    if isinstance(value, dict):
+        for item in value.values():
+            found.update(references(item))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            found.update(references(item))
+    return found
+
+
+def resolve(value, hrefs):
+    """
+    Return a copy of the value with references replaced by the href
+    of the referenced element.
+
+    :param value: element spec or value
+    :param dict hrefs: href by (typeof, name)
+    :raises KeyError: reference that cannot be resolved
+    """
+    ref = parse_ref(value)
+    if ref:
+        return hrefs[ref]
+    if isinstance(value, dict):
+        return {key: resolve(item, hrefs) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [resolve(item, hrefs) for item in value]
+    return value
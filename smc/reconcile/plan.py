@@ -0,0 +1,404 @@
+"""
+Plan and apply a desired state.
+
+Reconciling compares a desired state document (see
+:mod:`smc.reconcile.document`) with the elements in the SMC. The current
+state of each element type is fetched with a single listing and the
+elements in the document are then loaded concurrently. Each element in the
+document results in a create, update or no-op change::
+
+    from smc.reconcile.plan import plan
+
+    changes = plan('desired.yml')
+    print(changes.summary)
+    print(changes.to_json())
+
+    changes.apply(max_workers=8)
+    with open('report.json', 'w') as report:
+        report.write(changes.to_json())
+
+Changes are applied in dependency order; an element is only created after
+the elements it references and changes that depend on a failed change are
+skipped. Creates and updates within the same layer run concurrently.
+Elements to create that reference each other cannot be ordered and are
+reported as failed without being sent.
+
+When planning with ``prune=True``, elements of the types in the document
+that are not in the document are deleted after all creates and updates.
+System and read only elements are never pruned. Deletes are ordered with
+:func:`smc.base.bulk.bulk_delete` using a reference index of the
+elements in the plan, so elements still referenced are reported as
+blocked instead of being attempted. Provide a
+:class:`smc.mirror.references.ReferenceIndex` that includes policies,
+engines and other elements that may use the pruned elements to also find
+those references::
+
+    index = ReferenceIndex.from_mirror(mirror)
+    changes = plan('desired.yml', prune=True, index=index)
+
+Attributes are compared the same way as
+:meth:`smc.base.model.Element.update_or_create`, except that lists are
+replaced instead of appended to. Keyword arguments that are stored under
+a different name in the elements json (i.e. group `members`) are mapped
+to the json attribute.
+"""
+import json
+import logging
+from smc.compat import string_types
+from smc.base.workers import parallel_map
+from smc.api.common import SMCRequest, fetch_entry_point
+from smc.api.exceptions import FetchElementFailed, ElementNotFound, \
+    CreateElementFailed
+from smc.reconcile.document import load, references, resolve
+
+
+logger = logging.getLogger(__name__)
+
+
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+NOOP = 'noop'
+
+#: Create keyword arguments stored under a different json attribute
+ATTRIBUTES = {'members': 'element'}
+
+
+def _attribute(cls, key):
+    from smc.base.model import ElementRef, ElementList
+    descriptor = getattr(cls, key, None)
+    if isinstance(descriptor, (ElementRef, ElementList)):
+        return descriptor.attr
+    return ATTRIBUTES.get(key, key)
+
+
+def _equal(current, desired):
+    if isinstance(current, list) and isinstance(desired, list) and \
+        all(isinstance(value, string_types) for value in current + desired):
+        return set(current) == set(desired)
+    return current == desired
+
+
+def diff(element, spec):
+    """
+    Attributes of the element that differ from the spec
+
+    :param Element element: loaded element
+    :param dict spec: resolved keyword arguments
+    :return: dict of json attribute: dict with 'current' and 'desired'
+    :rtype: dict
+    """
+    changes = {}
+    for key, value in spec.items():
+        if key == 'name':
+            continue
+        attribute = _attribute(type(element), key)
+        current = element.data.get(attribute)
+        if not _equal(current, value):
+            changes[attribute] = dict(current=current, desired=value)
+    return changes
+
+
+class Change(object):
+    """
+    A change to a single element
+
+    :ivar str action: create, update, delete or noop
+    :ivar str typeof: element type
+    :ivar str name: element name
+    :ivar dict spec: keyword arguments from the desired state
+    :ivar Element element: current element, if it exists
+    :ivar dict diff: attributes to update
+    :ivar str status: planned, applied, failed, skipped or blocked
+    :ivar str error: reason the change failed or was not applied
+    """
+    def __init__(self, action, typeof, name, spec=None, element=None,
+                 diff=None):
+        self.action = action
+        self.typeof = typeof
+        self.name = name
+        self.spec = spec or {}
+        self.element = element
+        self.diff = diff or {}
+        self.depends_on = references(self.spec)
+        self.status = 'planned' if action != NOOP else 'applied'
+        self.error = None
+
+    @property
+    def key(self):
+        return self.typeof, self.name
+
+    def to_dict(self):
+        return dict(
+            action=self.action,
+            type=self.typeof,
+            name=self.name,
+            href=self.element.href if self.element is not None else None,
+            diff=self.diff,
+            depends_on=sorted('/'.join(ref) for ref in self.depends_on),
+            status=self.status,
+            error=self.error)
+
+    def __repr__(self):
+        return '%s(action=%s,type=%s,name=%s,status=%s)' % (
+            self.__class__.__name__, self.action, self.typeof, self.name,
+            self.status)
+
+
+class Plan(object):
+    """
+    Changes required to reconcile the SMC with a desired state. Returned
+    from :func:`plan`.
+
+    :ivar list changes: list of :class:`Change`
+    :ivar ReferenceIndex index: reference index used to order deletes
+    """
+    def __init__(self, changes, hrefs, max_workers=None, index=None):
+        self.changes = changes
+        self._hrefs = hrefs
+        self.max_workers = max_workers
+        self.index = index
+
+    @property
+    def summary(self):
+        """
+        Number of changes by action and by status
+
+        :rtype: dict
+        """
+        summary = dict(actions={}, status={})
+        for change in self.changes:
+            summary['actions'][change.action] = \
+                summary['actions'].get(change.action, 0) + 1
+            summary['status'][change.status] = \
+                summary['status'].get(change.status, 0) + 1
+        return summary
+
+    def to_dict(self):
+        return dict(
+            summary=self.summary,
+            changes=[change.to_dict() for change in self.changes
+                     if change.action != NOOP])
+
+    def to_json(self, indent=2):
+        """
+        Machine readable report of the plan, or the result of applying it
+
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), indent=indent, sort_keys=True,
+            default=str)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len([change for change in self.changes if change.action != NOOP])
+
+    def _apply(self, change):
+        spec = resolve(change.spec, self._hrefs)
+        if change.action == CREATE:
+            from smc.base.model import lookup_class
+            element = lookup_class(change.typeof).create(**spec)
+            change.element = element
+            self._hrefs[change.key] = element.href
+        else:
+            for key, value in spec.items():
+                if key != 'name':
+                    attribute = _attribute(type(change.element), key)
+                    if attribute in change.diff:
+                        change.element.data[attribute] = value
+            change.element.update()
+        return change
+
+    def _layers(self, changes):
+        # Order changes so elements are created before the changes that
+        # reference them. Returns the layers and the changes that cannot
+        # be scheduled because they reference each other
+        pending = {change.key: change for change in changes}
+        created = set(change.key for change in changes
+                      if change.action == CREATE)
+        layers = []
+        while pending:
+            waiting = created.intersection(pending)
+            layer = [change for change in pending.values()
+                     if not change.depends_on & waiting]
+            if not layer:
+                circular = sorted(pending.values(), key=lambda c: c.key)
+                logger.error('Circular references between changes: %s',
+                    ['/'.join(change.key) for change in circular])
+                return layers, circular
+            for change in layer:
+                pending.pop(change.key)
+            layers.append(layer)
+        return layers, []
+
+    def _reference_index(self):
+        # Index the elements of the plan as they are after the writes so
+        # references to elements being deleted are found before deleting
+        from smc.mirror.references import ReferenceIndex
+        index = self.index if self.index is not None else ReferenceIndex()
+        for change in self.changes:
+            if change.element is None or (change.action != DELETE and
+                                          change.status != 'applied'):
+                continue
+            if 'data' in vars(change.element):
+                index.add_element(change.element)
+            else:
+                index.add(change.element.href,
+                    resolve(change.spec, self._hrefs), change.typeof,
+                    change.name)
+        return index
+
+    def apply(self, max_workers=None):
+        """
+        Apply the planned changes. The status and error of each change are
+        updated; failures do not raise. Use :meth:`to_json` for a report.
+
+        :param int max_workers: maximum concurrent requests
+        :return: True if all changes were applied
+        :rtype: bool
+        """
+        max_workers = max_workers or self.max_workers
+        failed = set()
+        writes = [change for change in self.changes
+                  if change.action in (CREATE, UPDATE) and
+                  change.status == 'planned']
+        layers, circular = self._layers(writes)
+        for change in circular:
+            change.status = 'failed'
+            change.error = 'Cannot be ordered, created elements reference ' \
+                'each other: %s' % sorted('/'.join(ref)
+                                          for ref in change.depends_on)
+            failed.add(change.key)
+        for layer in layers:
+            runnable = []
+            for change in layer:
+                blocked = change.depends_on & failed
+                if blocked:
+                    change.status = 'skipped'
+                    change.error = 'Depends on failed changes: %s' % sorted(
+                        '/'.join(ref) for ref in blocked)
+                    failed.add(change.key)
+                else:
+                    runnable.append(change)
+            for result in parallel_map(self._apply, runnable, max_workers):
+                change = result.item
+                if result.ok:
+                    change.status = 'applied'
+                else:
+                    change.status = 'failed'
+                    change.error = str(result.error)
+                    failed.add(change.key)
+
+        deletes = [change for change in self.changes
+                   if change.action == DELETE and change.status == 'planned']
+        if deletes:
+            from smc.base.bulk import bulk_delete
+            by_href = {change.element.href: change for change in deletes}
+            result = bulk_delete([change.element for change in deletes],
+                index=self._reference_index(), max_workers=max_workers)
+            for item in result:
+                change = by_href[item.item.href]
+                change.status = 'applied' if item.ok else 'failed'
+                change.error = str(item.error) if item.error else None
+            for element, referenced_by in result.blocked:
+                change = by_href[element.href]
+                change.status = 'blocked'
+                change.error = 'Referenced by: %s' % [
+                    ref['name'] or ref['href'] for ref in referenced_by]
+
+        logger.info('Reconcile applied: %s', self.summary)
+        return all(change.status == 'applied' for change in self.changes)
+
+
+def _current(typeof):
+    from smc.base.model import lookup_class
+    listing = SMCRequest(
+        href=fetch_entry_point(typeof),
+        exception=FetchElementFailed).read().json or []
+    cls = lookup_class(typeof)
+    return {meta.get('name'): cls(**meta) for meta in listing}
+
+
+def _protected(element):
+    # System and read only elements cannot be deleted
+    return element.data.get('system', False) or \
+        element.data.get('read_only', False)
+
+
+def plan(document, prune=False, max_workers=None, index=None):
+    """
+    Compute the changes required to reconcile the SMC with the desired
+    state. Each element type in the document (and each type referenced
+    by the document) is listed once and the elements in the document
+    that exist, and elements to prune, are loaded concurrently.
+
+    :param document: desired state as a dict, path or file, see
+        :func:`smc.reconcile.document.load`
+    :param bool prune: delete elements of the types in the document that
+        are not in the document. System and read only elements are kept.
+    :param int max_workers: maximum concurrent requests
+    :param ReferenceIndex index: index of elements that may reference
+        pruned elements, the elements in the plan are added to it
+    :raises ValueError: invalid document
+    :raises ElementNotFound: a reference is not in the document or the SMC
+    :raises CreateElementFailed: an element to create does not have a
+        create method
+    :rtype: Plan
+    """
+    from smc.base.model import lookup_class
+    document = load(document)
+    desired = {(typeof, spec['name']): spec
+               for typeof, specs in document.items() for spec in specs}
+    types = set(document) | set(
+        ref[0] for spec in desired.values() for ref in references(spec))
+
+    current = {}
+    for result in parallel_map(_current, sorted(types), max_workers):
+        if not result.ok:
+            raise result.error
+        for name, element in result.result.items():
+            current[(result.item, name)] = element
+
+    missing = set(ref for spec in desired.values() for ref in references(spec)
+                  if ref not in desired and ref not in current)
+    if missing:
+        raise ElementNotFound('References not found in the desired state or '
+            'SMC: %s' % sorted('/'.join(ref) for ref in missing))
+
+    existing = [current[key] for key in desired if key in current]
+    if prune:
+        existing.extend(element for key, element in current.items()
+                        if key[0] in document and key not in desired)
+    for result in parallel_map(lambda element: element.data, existing,
+                               max_workers):
+        if not result.ok:
+            raise result.error
+
+    hrefs = {key: element.href for key, element in current.items()}
+    pending = {key: '$ref:%s/%s' % key for key in desired if key not in current}
+    pending.update(hrefs)
+
+    changes = []
+    for key, spec in desired.items():
+        typeof, name = key
+        element = current.get(key)
+        if element is None:
+            if not hasattr(lookup_class(typeof), 'create'):
+                raise CreateElementFailed('%s elements cannot be created: %s'
+                    % (typeof, name))
+            changes.append(Change(CREATE, typeof, name, spec))
+        else:
+            changes_ = diff(element, resolve(spec, pending))
+            changes.append(Change(UPDATE if changes_ else NOOP, typeof, name,
+                spec, element, changes_))
+    if prune:
+        for key, element in sorted(current.items()):
+            if key[0] in document and key not in desired:
+                if _protected(element):
+                    logger.debug('Not pruning system or read only element: '
+                        '%s/%s', *key)
+                    continue
+                changes.append(Change(DELETE, key[0], key[1], element=element))
+    return Plan(changes, hrefs, max_workers, index)